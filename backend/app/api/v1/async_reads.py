@@ -0,0 +1,42 @@
+"""
+Serve read handlers from the async database stack.
+
+With ASYNC_DATABASE on, ``async_read`` turns a sync handler written against
+``db: Session`` into an async one: ``db`` becomes an AsyncSession and the
+handler body runs through ``AsyncSession.run_sync``. Its queries then go
+through the async driver on the event loop instead of occupying a thread
+pool thread, while the query code stays shared with the sync path.
+
+The handler's result must be fully loaded when it returns: anything lazy
+loaded while the response is serialised would run outside ``run_sync``.
+"""
+
+import inspect
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import get_async_db
+
+
+def async_read(handler: Callable) -> Callable:
+    if not settings.ASYNC_DATABASE:
+        return handler
+
+    signature = inspect.signature(handler)
+    parameters = []
+    for parameter in signature.parameters.values():
+        if parameter.name == "db":
+            parameter = parameter.replace(annotation=AsyncSession, default=Depends(get_async_db))
+        parameters.append(parameter)
+
+    @wraps(handler)
+    async def wrapper(**kwargs: Any) -> Any:
+        db: AsyncSession = kwargs.pop("db")
+        return await db.run_sync(lambda session: handler(db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
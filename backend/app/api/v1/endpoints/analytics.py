@@ -1,195 +1,183 @@
-from typing import Any, List, Optional
-from datetime import datetime, timedelta
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
+from sqlalchemy import func
 
-from app.db.database import get_db
+from app.api.v1.async_reads import async_read
+from app.db.database import get_db, get_read_db
+from app.core.report_writers import FORMATS, normalize_format
 from app.db import models
+from app.db.columnar import columnar_engine
+from app.core.config import settings
+from app.core.local_time import last_days, local_today
+from app.core.security import Principal
+from app.db.analytics_cache import analytics_cache, cached_analytics
+from app.db.counters import user_scope
+from app.db.dashboard import load_dashboard_metrics
+from app.db.distribution import value_distribution
+from app.db.geography import geographical_breakdown
+from app.db.monthly import month_range, monthly_conversion, monthly_revenue
+from app.db.report_worker import report_worker
+from app.db.reports import REPORT_TYPES
 from app.schemas import analytics as analytics_schemas
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import get_current_principal
 
 router = APIRouter()
 
 
 @router.get("/Dashboard", response_model=analytics_schemas.DashboardMetrics)
+@cached_analytics("dashboard", bucket_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS)
+@async_read
 def get_Dashboard_metrics(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get Dashboard metrics and overview
     """
-    # Base query filter
-    base_filter = models.Quotation.user_id == current_user.id if current_user.role != "admin" else True
-    
-    # Total quotations
-    total_quotations = db.query(models.Quotation).filter(base_filter).count()
-    
-    # Quotations by status
-    pending_quotations = db.query(models.Quotation).filter(
-        and_(base_filter, models.Quotation.status == "pending")
-    ).count()
-    
-    approved_quotations = db.query(models.Quotation).filter(
-        and_(base_filter, models.Quotation.status == "approved")
-    ).count()
-    
-    # Revenue calculations
-    total_revenue = db.query(func.sum(models.Quotation.total_amount)).filter(
-        and_(base_filter, models.Quotation.status == "approved")
-    ).scalar() or 0
-    
-    # This month's revenue
-    current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    monthly_revenue = db.query(func.sum(models.Quotation.total_amount)).filter(
-        and_(
-            base_filter,
-            models.Quotation.status == "approved",
-            models.Quotation.created_at >= current_month
+    return load_dashboard_metrics(db, user_scope(current_user))
+
+
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get size, hit, miss and eviction counters of the analytics result cache (admin only)
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
         )
-    ).scalar() or 0
-    
-    # Conversion rate
-    conversion_rate = (approved_quotations / total_quotations * 100) if total_quotations > 0 else 0
-    
-    # Recent activity (last 10 quotations)
-    recent_quotations = db.query(models.Quotation).filter(base_filter).order_by(
-        models.Quotation.created_at.desc()
-    ).limit(10).all()
-    
-    return {
-        "total_quotations": total_quotations,
-        "pending_quotations": pending_quotations,
-        "approved_quotations": approved_quotations,
-        "total_revenue": total_revenue,
-        "monthly_revenue": monthly_revenue,
-        "conversion_rate": round(conversion_rate, 2),
-        "recent_activity": [
-            {
-                "id": q.id,
-                "customer_name": q.customer_name,
-                "status": q.status,
-                "total_amount": q.total_amount,
-                "created_at": q.created_at
-            }
-            for q in recent_quotations
-        ]
-    }
+    return analytics_cache.stats()
+
+
+def _status_totals(db: Session, scope: int, start_day: date, end_day: date) -> Dict[str, Tuple[int, float]]:
+    """Return {status: (count, amount)} from the daily rollup for ``start_day`` <= day <= ``end_day``"""
+    engine = columnar_engine(db)
+    if engine is not None:
+        return engine.status_totals(scope, start_day, end_day)
+    stats = models.QuotationDailyStat
+    rows = db.query(
+        stats.status, func.sum(stats.count), func.sum(stats.total_amount)
+    ).filter(
+        stats.user_id == scope, stats.day >= start_day, stats.day <= end_day
+    ).group_by(stats.status).all()
+    return {status: (count or 0, amount or 0.0) for status, count, amount in rows if count}
+
+
+def _trend(current: float, previous: float) -> str:
+    if not previous:
+        return "+0%" if not current else "+100%"
+    change = (current - previous) / previous * 100
+    return f"{change:+.1f}%"
 
 
 @router.get("/overview", response_model=analytics_schemas.AnalyticsOverview)
+@cached_analytics("overview")
+@async_read
 def get_analytics_overview(
-    db: Session = Depends(get_db),
-    days: int = Query(30, description="Number of days to analyze"),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    days: int = Query(30, ge=1, description="Number of days to analyze"),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get analytics overview for specified period
     """
-    # Date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    base_filter = and_(
-        models.Quotation.created_at >= start_date,
-        models.Quotation.created_at <= end_date,
-        models.Quotation.user_id == current_user.id if current_user.role != "admin" else True
-    )
-    
-    # Total metrics
-    total_quotations = db.query(models.Quotation).filter(base_filter).count()
-    total_revenue = db.query(func.sum(models.Quotation.total_amount)).filter(
-        and_(base_filter, models.Quotation.status == "approved")
-    ).scalar() or 0
-    
-    # Average quotation value
-    avg_quotation_value = db.query(func.avg(models.Quotation.total_amount)).filter(
-        base_filter
-    ).scalar() or 0
+    scope = user_scope(current_user)
+    end_date = datetime.utcnow()
+    start_day, end_day = last_days(days)
     
-    # Status distribution
-    status_counts = db.query(
-        models.Quotation.status,
-        func.count(models.Quotation.id)
-    ).filter(base_filter).group_by(models.Quotation.status).all()
+    current = _status_totals(db, scope, start_day, end_day)
+    previous = _status_totals(db, scope, start_day - timedelta(days=days), start_day - timedelta(days=1))
     
-    status_distribution = {status: count for status, count in status_counts}
+    total_quotations = sum(count for count, _ in current.values())
+    total_amount = sum(amount for _, amount in current.values())
+    approved, total_revenue = current.get("approved", (0, 0.0))
+    previous_quotations = sum(count for count, _ in previous.values())
+    previous_revenue = previous.get("approved", (0, 0.0))[1]
+    avg_quotation_value = round(total_amount / total_quotations, 2) if total_quotations else 0
     
     return {
         "period_days": days,
         "total_quotations": total_quotations,
         "total_revenue": total_revenue,
-        "average_quotation_value": round(avg_quotation_value, 2),
-        "status_distribution": status_distribution,
-        "start_date": start_date,
-        "end_date": end_date
+        "conversion_rate": round(approved / total_quotations * 100, 2) if total_quotations else 0,
+        "avg_quote_value": avg_quotation_value,
+        "average_quotation_value": avg_quotation_value,
+        "status_distribution": {status: count for status, (count, _) in current.items()},
+        "trends": {
+            "quotations": _trend(total_quotations, previous_quotations),
+            "revenue": _trend(total_revenue, previous_revenue),
+        },
+        "start_date": datetime.combine(start_day, datetime.min.time()),
+        "end_date": end_date,
     }
 
 
 @router.get("/revenue-trend")
+@cached_analytics("revenue-trend")
+@async_read
 def get_revenue_trend(
-    db: Session = Depends(get_db),
-    days: int = Query(30, description="Number of days to analyze"),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    days: int = Query(30, ge=1, description="Number of days to analyze"),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get revenue trend data
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    base_filter = and_(
-        models.Quotation.created_at >= start_date,
-        models.Quotation.created_at <= end_date,
-        models.Quotation.status == "approved",
-        models.Quotation.user_id == current_user.id if current_user.role != "admin" else True
-    )
+    start_day, end_day = last_days(days)
+    scope = user_scope(current_user)
+    engine = columnar_engine(db)
+    if engine is not None:
+        return {
+            "revenue_data": [
+                {"date": str(day), "revenue": revenue}
+                for day, revenue in engine.daily_revenue(scope, start_day, end_day)
+            ]
+        }
+    stats = models.QuotationDailyStat
     
-    # Daily revenue
+    # At most one rollup row per day and template type for the approved status
     daily_revenue = db.query(
-        func.date(models.Quotation.created_at).label('date'),
-        func.sum(models.Quotation.total_amount).label('revenue')
-    ).filter(base_filter).group_by(
-        func.date(models.Quotation.created_at)
-    ).order_by('date').all()
+        stats.day, func.sum(stats.total_amount)
+    ).filter(
+        stats.user_id == scope,
+        stats.status == "approved",
+        stats.day >= start_day,
+        stats.day <= end_day,
+        stats.count > 0,
+    ).group_by(stats.day).order_by(stats.day).all()
     
     return {
         "revenue_data": [
             {
-                "date": str(date),
+                "date": str(day),
                 "revenue": float(revenue or 0)
             }
-            for date, revenue in daily_revenue
+            for day, revenue in daily_revenue
         ]
     }
 
 
 @router.get("/conversion-funnel")
+@cached_analytics("conversion-funnel")
+@async_read
 def get_conversion_funnel(
-    db: Session = Depends(get_db),
-    days: int = Query(30, description="Number of days to analyze"),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    days: int = Query(30, ge=1, description="Number of days to analyze"),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get conversion funnel data
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    base_filter = and_(
-        models.Quotation.created_at >= start_date,
-        models.Quotation.created_at <= end_date,
-        models.Quotation.user_id == current_user.id if current_user.role != "admin" else True
-    )
-    
-    # Count by status
-    status_counts = db.query(
-        models.Quotation.status,
-        func.count(models.Quotation.id)
-    ).filter(base_filter).group_by(models.Quotation.status).all()
-    
-    status_dict = {status: count for status, count in status_counts}
+    start_day, end_day = last_days(days)
+    status_totals = _status_totals(db, user_scope(current_user), start_day, end_day)
+    status_dict = {status: count for status, (count, _) in status_totals.items()}
     
     total = sum(status_dict.values())
     draft = status_dict.get("draft", 0)
@@ -208,13 +196,88 @@ def get_conversion_funnel(
     }
 
 
+@router.get("/geographical", response_model=List[analytics_schemas.GeographicalData])
+@cached_analytics("geographical")
+@async_read
+def get_geographical_analytics(
+    db: Session = Depends(get_read_db),
+    days: int = Query(30, ge=1, description="Number of days to analyze"),
+    status: Optional[str] = Query(None),
+    group_by: str = Query("district", pattern="^(district|area)$", description="Postcode district (SW7) or area (SW)"),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get quotations, revenue and conversion rate per postcode district or area
+    """
+    start_day, end_day = last_days(days)
+    return geographical_breakdown(db, user_scope(current_user), start_day, end_day, status, group_by)
+
+
+def _months(months: int, end_month: Optional[str]) -> List[date]:
+    if end_month:
+        try:
+            last = datetime.strptime(end_month, "%Y-%m").date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="end_month must be YYYY-MM")
+    else:
+        last = local_today().replace(day=1)
+    return month_range(months, last)
+
+
+@router.get("/conversion-monthly", response_model=List[analytics_schemas.ConversionData])
+@cached_analytics("conversion-monthly")
+@async_read
+def get_conversion_monthly(
+    db: Session = Depends(get_read_db),
+    months: int = Query(12, ge=1, le=120, description="Number of months to return"),
+    end_month: Optional[str] = Query(None, description="Last month (YYYY-MM); defaults to the current month"),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get submitted and accepted quotations per month
+    """
+    return monthly_conversion(db, user_scope(current_user), _months(months, end_month))
+
+
+@router.get("/revenue-monthly", response_model=List[analytics_schemas.RevenueData])
+@cached_analytics("revenue-monthly")
+@async_read
+def get_revenue_monthly(
+    db: Session = Depends(get_read_db),
+    months: int = Query(12, ge=1, le=120, description="Number of months to return"),
+    end_month: Optional[str] = Query(None, description="Last month (YYYY-MM); defaults to the current month"),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get approved revenue per month against a target of the trailing three-month average
+    """
+    return monthly_revenue(db, user_scope(current_user), _months(months, end_month))
+
+
+@router.get("/distribution", response_model=List[analytics_schemas.ValueDistribution])
+@cached_analytics("distribution")
+@async_read
+def get_value_distribution(
+    db: Session = Depends(get_read_db),
+    months: int = Query(12, ge=1, le=120, description="Number of months to include"),
+    end_month: Optional[str] = Query(None, description="Last month (YYYY-MM); defaults to the current month"),
+    template_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get the median, p90, p99 and histogram of quotation values per template type and status
+    """
+    return value_distribution(db, user_scope(current_user), _months(months, end_month), template_type, status)
+
+
 @router.get("/reports", response_model=List[analytics_schemas.Report])
 def get_reports(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     report_type: Optional[str] = Query(None),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get user reports
@@ -223,10 +286,10 @@ def get_reports(
     
     # Filter by user if not admin
     if current_user.role != "admin":
-        query = query.filter(models.Report.user_id == current_user.id)
+        query = query.filter(models.Report.generated_by == current_user.id)
     
     if report_type:
-        query = query.filter(models.Report.report_type == report_type)
+        query = query.filter(models.Report.type == report_type)
     
     reports = query.order_by(models.Report.created_at.desc()).offset(skip).limit(limit).all()
     return reports
@@ -237,27 +300,39 @@ def create_report(
     *,
     db: Session = Depends(get_db),
     report_in: analytics_schemas.ReportCreate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
-    Create a new report
+    Create a new report; it is generated in the background
     """
+    if report_in.type not in REPORT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown report type; use one of {', '.join(REPORT_TYPES)}"
+        )
+    try:
+        normalize_format(report_in.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     report = models.Report(
         **report_in.dict(),
-        user_id=current_user.id
+        generated_by=current_user.id,
+        status="pending"
     )
     db.add(report)
     db.commit()
     db.refresh(report)
+    report_worker.submit(report.id)
     return report
 
 
 @router.get("/reports/{report_id}", response_model=analytics_schemas.ReportWithDetails)
 def get_report(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     report_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get report by ID
@@ -267,7 +342,7 @@ def get_report(
         raise HTTPException(status_code=404, detail="Report not found")
     
     # Check permissions
-    if current_user.role != "admin" and report.user_id != current_user.id:
+    if current_user.role != "admin" and report.generated_by != current_user.id:
         raise HTTPException(
             status_code=403,
             detail="Not enough permissions"
@@ -276,12 +351,47 @@ def get_report(
     return report
 
 
+@router.get("/reports/{report_id}/download")
+def download_report(
+    *,
+    db: Session = Depends(get_read_db),
+    report_id: int,
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Download a generated report file
+    """
+    report = db.query(models.Report).filter(models.Report.id == report_id).first()
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    # Check permissions
+    if current_user.role != "admin" and report.generated_by != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+    
+    if report.status != "completed" or not report.file_path or not os.path.exists(report.file_path):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Report is not ready (status: {report.status})"
+        )
+    
+    extension, media_type = FORMATS[normalize_format(report.format)]
+    return FileResponse(
+        report.file_path,
+        media_type=media_type,
+        filename=f"{report.name}.{extension}"
+    )
+
+
 @router.delete("/reports/{report_id}")
 def delete_report(
     *,
     db: Session = Depends(get_db),
     report_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Delete a report
@@ -291,12 +401,14 @@ def delete_report(
         raise HTTPException(status_code=404, detail="Report not found")
     
     # Check permissions
-    if current_user.role != "admin" and report.user_id != current_user.id:
+    if current_user.role != "admin" and report.generated_by != current_user.id:
         raise HTTPException(
             status_code=403,
             detail="Not enough permissions"
         )
     
+    if report.file_path and os.path.exists(report.file_path):
+        os.remove(report.file_path)
     db.delete(report)
     db.commit()
     return {"message": "Report deleted successfully"}
\ No newline at end of file
@@ -1,96 +1,173 @@
-from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core import security
 from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.revocation import revocation_list
 from app.db.database import get_db
 from app.db import models
+from app.db.principals import load_principal
+from app.db.revocations import revoke_token
 from app.schemas import user as user_schemas
 
 router = APIRouter()
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    """
-    Authenticate user by email and password
-    """
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user:
-        return False
-    if not security.verify_password(password, user.hashed_password):
-        return False
-    return user
+# The lookups below end their transaction so the session holds no pooled
+# connection while the request waits for a password hash
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(security.oauth2_scheme)
-) -> models.User:
+def _password_hash_by_email(db: Session, email: str) -> Optional[Row]:
+    row = db.query(
+        models.User.id, models.User.role, models.User.is_active, models.User.hashed_password
+    ).filter(models.User.email == email).first()
+    db.rollback()
+    return row
+
+
+def _email_taken(db: Session, email: str) -> bool:
+    taken = db.query(models.User.id).filter(models.User.email == email).first() is not None
+    db.rollback()
+    return taken
+
+
+def _save_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    user = db.get(models.User, user_id)
+    if user is not None:
+        user.hashed_password = hashed_password
+        db.commit()
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[security.Principal]:
     """
-    Get current user from JWT token
+    Authenticate user by email and password, upgrading an outdated password hash
     """
-    credentials_exception = HTTPException(
+    row = await run_in_threadpool(_password_hash_by_email, db, email)
+    if row is None:
+        return None
+    matches, new_hash = await password_hasher.verify(password, row.hashed_password)
+    if not matches:
+        return None
+    if new_hash:
+        await run_in_threadpool(_save_password_hash, db, row.id, new_hash)
+    return security.Principal(row.id, row.role, row.is_active is not False)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_claims(token: str, token_type: str) -> dict:
+    """Return the claims of a valid, unrevoked token of ``token_type``; raises 401 otherwise"""
+    credentials_exception = _credentials_exception()
     try:
-        payload = security.decode_access_token(token)
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        claims = security.decode_token(token)
+        int(claims["sub"])
+        claims["jti"]
     except Exception:
         raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if user is None:
+    # Tokens from before refresh tokens existed have no type and must log in again
+    if claims.get("typ") != token_type or revocation_list.is_revoked(claims):
         raise credentials_exception
+    return claims
+
+
+def _active(principal: Optional[security.Principal]) -> security.Principal:
+    if principal is None:
+        raise _credentials_exception()
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+async def get_current_principal(token: str = Depends(security.oauth2_scheme)) -> security.Principal:
+    """
+    Get the id, role and active flag of the user behind a JWT token from its claims, without a database lookup
+    """
+    return _active(security.principal_from_claims(_token_claims(token, "access")))
+
+
+def _issue_tokens(principal: security.Principal) -> dict:
+    return {
+        "access_token": security.create_access_token(security.principal_claims(principal)),
+        # Refreshing reads the users row again, so the refresh token only needs the id
+        "refresh_token": security.create_refresh_token({"sub": str(principal.id)}),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def get_current_user(
+    db: Session = Depends(get_db), principal: security.Principal = Depends(get_current_principal)
+) -> models.User:
+    """
+    Get the full user row for a JWT token; prefer get_current_principal unless the row itself is needed
+    """
+    user = db.get(models.User, principal.id)
+    if user is None:
+        raise _credentials_exception()
     return user
 
 
 @router.post("/login", response_model=user_schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
-    OAuth2 compatible token login, get an access token for future requests
+    OAuth2 compatible token login, get an access and a refresh token for future requests
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+    principal = await authenticate_user(db, form_data.username, form_data.password)
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-    }
+    return _issue_tokens(principal)
 
 
-@router.post("/register", response_model=user_schemas.User)
-def register_user(
+@router.post("/refresh", response_model=user_schemas.Token)
+def refresh_access_token(
     *,
     db: Session = Depends(get_db),
-    user_in: user_schemas.UserCreate,
+    token_in: user_schemas.TokenRefresh,
 ) -> Any:
     """
-    Create new user
+    Exchange a refresh token for new tokens carrying the user's current role; the old refresh token stops working
     """
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this email already exists in the system.",
-        )
-    
-    hashed_password = security.get_password_hash(user_in.password)
+    claims = _token_claims(token_in.refresh_token, "refresh")
+    principal = _active(load_principal(db, int(claims["sub"])))
+    if not revoke_token(db, claims):
+        raise _credentials_exception()
+    return _issue_tokens(principal)
+
+
+@router.post("/logout")
+def logout(
+    *,
+    db: Session = Depends(get_db),
+    token: str = Depends(security.oauth2_scheme),
+    token_in: Optional[user_schemas.TokenRefresh] = None,
+) -> Any:
+    """
+    Revoke the access token and, if given, the refresh token
+    """
+    revoke_token(db, _token_claims(token, "access"))
+    if token_in is not None:
+        revoke_token(db, _token_claims(token_in.refresh_token, "refresh"))
+    return {"message": "Logged out successfully"}
+
+
+def _create_user(db: Session, user_in: user_schemas.UserCreate, hashed_password: str) -> models.User:
     user = models.User(
         name=user_in.name,
         email=user_in.email,
@@ -103,6 +180,25 @@ def register_user(
     return user
 
 
+@router.post("/register", response_model=user_schemas.User)
+async def register_user(
+    *,
+    db: Session = Depends(get_db),
+    user_in: user_schemas.UserCreate,
+) -> Any:
+    """
+    Create new user
+    """
+    if await run_in_threadpool(_email_taken, db, user_in.email):
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system.",
+        )
+    
+    hashed_password = await password_hasher.hash(user_in.password)
+    return await run_in_threadpool(_create_user, db, user_in, hashed_password)
+
+
 @router.post("/test-token", response_model=user_schemas.User)
 def test_token(current_user: models.User = Depends(get_current_user)) -> Any:
     """
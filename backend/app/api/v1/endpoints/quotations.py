@@ -1,32 +1,117 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+import json
+from typing import Any, AsyncIterator, Iterator, List, Optional, Set, Tuple, Union
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from sqlalchemy import String, false, func, null, select, true, tuple_, type_coerce, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 
-from app.db.database import get_db
-from app.db import models
+from app.api.v1.async_reads import async_read
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.geo import location_conditions
+from app.core.report_writers import FORMATS, write_rows
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.security import Principal
+from app.db.database import get_async_db, get_db, get_read_db
+from app.db import counters, idempotency, map_changes, models, versions
+from app.db.quotation_import import import_quotations, iter_records
+from app.db.search import apply_quotation_search
 from app.schemas import quotation as quotation_schemas
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import get_current_principal
 
 router = APIRouter()
 
+QUOTATION_FIELDS = set(quotation_schemas.QuotationInDBBase.model_fields)
 
-@router.get("/", response_model=List[quotation_schemas.Quotation])
+
+@router.get(
+    "/",
+    response_model=Union[quotation_schemas.QuotationPage, List[quotation_schemas.Quotation]],
+)
+@async_read
 def read_quotations(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = Query(None),
     customer_name: Optional[str] = Query(None),
+    search: Optional[str] = Query(None, description="Full-text search; every word matches as a prefix"),
     date_from: Optional[str] = Query(None),
     date_to: Optional[str] = Query(None),
-    current_user: models.User = Depends(get_current_user),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    near: Optional[str] = Query(None, description="lat,lng centre for a radius search"),
+    radius_m: Optional[float] = Query(None, description="Radius in metres around near"),
+    cursor: bool = Query(False, description="Use keyset pagination and return a page with next_cursor"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="Related data to add to a sparse response: items"),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Retrieve quotations with optional filtering
+
+    Offset pagination (``skip``/``limit``) returns a plain list. Keyset
+    pagination (``cursor=true`` or ``after=<token>``) returns the newest
+    quotations first together with a ``next_cursor`` for the following page.
+    ``search`` results are ordered by relevance and use offset pagination.
+
+    ``fields`` returns only the listed fields; line items are then left out
+    unless ``include=items`` is given.
     """
-    query = db.query(models.Quotation)
+    etag = _collection_etag(db, request, current_user.id)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    field_set, with_items = _list_shape(fields, include)
+    query, rank = _filter_quotations(
+        _list_query(db, field_set, with_items), current_user,
+        status, customer_name, search, date_from, date_to, bbox, near, radius_m,
+    )
+    
+    if rank is not None:
+        if cursor or after:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is not supported with search; use skip/limit",
+            )
+        query = query.order_by(rank, models.Quotation.id.desc())
+    elif cursor or after:
+        page = _read_quotations_page(query, limit, after)
+        if field_set is None:
+            return page
+        page["items"] = _sparse(page["items"], field_set, with_items)
+        return JSONResponse(jsonable_encoder(page), headers={"ETag": etag})
     
+    quotations = query.offset(skip).limit(limit).all()
+    if field_set is None:
+        return quotations
+    return JSONResponse(jsonable_encoder(_sparse(quotations, field_set, with_items)), headers={"ETag": etag})
+
+
+def _filter_quotations(
+    query,
+    current_user: Principal,
+    status: Optional[str],
+    customer_name: Optional[str],
+    search: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    bbox: Optional[str],
+    near: Optional[str],
+    radius_m: Optional[float],
+):
+    """
+    Apply the list filters shared by the list and export endpoints.
+
+    Returns the filtered query and the search rank to order by, if any.
+    """
     # Filter by user if not admin
     if current_user.role != "admin":
         query = query.filter(models.Quotation.created_by == current_user.id)
@@ -36,82 +121,545 @@ def read_quotations(
         query = query.filter(models.Quotation.status == status)
     if customer_name:
         query = query.filter(models.Quotation.customer_name.ilike(f"%{customer_name}%"))
+    query, rank = apply_quotation_search(query, search)
     if date_from:
         query = query.filter(models.Quotation.created_at >= date_from)
     if date_to:
         query = query.filter(models.Quotation.created_at <= date_to)
+    query = query.filter(*_location_filters(bbox, near, radius_m))
+    return query, rank
+
+
+def _collection_etag(db: Session, request: Request, user_id: Optional[int]) -> str:
+    """
+    ETag for a list response: changes whenever any quotation changes, and
+    differs per user and per query string.
+    """
+    version = versions.get_collection_version(db, versions.QUOTATIONS)
+    return make_etag(versions.QUOTATIONS, version, user_id, request.url.path, request.url.query)
+
+
+def _list_shape(fields: Optional[str], include: Optional[str]) -> Tuple[Optional[Set[str]], bool]:
+    """
+    Work out which quotation fields a list request wants and whether it
+    needs line items. Without ``fields`` the full representation is returned.
+    """
+    if fields is None:
+        return None, True
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - QUOTATION_FIELDS - {"items"}
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    includes = {name.strip() for name in (include or "").split(",")}
+    with_items = "items" in requested or "items" in includes
+    return requested - {"items"}, with_items
+
+
+def _list_query(db: Session, field_set: Optional[Set[str]], with_items: bool):
+    """
+    Base list query that loads only the requested columns, and all line
+    items for the page in one extra SELECT rather than one per quotation.
+    """
+    query = db.query(models.Quotation)
+    if field_set is not None:
+        columns = {"id", "created_at"} | field_set
+        query = query.options(load_only(*[getattr(models.Quotation, name) for name in columns]))
+    if with_items:
+        query = query.options(selectinload(models.Quotation.items))
+    return query
+
+
+def _sparse(quotations: list, field_set: Set[str], with_items: bool) -> List[dict]:
+    rows = []
+    for quotation in quotations:
+        row = {
+            name: getattr(quotation, name)
+            for name in quotation_schemas.QuotationInDBBase.model_fields
+            if name in field_set
+        }
+        if with_items:
+            row["items"] = [
+                quotation_schemas.QuotationItem.model_validate(item).model_dump() for item in quotation.items
+            ]
+        rows.append(row)
+    return rows
+
+
+def _read_quotations_page(query, limit: int, after: Optional[str]) -> dict:
+    """
+    Fetch one keyset page ordered by (created_at, id) descending.
+
+    created_at is compared as stored text rather than a bound datetime so the
+    cursor matches rows exactly whatever format they were written in.
+    """
+    created_at_raw = type_coerce(models.Quotation.created_at, String)
+    if after:
+        try:
+            after_created_at, after_id = decode_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            tuple_(created_at_raw, models.Quotation.id) < tuple_(after_created_at, after_id)
+        )
     
-    quotations = query.offset(skip).limit(limit).all()
-    return quotations
+    rows = query.add_columns(created_at_raw).order_by(
+        models.Quotation.created_at.desc(), models.Quotation.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_quotation, last_created_at = rows[-1]
+        next_cursor = encode_cursor(last_created_at, last_quotation.id)
+    
+    return {
+        "items": [quotation for quotation, _ in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def _location_filters(bbox: Optional[str], near: Optional[str], radius_m: Optional[float]) -> list:
+    try:
+        return location_conditions(
+            models.Quotation.latitude,
+            models.Quotation.longitude,
+            bbox=bbox,
+            near=near,
+            radius_m=radius_m,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get("/public", response_model=List[quotation_schemas.Quotation])
+@async_read
 def read_quotations_public(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    near: Optional[str] = Query(None, description="lat,lng centre for a radius search"),
+    radius_m: Optional[float] = Query(None, description="Radius in metres around near"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="Related data to add to a sparse response: items"),
 ) -> Any:
     """
     Retrieve all quotations without authentication (for map view)
     """
-    quotations = db.query(models.Quotation).offset(skip).limit(limit).all()
-    return quotations
+    etag = _collection_etag(db, request, None)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    field_set, with_items = _list_shape(fields, include)
+    quotations = _list_query(db, field_set, with_items).filter(
+        *_location_filters(bbox, near, radius_m)
+    ).offset(skip).limit(limit).all()
+    if field_set is None:
+        return quotations
+    return JSONResponse(jsonable_encoder(_sparse(quotations, field_set, with_items)), headers={"ETag": etag})
+
+
+MAP_FEED_BATCH_SIZE = 1000
+
+
+def read_map_feed(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    format: str = Query("ndjson", pattern="^(ndjson|geojson)$"),
+    since: Optional[int] = Query(None, ge=0, description="Only quotations changed after this change number"),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    near: Optional[str] = Query(None, description="lat,lng centre for a radius search"),
+    radius_m: Optional[float] = Query(None, description="Radius in metres around near"),
+) -> Any:
+    """
+    Stream the minimal quotation data the map view needs
+
+    Only id, status, amount and coordinates are selected, and rows are
+    written out as they are read, so the full set is never held in memory.
+    The ``X-Change-Seq`` header is the change number the response is
+    current to, and each record's ``seq`` that of its last write; pass the
+    header back as ``since`` to fetch only later changes.
+    Quotations that left the map since then (deleted, or now without
+    coordinates or outside the area) come back as ``{"id", "removed": true,
+    "seq", "updated_at"}``. A ``since`` older than the deletion log's
+    retention gets 410, and the client fetches the full feed again.
+    """
+    position = _map_feed_position(db, since)
+    etag = _collection_etag(db, request, None)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    stmt = _map_feed_statement(since, bbox, near, radius_m)
+    rows = db.execute(stmt.execution_options(yield_per=MAP_FEED_BATCH_SIZE))
+    return _map_feed_response(format, rows, etag, position)
+
+
+async def read_map_feed_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    format: str = Query("ndjson", pattern="^(ndjson|geojson)$"),
+    since: Optional[int] = Query(None, ge=0, description="Only quotations changed after this change number"),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    near: Optional[str] = Query(None, description="lat,lng centre for a radius search"),
+    radius_m: Optional[float] = Query(None, description="Radius in metres around near"),
+) -> Any:
+    """
+    Stream the minimal quotation data the map view needs
+
+    Only id, status, amount and coordinates are selected, and rows are
+    written out as they are read, so the full set is never held in memory.
+    The ``X-Change-Seq`` header is the change number the response is
+    current to, and each record's ``seq`` that of its last write; pass the
+    header back as ``since`` to fetch only later changes.
+    Quotations that left the map since then (deleted, or now without
+    coordinates or outside the area) come back as ``{"id", "removed": true,
+    "seq", "updated_at"}``. A ``since`` older than the deletion log's
+    retention gets 410, and the client fetches the full feed again.
+    """
+    position = await db.run_sync(_map_feed_position, since)
+    etag = await db.run_sync(_collection_etag, request, None)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    stmt = _map_feed_statement(since, bbox, near, radius_m)
+    rows = await db.stream(stmt.execution_options(yield_per=MAP_FEED_BATCH_SIZE))
+    return _map_feed_response(format, rows, etag, position)
+
+
+# The map feed streams its rows while the response is sent, so it has a
+# native async handler rather than going through async_read
+router.get("/map-feed")(read_map_feed_async if settings.ASYNC_DATABASE else read_map_feed)
+
+
+def _map_feed_position(db: Session, since: Optional[int]) -> int:
+    """
+    The change number the feed is current to, read in the same transaction
+    as its rows; 410 if deletions after ``since`` were already pruned
+    """
+    connection = db.connection()
+    if since is not None and since < map_changes.oldest_since(connection):
+        raise HTTPException(
+            status_code=410,
+            detail="since is older than the deletion log; fetch the full feed without since",
+        )
+    return map_changes.current_seq(connection)
+
+
+def _map_feed_statement(
+    since: Optional[int], bbox: Optional[str], near: Optional[str], radius_m: Optional[float]
+):
+    quotation = models.Quotation
+    on_map = quotation.latitude.is_not(None) & quotation.longitude.is_not(None)
+    for condition in _location_filters(bbox, near, radius_m):
+        on_map = on_map & condition
+    columns = (
+        quotation.id,
+        quotation.status,
+        quotation.total_amount,
+        quotation.latitude.label("lat"),
+        quotation.longitude.label("lng"),
+        func.coalesce(quotation.change_seq, 0).label("seq"),
+        func.coalesce(quotation.updated_at, quotation.created_at).label("updated_at"),
+    )
+    if since is None:
+        return select(*columns, false().label("removed")).where(on_map).order_by(quotation.id)
+    
+    # A delta also reports quotations that left the map: changed ones that are now
+    # without coordinates or outside the area, and deleted ones
+    changed = select(*columns, (~on_map).label("removed")).where(quotation.change_seq > since)
+    deletion = models.QuotationDeletion
+    deleted = select(
+        deletion.quotation_id,
+        null(),
+        null(),
+        null(),
+        null(),
+        deletion.change_seq,
+        deletion.deleted_at,
+        true(),
+    ).where(deletion.change_seq > since)
+    feed = union_all(changed, deleted).subquery()
+    # By change within an id, so a reused id's deletion comes before its new row
+    return select(feed).order_by(feed.c.id, feed.c.seq)
+
+
+def _map_feed_response(format: str, rows, etag: str, position: int) -> StreamingResponse:
+    """Stream ``rows``, a sync or async result, as NDJSON or GeoJSON"""
+    headers = {"ETag": etag, "X-Change-Seq": str(position)}
+    is_async = isinstance(rows, AsyncResult)
+    if format == "geojson":
+        body = _map_feed_geojson_async(rows) if is_async else _map_feed_geojson(rows)
+        return StreamingResponse(body, media_type="application/geo+json", headers=headers)
+    body = _map_feed_ndjson_async(rows) if is_async else _map_feed_ndjson(rows)
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+def _map_feed_record(row) -> dict:
+    updated_at = str(row.updated_at) if row.updated_at is not None else None
+    if row.removed:
+        return {"id": row.id, "removed": True, "seq": row.seq, "updated_at": updated_at}
+    return {
+        "id": row.id,
+        "status": row.status,
+        "total_amount": row.total_amount,
+        "lat": row.lat,
+        "lng": row.lng,
+        "seq": row.seq,
+        "updated_at": updated_at,
+    }
+
+
+def _map_feed_feature(row) -> dict:
+    record = _map_feed_record(row)
+    geometry = None
+    if not row.removed:
+        geometry = {"type": "Point", "coordinates": [record.pop("lng"), record.pop("lat")]}
+    return {
+        "type": "Feature",
+        "id": record.pop("id"),
+        "geometry": geometry,
+        "properties": record,
+    }
+
+
+def _map_feed_ndjson(rows) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(_map_feed_record(row)) + "\n"
+
+
+async def _map_feed_ndjson_async(rows: AsyncResult) -> AsyncIterator[str]:
+    async for row in rows:
+        yield json.dumps(_map_feed_record(row)) + "\n"
+
+
+def _map_feed_geojson(rows) -> Iterator[str]:
+    yield '{"type":"FeatureCollection","features":['
+    separator = ""
+    for row in rows:
+        yield separator + json.dumps(_map_feed_feature(row))
+        separator = ","
+    yield "]}"
+
+
+async def _map_feed_geojson_async(rows: AsyncResult) -> AsyncIterator[str]:
+    yield '{"type":"FeatureCollection","features":['
+    separator = ""
+    async for row in rows:
+        yield separator + json.dumps(_map_feed_feature(row))
+        separator = ","
+    yield "]}"
+
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FIELDS = ["id", "service_order_quotation_id"] + [
+    name for name in quotation_schemas.QuotationInDBBase.model_fields
+    if name not in ("id", "service_order_quotation_id")
+]
+EXPORT_ITEM_FIELDS = ["id"] + list(quotation_schemas.QuotationItemBase.model_fields)
+
+
+@router.get("/export")
+def export_quotations(
+    db: Session = Depends(get_read_db),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    status: Optional[str] = Query(None),
+    customer_name: Optional[str] = Query(None),
+    search: Optional[str] = Query(None, description="Full-text search; every word matches as a prefix"),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    near: Optional[str] = Query(None, description="lat,lng centre for a radius search"),
+    radius_m: Optional[float] = Query(None, description="Radius in metres around near"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export"),
+    include: Optional[str] = Query(None, description="items: one row per line item, quotation columns repeated"),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Export quotations as CSV or XLSX
+
+    Takes the same filters as the list endpoint. Rows are read with a
+    server-side cursor and written to the response as they arrive, so the
+    export starts immediately and memory use does not grow with its size.
+    """
+    field_set, with_items = _list_shape(fields, include)
+    if field_set is None:
+        # A full export is one row per quotation unless items are asked for
+        with_items = "items" in {name.strip() for name in (include or "").split(",")}
+    columns = [name for name in EXPORT_FIELDS if field_set is None or name in field_set]
+    query, rank = _filter_quotations(
+        db.query(models.Quotation), current_user,
+        status, customer_name, search, date_from, date_to, bbox, near, radius_m,
+    )
+    
+    entities = [getattr(models.Quotation, name) for name in columns]
+    header = list(columns)
+    order_by = [models.Quotation.created_at.desc(), models.Quotation.id.desc()]
+    if rank is not None:
+        order_by.insert(0, rank)
+    if with_items:
+        query = query.outerjoin(models.Quotation.items)
+        entities += [getattr(models.QuotationItem, name) for name in EXPORT_ITEM_FIELDS]
+        header += [f"item_{name}" for name in EXPORT_ITEM_FIELDS]
+        order_by.append(models.QuotationItem.id)
+    
+    rows = query.with_entities(*entities).order_by(*order_by).yield_per(EXPORT_BATCH_SIZE)
+    extension, media_type = FORMATS[format]
+    return StreamingResponse(
+        write_rows(format, header, (_export_row(row) for row in rows)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="quotations.{extension}"'},
+    )
+
+
+def _export_row(row) -> list:
+    return [json.dumps(value) if isinstance(value, (dict, list)) else value for value in row]
 
 
 @router.post("/", response_model=quotation_schemas.Quotation)
 def create_quotation(
     *,
     db: Session = Depends(get_db),
+    response: Response,
     quotation_in: quotation_schemas.QuotationCreate,
-    current_user: models.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Create new quotation
+
+    The header and its items are written in one flush and one commit. When
+    an ``Idempotency-Key`` header is sent, a retry with the same key and body
+    returns the stored result instead of creating a duplicate.
     """
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = idempotency.request_hash(quotation_in.model_dump(mode="json"))
+        stored = _stored_create_response(db, current_user.id, idempotency_key, fingerprint)
+        if stored is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return stored
+    
     quotation = models.Quotation(
         **quotation_in.dict(exclude={"items"}),
         created_by=current_user.id
     )
+    quotation.items = [models.QuotationItem(**item_data.dict()) for item_data in quotation_in.items]
     db.add(quotation)
-    db.commit()
-    db.refresh(quotation)
+    db.flush()
     
-    # Add quotation items
-    if quotation_in.items:
-        for item_data in quotation_in.items:
-            item = models.QuotationItem(
-                **item_data.dict(),
-                quotation_id=quotation.id
-            )
-            db.add(item)
+    # Server defaults came back with the INSERT, so no refresh is needed
+    result = quotation_schemas.Quotation.model_validate(quotation)
+    if idempotency_key:
+        idempotency.store_response(
+            db, current_user.id, idempotency_key, fingerprint, result.model_dump(mode="json")
+        )
+    
+    try:
         db.commit()
-        db.refresh(quotation)
+    except IntegrityError:
+        db.rollback()
+        if not idempotency_key:
+            raise
+        # A concurrent retry with the same key committed first
+        stored = _stored_create_response(db, current_user.id, idempotency_key, fingerprint)
+        if stored is None:
+            raise
+        response.headers["Idempotent-Replayed"] = "true"
+        return stored
     
-    return quotation
+    return result
+
+
+def _stored_create_response(db: Session, user_id: int, key: str, fingerprint: str) -> Any:
+    try:
+        return idempotency.get_stored_response(db, user_id, key, fingerprint)
+    except idempotency.IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body",
+        )
+
+
+@router.post("/import", response_model=quotation_schemas.QuotationImportResult)
+def import_quotations_file(
+    *,
+    db: Session = Depends(get_db),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Bulk import quotations from a CSV or NDJSON file
+
+    Each row is validated like ``POST /quotations/``; CSV cells for
+    ``items`` and ``location_data`` hold JSON. Rows are inserted in chunks,
+    one transaction per chunk. Invalid rows are skipped and reported with
+    their row number.
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        is_csv = filename.endswith(".csv") or (file.content_type or "").startswith("text/csv")
+        format = "csv" if is_csv else "ndjson"
+    
+    return import_quotations(db, iter_records(file.file, format), created_by=current_user.id)
 
 
 @router.get("/{quotation_id}", response_model=quotation_schemas.QuotationWithDetails)
 def read_quotation(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    response: Response,
     quotation_id: int,
-    current_user: models.User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get quotation by ID
+
+    Responses carry a weak ETag covering the quotation and the template and
+    user summaries nested in it. A matching ``If-None-Match`` gets
+    ``304 Not Modified`` after a single-row version lookup.
     """
-    quotation = db.query(models.Quotation).filter(models.Quotation.id == quotation_id).first()
-    if not quotation:
+    header = db.query(
+        models.Quotation.created_by, models.Quotation.version, models.Quotation.updated_at,
+        models.Template.version.label("template_version"),
+        models.User.name.label("user_name"), models.User.email.label("user_email"),
+    ).outerjoin(
+        models.Template, models.Template.id == models.Quotation.template_id
+    ).outerjoin(
+        models.User, models.User.id == models.Quotation.created_by
+    ).filter(models.Quotation.id == quotation_id).first()
+    if not header:
         raise HTTPException(status_code=404, detail="Quotation not found")
     
     # Check permissions
-    if current_user.role != "admin" and quotation.created_by != current_user.id:
+    if current_user.role != "admin" and header.created_by != current_user.id:
         raise HTTPException(
             status_code=403,
             detail="Not enough permissions"
         )
     
-    return quotation
+    # Users have no version; their summary is just the name and email
+    etag = make_etag(
+        "quotation", quotation_id, header.version, header.updated_at,
+        header.template_version, header.user_name, header.user_email,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    return db.query(models.Quotation).options(
+        selectinload(models.Quotation.items),
+        joinedload(models.Quotation.template),
+        joinedload(models.Quotation.created_by_user),
+    ).filter(models.Quotation.id == quotation_id).first()
 
 
 @router.put("/{quotation_id}", response_model=quotation_schemas.Quotation)
@@ -120,7 +668,7 @@ def update_quotation(
     db: Session = Depends(get_db),
     quotation_id: int,
     quotation_in: quotation_schemas.QuotationUpdate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Update a quotation
@@ -140,20 +688,26 @@ def update_quotation(
     for field, value in update_data.items():
         setattr(quotation, field, value)
     
-    # Update items if provided
+    # Update items if provided, touching only the rows that changed
     if quotation_in.items is not None:
-        # Delete existing items
-        db.query(models.QuotationItem).filter(
-            models.QuotationItem.quotation_id == quotation_id
-        ).delete()
-        
-        # Add new items
+        existing = {item.id: item for item in quotation.items}
+        kept = set()
         for item_data in quotation_in.items:
-            item = models.QuotationItem(
-                **item_data.dict(),
-                quotation_id=quotation.id
-            )
-            db.add(item)
+            if item_data.id is None:
+                quotation.items.append(_new_item(item_data.dict(exclude={"id"}, exclude_unset=True)))
+                continue
+            item = existing.get(item_data.id)
+            if item is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Item {item_data.id} does not belong to this quotation"
+                )
+            for field, value in item_data.dict(exclude={"id"}, exclude_unset=True).items():
+                setattr(item, field, value)
+            kept.add(item.id)
+        for item_id, item in existing.items():
+            if item_id not in kept:
+                quotation.items.remove(item)
     
     db.add(quotation)
     db.commit()
@@ -161,12 +715,97 @@ def update_quotation(
     return quotation
 
 
+@router.patch("/{quotation_id}/items", response_model=quotation_schemas.Quotation)
+def patch_quotation_items(
+    *,
+    db: Session = Depends(get_db),
+    quotation_id: int,
+    operations: List[quotation_schemas.QuotationItemPatchOperation],
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Apply JSON-Patch style changes to a quotation's line items
+
+    Supported operations are ``add`` (path ``/-``, value is a new item),
+    ``remove`` (path ``/{item_id}``) and ``replace`` (path ``/{item_id}``
+    with an object of fields, or ``/{item_id}/{field}`` with a single value).
+    All operations are applied in one transaction, or none are.
+    """
+    quotation = db.query(models.Quotation).options(
+        selectinload(models.Quotation.items)
+    ).filter(models.Quotation.id == quotation_id).first()
+    if not quotation:
+        raise HTTPException(status_code=404, detail="Quotation not found")
+    
+    # Check permissions
+    if current_user.role != "admin" and quotation.created_by != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+    
+    items = {item.id: item for item in quotation.items}
+    for index, operation in enumerate(operations):
+        parts = operation.path.strip("/").split("/")
+        
+        if operation.op == "add":
+            if parts != ["-"] or not isinstance(operation.value, dict):
+                raise _patch_error(index, "add needs path '/-' and an item object as value")
+            quotation.items.append(_new_item(operation.value, index))
+            continue
+        
+        item = items.get(int(parts[0])) if parts[0].isdigit() else None
+        if item is None:
+            raise _patch_error(index, f"No item at path {operation.path}")
+        
+        if operation.op == "remove":
+            if len(parts) != 1:
+                raise _patch_error(index, "remove takes a path of '/{item_id}'")
+            quotation.items.remove(item)
+            del items[item.id]
+            continue
+        
+        if len(parts) == 2:
+            changes = {parts[1]: operation.value}
+        elif len(parts) == 1 and isinstance(operation.value, dict):
+            changes = operation.value
+        else:
+            raise _patch_error(index, "replace needs '/{item_id}' with an object or '/{item_id}/{field}'")
+        try:
+            update = quotation_schemas.QuotationItemUpdate(**changes)
+        except ValidationError as exc:
+            raise _patch_error(index, str(exc))
+        unknown = set(changes) - set(quotation_schemas.QuotationItemBase.model_fields)
+        if unknown:
+            raise _patch_error(index, f"Unknown item fields: {', '.join(sorted(unknown))}")
+        for field, value in update.dict(exclude_unset=True).items():
+            setattr(item, field, value)
+    
+    db.commit()
+    db.refresh(quotation)
+    return quotation
+
+
+def _new_item(data: dict, operation_index: Optional[int] = None) -> models.QuotationItem:
+    try:
+        item_in = quotation_schemas.QuotationItemCreate(**data)
+    except ValidationError as exc:
+        if operation_index is not None:
+            raise _patch_error(operation_index, str(exc))
+        raise HTTPException(status_code=422, detail=f"Invalid new item: {exc}")
+    return models.QuotationItem(**item_in.dict())
+
+
+def _patch_error(index: int, message: str) -> HTTPException:
+    return HTTPException(status_code=422, detail=f"Operation {index}: {message}")
+
+
 @router.delete("/{quotation_id}")
 def delete_quotation(
     *,
     db: Session = Depends(get_db),
     quotation_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Delete a quotation
@@ -192,7 +831,7 @@ def duplicate_quotation(
     *,
     db: Session = Depends(get_db),
     quotation_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Duplicate a quotation
@@ -244,37 +883,25 @@ def duplicate_quotation(
 
 @router.get("/stats/overview")
 def get_quotation_stats(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get quotation statistics overview
+
+    Served from the quotation_counters table, which is kept up to date on
+    every write, so the cost does not grow with the number of quotations.
     """
-    query = db.query(models.Quotation)
-    
-    # Filter by user if not admin
-    if current_user.role != "admin":
-        query = query.filter(models.Quotation.created_by == current_user.id)
-    
-    total_quotations = query.count()
-    pending_quotations = query.filter(models.Quotation.status == "pending").count()
-    approved_quotations = query.filter(models.Quotation.status == "approved").count()
-    rejected_quotations = query.filter(models.Quotation.status == "rejected").count()
-    
-    # Calculate Total Quotation Value from approved quotations
-    total_revenue = db.query(models.Quotation.total_amount).filter(
-        and_(
-            models.Quotation.status == "approved",
-            models.Quotation.created_by == current_user.id if current_user.role != "admin" else True
-        )
-    ).all()
+    # Admins see the totals across all users
+    by_status = counters.get_counters(db, counters.user_scope(current_user))
     
-    total_revenue_amount = sum([amount[0] or 0 for amount in total_revenue])
+    def count(status: str) -> int:
+        return by_status.get(status, {}).get("count", 0)
     
     return {
-        "total_quotations": total_quotations,
-        "pending_quotations": pending_quotations,
-        "approved_quotations": approved_quotations,
-        "rejected_quotations": rejected_quotations,
-        "total_revenue": total_revenue_amount
+        "total_quotations": sum(row["count"] for row in by_status.values()),
+        "pending_quotations": count("pending"),
+        "approved_quotations": count("approved"),
+        "rejected_quotations": count("rejected"),
+        "total_revenue": by_status.get("approved", {}).get("total_amount", 0.0)
     }
\ No newline at end of file
@@ -1,27 +1,37 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
 
-from app.db.database import get_db
-from app.db import models
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.security import Principal
+from app.db.database import get_db, get_read_db
+from app.db import models, versions
 from app.schemas import template as template_schemas
-from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.auth import get_current_principal
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[template_schemas.Template])
 def read_templates(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = Query(None),
     template_type: Optional[str] = Query(None),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Retrieve templates with optional filtering
     """
+    version = versions.get_collection_version(db, versions.TEMPLATES)
+    etag = make_etag(versions.TEMPLATES, version, current_user.id, request.url.query)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
     query = db.query(models.Template)
     
     # Filter by user if not admin (only show user's templates and public ones)
@@ -45,7 +55,7 @@ def create_template(
     *,
     db: Session = Depends(get_db),
     template_in: template_schemas.TemplateCreate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Create new template
@@ -68,25 +78,46 @@ def create_template(
 @router.get("/{template_id}", response_model=template_schemas.TemplateWithDetails)
 def read_template(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    response: Response,
     template_id: int,
-    current_user: models.User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get template by ID
+
+    Responses carry a weak ETag covering the template and the user summary
+    nested in it. A matching ``If-None-Match`` gets ``304 Not Modified``
+    after a single-row version lookup.
     """
-    template = db.query(models.Template).filter(models.Template.id == template_id).first()
-    if not template:
+    header = db.query(
+        models.Template.created_by, models.Template.version, models.Template.updated_at,
+        models.User.name.label("user_name"), models.User.email.label("user_email"),
+    ).outerjoin(
+        models.User, models.User.id == models.Template.created_by
+    ).filter(models.Template.id == template_id).first()
+    if not header:
         raise HTTPException(status_code=404, detail="Template not found")
     
     # Check permissions
-    if current_user.role != "admin" and template.created_by != current_user.id:
+    if current_user.role != "admin" and header.created_by != current_user.id:
         raise HTTPException(
             status_code=403,
             detail="Not enough permissions"
         )
     
-    return template
+    # Users have no version; their summary is just the name and email
+    etag = make_etag(
+        "template", template_id, header.version, header.updated_at, header.user_name, header.user_email,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    
+    return db.query(models.Template).options(
+        joinedload(models.Template.created_by_user)
+    ).filter(models.Template.id == template_id).first()
 
 
 @router.put("/{template_id}", response_model=template_schemas.Template)
@@ -95,7 +126,7 @@ def update_template(
     db: Session = Depends(get_db),
     template_id: int,
     template_in: template_schemas.TemplateUpdate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Update a template
@@ -141,7 +172,7 @@ def delete_template(
     *,
     db: Session = Depends(get_db),
     template_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Delete a template
@@ -178,7 +209,7 @@ def duplicate_template(
     *,
     db: Session = Depends(get_db),
     template_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Duplicate a template
@@ -228,8 +259,8 @@ def duplicate_template(
 
 @router.get("/categories/list")
 def get_template_categories(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get list of template categories
@@ -249,8 +280,8 @@ def get_template_categories(
 
 @router.get("/types/list")
 def get_template_types(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get list of template types
@@ -2,11 +2,12 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.db import models
 from app.schemas import user as user_schemas
-from app.api.v1.endpoints.auth import get_current_user
-from app.core import security
+from app.api.v1.endpoints.auth import get_current_principal, get_current_user
+from app.core.password_hasher import password_hasher
+from app.core.security import Principal
 
 router = APIRouter()
 
@@ -35,7 +36,9 @@ def update_user_me(
     """
     user_data = {}
     if password is not None:
-        user_data["hashed_password"] = security.get_password_hash(password)
+        # Loading current_user started a transaction; end it so the writer connection is free during the hash
+        db.rollback()
+        user_data["hashed_password"] = password_hasher.hash_sync(password)
     if name is not None:
         user_data["name"] = name
     if email is not None:
@@ -62,10 +65,10 @@ def update_user_me(
 
 @router.get("/", response_model=List[user_schemas.User])
 def read_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Retrieve users (admin only)
@@ -84,7 +87,7 @@ def create_user(
     *,
     db: Session = Depends(get_db),
     user_in: user_schemas.UserCreate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Create new user (admin only)
@@ -101,8 +104,10 @@ def create_user(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
+    # End the lookup's transaction so the writer connection is free during the hash
+    db.rollback()
     
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = password_hasher.hash_sync(user_in.password)
     user = models.User(
         name=user_in.name,
         email=user_in.email,
@@ -118,9 +123,9 @@ def create_user(
 @router.get("/{user_id}", response_model=user_schemas.User)
 def read_user(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get user by ID
@@ -143,7 +148,7 @@ def update_user(
     db: Session = Depends(get_db),
     user_id: int,
     user_in: user_schemas.UserUpdate,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Update a user
@@ -154,15 +159,16 @@ def update_user(
             detail="Not enough permissions"
         )
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+    # Hash before the first query, so the writer connection is not held during it
     update_data = user_in.dict(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = security.get_password_hash(update_data["password"])
+        update_data["hashed_password"] = password_hasher.hash_sync(update_data["password"])
         del update_data["password"]
     
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
     for field, value in update_data.items():
         setattr(user, field, value)
     
@@ -177,7 +183,7 @@ def delete_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Delete a user (admin only)
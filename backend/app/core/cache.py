@@ -0,0 +1,144 @@
+import asyncio
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ResultCache:
+    """
+    An LRU cache of computed results bounded by an estimate of their size.
+
+    ``get_or_compute`` and ``get_or_compute_async`` coalesce concurrent
+    misses on the same key: the first caller computes the value while the
+    others wait for it. Entries
+    carry a tag; ``invalidate_tags`` drops them, and a value whose tag was
+    invalidated while it was being computed is returned but not stored.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+        # key -> (value, size, tag), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Hashable]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], tag: Hashable = None) -> Any:
+        found, value, future, generation = self._lookup(key, tag)
+        if found:
+            return value
+        if generation is None:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        return self._finish(key, future, generation, value, tag)
+
+    async def get_or_compute_async(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]], tag: Hashable = None
+    ) -> Any:
+        """``get_or_compute`` for coroutines; waiting for another caller's computation does not block the event loop"""
+        found, value, future, generation = self._lookup(key, tag)
+        if found:
+            return value
+        if generation is None:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await compute()
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        return self._finish(key, future, generation, value, tag)
+
+    def _lookup(self, key: Hashable, tag: Hashable) -> Tuple[bool, Any, Optional[Future], Optional[int]]:
+        """
+        Return (found, value, future, generation). On a miss the caller
+        either leads, with the tag's generation to finish with, or waits on
+        the leader's future, with no generation.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0], None, None
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return False, None, future, None
+            self.misses += 1
+            future = self._in_flight[key] = Future()
+            return False, None, future, self._generations.get(tag, 0)
+
+    def _fail(self, key: Hashable, future: Future, exc: BaseException) -> None:
+        with self._lock:
+            del self._in_flight[key]
+        future.set_exception(exc)
+
+    def _finish(self, key: Hashable, future: Future, generation: int, value: Any, tag: Hashable) -> Any:
+        size = _estimate_size(value)
+        with self._lock:
+            del self._in_flight[key]
+            if self._generations.get(tag, 0) == generation and size <= self.max_bytes:
+                self._store(key, value, size, tag)
+        future.set_result(value)
+        return value
+
+    def invalidate_tags(self, *tags: Hashable) -> None:
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[2] in tags]:
+                self._bytes -= self._entries.pop(key)[1]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "in_flight": len(self._in_flight),
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+    def _store(self, key: Hashable, value: Any, size: int, tag: Hashable) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        self._entries[key] = (value, size, tag)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
 import os
@@ -12,11 +12,66 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./clickquote.db"
+    # Read-only endpoints use a separate pool, optionally on a replica (defaults to DATABASE_URL)
+    DATABASE_READ_URL: Optional[str] = None
+    DATABASE_READ_POOL_SIZE: int = 10
+    DATABASE_READ_POOL_OVERFLOW: int = 10
+    # SQLite takes one writer at a time, so writes queue for one connection; raise this for PostgreSQL
+    DATABASE_WRITE_POOL_SIZE: int = 1
+    # Pragmas run on every SQLite connection (see app/db/pragmas.py)
+    SQLITE_JOURNAL_MODE: str = "wal"
+    SQLITE_SYNCHRONOUS: str = "normal"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_TEMP_STORE: str = "memory"
+    # Serve the read-heavy endpoints (quotation lists, map feed, analytics) as async handlers on an
+    # AsyncSession (aiosqlite, or asyncpg for PostgreSQL). Off by default, which keeps every handler on
+    # the thread pool and needs no async driver installed; no async engine is created while it is off
+    ASYNC_DATABASE: bool = False
     
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Access tokens carry the user's role and active flag, so they are kept short-lived;
+    # clients renew them through /auth/refresh, which reads the users row again
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # How often each process reloads revoked tokens and user revocations from the database, so a
+    # logout or role change in one worker process reaches the others (0 loads them only at startup)
+    REVOKED_TOKENS_REFRESH_SECONDS: int = 5
+    # Password hashing worker processes (0 hashes on the API threads); past PASSWORD_HASH_MAX_PENDING
+    # queued hashes, login and registration answer 503 with this Retry-After
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    # pbkdf2_sha256 rounds for new hashes; stored hashes with fewer are upgraded on the next successful login
+    PASSWORD_HASH_ROUNDS: int = 29000
+    
+    # Idempotency-Key replay window
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    
+    # Deleted quotations are reported to map-feed deltas for this long; an older since= gets 410 and must resync
+    MAP_FEED_DELETION_RETENTION_DAYS: int = 30
+    
+    # Dashboard metrics are cached per user for at most this long; quotation writes also invalidate them
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    
+    # Analytics bucket quotations by their created_at date in this timezone (the created_day column)
+    TIMEZONE: str = "Europe/London"
+    
+    # "sql" reads the daily rollup; "columnar" answers analytics from an in-memory NumPy snapshot (needs numpy)
+    ANALYTICS_ENGINE: str = "sql"
+    
+    # Cached analytics results are reused within time buckets of this length; quotation writes also invalidate them
+    ANALYTICS_CACHE_BUCKET_SECONDS: int = 300
+    # Upper bound on the memory held by cached analytics results, least recently used evicted first
+    ANALYTICS_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    
+    # Report generation: worker processes (0 disables them), polling interval and output directory
+    REPORT_WORKERS: int = 2
+    REPORT_POLL_SECONDS: int = 10
+    REPORTS_DIR: str = "reports"
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
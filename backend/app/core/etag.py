@@ -0,0 +1,30 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that identify a representation"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
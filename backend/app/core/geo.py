@@ -0,0 +1,142 @@
+import math
+import re
+from typing import Any, List, Optional, Tuple
+
+# Metres per degree of latitude; longitude degrees shrink by cos(latitude)
+METRES_PER_DEGREE = 111320.0
+MAX_RADIUS_M = 100000
+
+# Outward code of a UK postcode ("SW7" in "SW7 2AZ"), optionally followed by the inward code
+POSTCODE_RE = re.compile(r"\b([A-Z]{1,2}[0-9][A-Z0-9]?)(?:\s*([0-9][A-Z]{2}))?\b")
+
+
+def extract_coordinates(location_data: Optional[dict]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Return (lat, lng) from a quotation's ``location_data`` JSON, or
+    (None, None) when it carries no usable coordinates.
+    """
+    if not isinstance(location_data, dict):
+        return None, None
+    try:
+        lat = float(location_data["lat"])
+        lng = float(location_data["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None
+    return lat, lng
+
+
+def extract_postcode_district(location_data: Optional[dict], site_address: Optional[str] = None) -> Optional[str]:
+    """
+    Return the postcode district ("SW7") of a quotation, taken from
+    ``location_data["postcode"]``, falling back to the address text.
+    """
+    postcode = location_data.get("postcode") if isinstance(location_data, dict) else None
+    if isinstance(postcode, str):
+        match = POSTCODE_RE.match(postcode.strip().upper())
+        if match:
+            return match.group(1)
+    # Free-text addresses only count a full postcode, so house numbers and US zips are ignored
+    addresses = [location_data.get("address")] if isinstance(location_data, dict) else []
+    for address in addresses + [site_address]:
+        if isinstance(address, str):
+            full = [outward for outward, inward in POSTCODE_RE.findall(address.upper()) if inward]
+            if full:
+                return full[-1]
+    return None
+
+
+def postcode_area(district: Optional[str]) -> Optional[str]:
+    """Return the letters of a postcode district ("SW" for "SW7")"""
+    if not district:
+        return None
+    match = re.match(r"[A-Z]+", district)
+    return match.group(0) if match else None
+
+
+def location_columns(location_data: Optional[dict], site_address: Optional[str] = None) -> dict:
+    """The indexed columns a quotation derives from its location on write"""
+    latitude, longitude = extract_coordinates(location_data)
+    district = extract_postcode_district(location_data, site_address)
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "postcode_district": district,
+        "postcode_area": postcode_area(district),
+    }
+
+
+def _parse_floats(value: str) -> List[float]:
+    try:
+        return [float(part) for part in value.split(",")]
+    except ValueError:
+        return []
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse ``min_lng,min_lat,max_lng,max_lat`` (GeoJSON order).
+
+    Raises ``ValueError`` if the box is malformed.
+    """
+    parts = _parse_floats(bbox)
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    min_lng, min_lat, max_lng, max_lat = parts
+    if min_lat > max_lat or min_lng > max_lng:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_point(point: str) -> Tuple[float, float]:
+    """
+    Parse ``lat,lng``.
+
+    Raises ``ValueError`` if the point is malformed.
+    """
+    parts = _parse_floats(point)
+    if len(parts) != 2:
+        raise ValueError("near must be lat,lng")
+    lat, lng = parts
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("near is out of range")
+    return lat, lng
+
+
+def location_conditions(
+    lat_column: Any,
+    lng_column: Any,
+    bbox: Optional[str] = None,
+    near: Optional[str] = None,
+    radius_m: Optional[float] = None,
+) -> List[Any]:
+    """
+    Build SQL conditions restricting rows to a bounding box and/or a radius.
+
+    Both filters start with a range on the indexed latitude/longitude
+    columns. The radius check then uses an equirectangular distance, which
+    is accurate to well under 1% at the distances a map viewport covers.
+    """
+    conditions = []
+    if bbox:
+        min_lng, min_lat, max_lng, max_lat = parse_bbox(bbox)
+        conditions += [
+            lat_column.between(min_lat, max_lat),
+            lng_column.between(min_lng, max_lng),
+        ]
+    if near:
+        if radius_m is None or not 0 < radius_m <= MAX_RADIUS_M:
+            raise ValueError(f"radius_m must be between 0 and {MAX_RADIUS_M}")
+        lat, lng = parse_point(near)
+        lat_delta = radius_m / METRES_PER_DEGREE
+        lng_scale = METRES_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6)
+        lng_delta = radius_m / lng_scale
+        dy = (lat_column - lat) * METRES_PER_DEGREE
+        dx = (lng_column - lng) * lng_scale
+        conditions += [
+            lat_column.between(lat - lat_delta, lat + lat_delta),
+            lng_column.between(lng - lng_delta, lng + lng_delta),
+            dx * dx + dy * dy <= radius_m * radius_m,
+        ]
+    return conditions
@@ -0,0 +1,32 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+LOCAL_TIMEZONE = ZoneInfo(settings.TIMEZONE)
+
+
+def local_day(moment: Optional[datetime]) -> Optional[date]:
+    """The calendar date of ``moment`` in LOCAL_TIMEZONE; naive datetimes are taken as UTC, as stored"""
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(LOCAL_TIMEZONE).date()
+
+
+def local_today() -> date:
+    return datetime.now(LOCAL_TIMEZONE).date()
+
+
+def last_days(days: int) -> Tuple[date, date]:
+    """First and last day of the ``days`` local days up to and including today"""
+    end_day = local_today()
+    return end_day - timedelta(days=days - 1), end_day
+
+
+def created_columns(created_at: Optional[datetime] = None) -> dict:
+    """created_at (now in UTC if not given) and the created_day derived from it, for inserts that bypass the ORM"""
+    created_at = created_at or datetime.utcnow()
+    return {"created_at": created_at, "created_day": local_day(created_at)}
@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Tuple
+
+
+def encode_cursor(created_at: Any, quotation_id: int) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page.
+
+    ``created_at`` is kept exactly as the database stores it so that the
+    next page compares against the same representation the index is
+    sorted on.
+    """
+    raw = json.dumps([str(created_at), quotation_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises ``ValueError`` if the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, quotation_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(quotation_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, quotation_id
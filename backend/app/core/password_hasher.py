@@ -0,0 +1,105 @@
+"""
+Hash and verify passwords in a pool of worker processes.
+
+A pbkdf2 hash takes tens of milliseconds of CPU. Run on the API threads, a
+burst of logins or registrations occupies the whole thread pool and every
+other request queues behind it. Here the hashing runs in separate processes.
+Async handlers await the result without holding a thread, and sync handlers
+block only their own thread. At most PASSWORD_HASH_MAX_PENDING hashes may be
+queued or running; past that, ``HashingOverloaded`` is raised, and main.py
+turns it into a 503 with Retry-After instead of letting the queue grow.
+
+Without a running pool (PASSWORD_HASH_WORKERS=0, scripts, tests), hashing
+runs on the calling thread or the API thread pool, with the same limit.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
+
+
+class HashingOverloaded(Exception):
+    """Too many password hashes are already queued"""
+
+
+class PasswordHasher:
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self, workers: int = None) -> None:
+        workers = settings.PASSWORD_HASH_WORKERS if workers is None else workers
+        if workers <= 0 or self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+                raise HashingOverloaded()
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def _run(self, fn: Callable, *args):
+        self._reserve()
+        try:
+            pool = self._pool
+            if pool is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(pool.submit(fn, *args))
+        finally:
+            self._release()
+
+    def _run_sync(self, fn: Callable, *args):
+        self._reserve()
+        try:
+            pool = self._pool
+            if pool is None:
+                return fn(*args)
+            return pool.submit(fn, *args).result()
+        finally:
+            self._release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against its stored hash.
+
+        Returns (matches, new hash); the new hash is set when the stored one
+        was made with outdated parameters and should replace it.
+        """
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def hash_sync(self, password: str) -> str:
+        """``hash`` for sync handlers; blocks the calling thread until the hash is ready"""
+        return self._run_sync(get_password_hash, password)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,252 @@
+"""
+Streaming CSV, XLSX and PDF writers.
+
+Each writer takes a header and an iterable of rows and yields the file as
+byte chunks while it consumes the rows, so callers can write to a file or a
+response without holding the whole table in memory. XLSX and PDF are
+written by hand in their simplest valid form: one worksheet with inline
+strings, and a paginated monospaced table.
+"""
+
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+FORMATS = {
+    # format: (file extension, media type)
+    "csv": ("csv", "text/csv"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "pdf": ("pdf", "application/pdf"),
+}
+
+# Report.format values as stored ("PDF", "CSV", "Excel")
+FORMAT_ALIASES = {"excel": "xlsx", "xls": "xlsx"}
+
+FLUSH_BYTES = 64 * 1024
+
+
+def normalize_format(value: Optional[str]) -> str:
+    """Map a user-facing format name to a key of FORMATS; raises ValueError"""
+    key = (value or "").strip().lower()
+    key = FORMAT_ALIASES.get(key, key)
+    if key not in FORMATS:
+        raise ValueError(f"Unsupported format '{value}'; use one of csv, xlsx, pdf")
+    return key
+
+
+def write_rows(fmt: str, header: Sequence[str], rows: Iterable[Sequence[Any]], title: str = "") -> Iterator[bytes]:
+    if fmt == "csv":
+        return csv_chunks(header, rows)
+    if fmt == "xlsx":
+        return xlsx_chunks(header, rows)
+    return pdf_chunks(title, header, rows)
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+class _Sink:
+    """A write-only file object that hands its bytes back in chunks"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._size = 0
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if data:
+            self._parts.append(bytes(data))
+            self._size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def ready(self) -> bool:
+        return self._size >= FLUSH_BYTES
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts, self._size = [], 0
+        return data
+
+
+# CSV
+
+def csv_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+# XLSX
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=" ", timespec="seconds")
+    elif isinstance(value, date):
+        value = value.isoformat()
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>'
+
+
+def xlsx_chunks(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    sink = _Sink()
+    # The sink cannot seek, so zipfile writes sizes in data descriptors after each member
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for row in _prepend(header, rows):
+                sheet.write(("<row>" + "".join(_xlsx_cell(value) for value in row) + "</row>").encode("utf-8"))
+                if sink.ready():
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def _prepend(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+    yield header
+    yield from rows
+
+
+# PDF
+
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595  # A4 landscape, in points
+MARGIN = 36
+FONT_SIZE = 7
+LINE_HEIGHT = 9
+CHAR_WIDTH = FONT_SIZE * 0.6  # Courier advance width
+LINES_PER_PAGE = int((PAGE_HEIGHT - 2 * MARGIN) / LINE_HEIGHT) - 2
+
+
+def _pdf_string(text: str) -> str:
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf_columns(header: Sequence[str]) -> List[int]:
+    """Split the printable width evenly between columns, in characters"""
+    total = int((PAGE_WIDTH - 2 * MARGIN) / CHAR_WIDTH)
+    width = max(total // max(len(header), 1), 4)
+    return [width] * len(header)
+
+
+def _pdf_line(values: Sequence[Any], widths: List[int]) -> str:
+    return "".join(_text(value)[: width - 1].ljust(width) for value, width in zip(values, widths)).rstrip()
+
+
+def pdf_chunks(title: str, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """
+    Write a table as a minimal PDF, one page at a time.
+
+    Objects 1-3 are the catalog, page tree and font; the page tree is written
+    last because its list of pages is only known at the end.
+    """
+    offsets = {}
+    position = 0
+    page_ids: List[int] = []
+    next_id = 4
+    widths = _pdf_columns(header)
+    header_line = _pdf_line(header, widths)
+
+    def emit(object_id: int, body: bytes) -> bytes:
+        nonlocal position
+        offsets[object_id] = position
+        data = f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n"
+        position += len(data)
+        return data
+
+    def page(lines: List[str]) -> bytes:
+        nonlocal next_id
+        text = [f"BT /F1 {FONT_SIZE} Tf {LINE_HEIGHT} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td"]
+        heading = f"{title} - page {len(page_ids) + 1}" if title else f"Page {len(page_ids) + 1}"
+        for line in [heading, "", header_line] + lines:
+            text.append(f"({_pdf_string(line)}) Tj T*")
+        text.append("ET")
+        content = "\n".join(text).encode("latin-1")
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+        return emit(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode(),
+        ) + emit(content_id, f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+
+    head = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position = len(head)
+    yield head + emit(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>")
+
+    lines: List[str] = []
+    for row in rows:
+        lines.append(_pdf_line(row, widths))
+        if len(lines) == LINES_PER_PAGE:
+            yield page(lines)
+            lines = []
+    if lines or not page_ids:
+        yield page(lines)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    tail = emit(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+    tail += emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    xref_at = position
+    entries = ["0000000000 65535 f "] + [f"{offsets[i]:010d} 00000 n " for i in range(1, next_id)]
+    tail += (
+        f"xref\n0 {next_id}\n" + "\n".join(entries) + "\n"
+        f"trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n"
+    ).encode()
+    yield tail
@@ -0,0 +1,89 @@
+"""
+In-memory revocation list for JWTs.
+
+Access tokens carry the user's role and active flag, so authorization reads
+them from the token instead of the users row. A token keeps those claims
+until it expires; this list is how it stops working sooner. It holds:
+
+- tokens: the ``jti`` of each logged-out or used-up token, until the token
+  would have expired anyway
+- users: per user, when their role or active flag last changed; access
+  tokens issued before that are rejected, and the client refreshes to get
+  one with the current claims
+
+Entries are dropped once nothing they could match is still valid, so the
+list stays as small as the number of recent logouts and user changes.
+
+The list belongs to one process. Both kinds of entries are also stored in
+the database (app/db/revocations.py), loaded on startup and reloaded every
+REVOKED_TOKENS_REFRESH_SECONDS, so another worker process picks up a
+logout or a user change within that interval.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from app.core.config import settings
+
+
+class RevocationList:
+    def __init__(self, user_ttl: float):
+        # A user entry can only match access tokens, which all expire within user_ttl seconds
+        self.user_ttl = user_ttl
+        self._tokens: Dict[str, float] = {}
+        self._users: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._tokens[jti] = expires_at
+            self._prune()
+
+    def revoke_tokens(self, tokens: Dict[str, float]) -> None:
+        """``revoke_token`` for many (jti, expires at) pairs at once"""
+        with self._lock:
+            self._tokens.update(tokens)
+            self._prune()
+
+    def revoke_user(self, user_id: int, revoked_at: float = None) -> None:
+        """Reject the user's access tokens issued until ``revoked_at`` (Unix time, default now)"""
+        self.revoke_users({user_id: time.time() if revoked_at is None else revoked_at})
+
+    def revoke_users(self, users: Dict[int, float]) -> None:
+        """``revoke_user`` for many (user id, revoked at) pairs; an entry only ever moves later"""
+        with self._lock:
+            for user_id, revoked_at in users.items():
+                if revoked_at > self._users.get(user_id, 0):
+                    self._users[user_id] = revoked_at
+            self._prune()
+
+    def is_revoked(self, claims: dict) -> bool:
+        """Whether a token with these (already verified) claims has been revoked"""
+        with self._lock:
+            if claims.get("jti") in self._tokens:
+                return True
+            # Refresh tokens are checked against the users row instead
+            if claims.get("typ") != "access":
+                return False
+            revoked_at = self._users.get(int(claims["sub"]))
+        return revoked_at is not None and claims.get("iat", 0) < revoked_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"tokens": len(self._tokens), "users": len(self._users)}
+
+    def _prune(self) -> None:
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._tokens.items() if expires_at <= now]:
+            del self._tokens[jti]
+        for user_id in [user_id for user_id, at in self._users.items() if at + self.user_ttl <= now]:
+            del self._users[user_id]
+
+
+revocation_list = RevocationList(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
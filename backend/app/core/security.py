@@ -1,5 +1,7 @@
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, NamedTuple, Optional, Tuple, Union
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -7,26 +9,66 @@ from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Hashes below PASSWORD_HASH_ROUNDS count as outdated and are replaced on the next successful login
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 
+class Principal(NamedTuple):
+    """The authenticated user as far as authorization needs it"""
+    id: int
+    role: str
+    is_active: bool
+
+
+def principal_claims(principal: Principal) -> dict:
+    """The claims an access token carries so authorization needs no users lookup"""
+    return {"sub": str(principal.id), "role": principal.role, "active": principal.is_active}
+
+
+def principal_from_claims(claims: dict) -> Optional[Principal]:
+    """The principal an access token was issued to, or None if the claims are incomplete"""
+    try:
+        return Principal(int(claims["sub"]), claims["role"], bool(claims["active"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _create_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
+    to_encode = data.copy()
+    # iat to the microsecond, so a token issued just after a revocation is not mistaken for one from before it;
+    # jti names this token in the revocation list
+    to_encode.update({
+        "exp": datetime.utcnow() + expires_delta,
+        "iat": time.time(),
+        "jti": uuid.uuid4().hex,
+        "typ": token_type,
+    })
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def create_access_token(
     data: dict, expires_delta: Union[timedelta, None] = None
 ) -> str:
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-
-def decode_access_token(token: str) -> dict:
+    return _create_token(
+        data, "access", expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+
+def create_refresh_token(
+    data: dict, expires_delta: Union[timedelta, None] = None
+) -> str:
+    return _create_token(
+        data, "refresh", expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+
+
+def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
@@ -38,5 +80,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Return (matches, new hash), with a new hash only when the stored one uses outdated parameters"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
\ No newline at end of file
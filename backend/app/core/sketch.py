@@ -0,0 +1,70 @@
+"""
+Log-bucketed quantile sketch (the DDSketch scheme).
+
+A positive value v falls into bucket ceil(log(v) / log(GAMMA)), so every
+value in a bucket is within RELATIVE_ACCURACY of the bucket's
+representative value, and a quantile read from the bucket counts carries
+the same relative error whatever the number of values. Zero and negative
+values share ZERO_BUCKET. A sketch is just a count per bucket, so two
+sketches merge by adding counts and a value is removed by subtracting one,
+which is what lets quotation writes update stored sketches with deltas.
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+# Below the index of any positive float
+ZERO_BUCKET = -1_000_000
+
+
+def bucket_index(value: Optional[float]) -> int:
+    if value is None or value <= 0:
+        return ZERO_BUCKET
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    """The value reported for a bucket, within RELATIVE_ACCURACY of everything in it"""
+    if index == ZERO_BUCKET:
+        return 0.0
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+class QuantileSketch:
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = {}
+        if counts:
+            self.merge(counts.items())
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, value: Optional[float], count: int = 1) -> None:
+        self.merge([(bucket_index(value), count)])
+
+    def merge(self, buckets: Iterable[Tuple[int, int]]) -> None:
+        """Add (bucket, count) pairs, e.g. another sketch's ``counts.items()``"""
+        for index, count in buckets:
+            total = self.counts.get(index, 0) + count
+            if total > 0:
+                self.counts[index] = total
+            else:
+                self.counts.pop(index, None)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The value at quantile ``q`` (0 to 1), or None for an empty sketch"""
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen > rank:
+                return bucket_value(index)
+        return bucket_value(max(self.counts))
@@ -0,0 +1,82 @@
+"""
+Result cache for the analytics endpoints.
+
+A cached handler's result is keyed by (endpoint, user scope, query
+parameters, time bucket). The bucket is the current time divided by the
+endpoint's bucket length, so figures that depend on "today" roll over on
+their own; older buckets are never read again and age out of the LRU.
+Concurrent identical misses share one computation.
+
+Quotation writes drop the entries of every scope they affect twice: when
+the change is flushed, and again when its transaction commits, so a
+request that read the pre-commit figures in between cannot keep them.
+"""
+
+import inspect
+import time
+from functools import wraps
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.cache import ResultCache
+from app.core.config import settings
+from app.db.counters import affected_scopes, user_scope
+from app.db.events import QuotationChange, on_quotation_change
+
+analytics_cache = ResultCache(settings.ANALYTICS_CACHE_MAX_BYTES)
+
+# Handler arguments that are not part of the cache key
+_UNKEYED = ("db", "current_user")
+
+_PENDING_SCOPES_KEY = "analytics_cache_pending_scopes"
+
+
+@on_quotation_change
+def invalidate_analytics(connection: Connection, changes: List[QuotationChange]) -> None:
+    scopes = affected_scopes(changes)
+    analytics_cache.invalidate_tags(*scopes)
+    connection.info.setdefault(_PENDING_SCOPES_KEY, set()).update(scopes)
+
+
+@event.listens_for(Engine, "commit")
+def _invalidate_on_commit(connection: Connection) -> None:
+    scopes = connection.info.pop(_PENDING_SCOPES_KEY, None)
+    if scopes:
+        analytics_cache.invalidate_tags(*scopes)
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_on_rollback(connection: Connection) -> None:
+    connection.info.pop(_PENDING_SCOPES_KEY, None)
+
+
+def cached_analytics(name: str, bucket_seconds: Optional[int] = None) -> Callable:
+    """
+    Cache an analytics endpoint handler per user scope and query parameters.
+
+    The handler must take ``current_user`` and its other arguments as
+    keywords, as FastAPI calls it; async handlers get an async wrapper.
+    ``bucket_seconds`` defaults to ANALYTICS_CACHE_BUCKET_SECONDS.
+    """
+    def decorator(handler: Callable) -> Callable:
+        def cache_key(kwargs: dict) -> Tuple[Hashable, int]:
+            scope = user_scope(kwargs["current_user"])
+            params = tuple(sorted((key, value) for key, value in kwargs.items() if key not in _UNKEYED))
+            bucket = int(time.time() // (bucket_seconds or settings.ANALYTICS_CACHE_BUCKET_SECONDS))
+            return (name, scope, params, bucket), scope
+
+        if inspect.iscoroutinefunction(handler):
+            @wraps(handler)
+            async def async_wrapper(**kwargs: Any) -> Any:
+                key, scope = cache_key(kwargs)
+                return await analytics_cache.get_or_compute_async(key, lambda: handler(**kwargs), tag=scope)
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(**kwargs: Any) -> Any:
+            key, scope = cache_key(kwargs)
+            return analytics_cache.get_or_compute(key, lambda: handler(**kwargs), tag=scope)
+        return wrapper
+    return decorator
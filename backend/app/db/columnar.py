@@ -0,0 +1,277 @@
+"""
+In-memory columnar snapshot of quotations for the analytics endpoints.
+
+With ``ANALYTICS_ENGINE=columnar`` and numpy installed, the analytics
+endpoints answer from NumPy arrays instead of SQL: one array per column,
+one element per quotation, and every aggregate is a boolean mask followed
+by ``bincount``. Strings (status, template type, postcode district) are
+stored as small integer codes.
+
+The snapshot is refreshed lazily before each query. An unchanged quotations
+collection version costs a single-row lookup. Otherwise the rows whose
+``updated_at`` is at or after the last watermark are merged in, and a row
+count mismatch (a delete) triggers a full reload.
+"""
+
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, func, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.geo import postcode_area
+from app.db import models, versions
+from app.db.counters import ALL_USERS
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the SQL path is used without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Rows whose updated_at falls this close to the watermark are re-read, so a
+# write that committed just after the previous refresh is not skipped
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+class _Codes:
+    """Map strings to small integer codes; code 0 is reserved for missing values"""
+
+    def __init__(self):
+        self.names: List[Optional[str]] = [None]
+        self._codes: Dict[Optional[str], int] = {None: 0, "": 0}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+    def code(self, value: Optional[str]) -> Optional[int]:
+        return self._codes.get(value)
+
+
+def _epoch_day(day: date) -> int:
+    return (day - date(1970, 1, 1)).days
+
+
+class ColumnarSnapshot:
+    COLUMNS = ("id", "user_id", "status", "template_type", "district", "created_day", "amount")
+
+    def __init__(self):
+        self.statuses = _Codes()
+        self.template_types = _Codes()
+        self.districts = _Codes()
+        self.columns: Optional[Dict[str, "np.ndarray"]] = None
+        self.version: Optional[int] = None
+        self.watermark: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # Loading
+
+    def refresh(self, db: Session) -> None:
+        version = versions.get_collection_version(db, versions.QUOTATIONS)
+        if self._is_current(version):
+            return
+        # Query outside the lock: on the async database stack requests share a
+        # thread, and one waiting for the lock would stall the one holding it
+        if self.columns is None:
+            self._apply_all(version, self._fetch_all(db))
+            return
+        changed = self._fetch_changes(db, self.watermark)
+        total = db.query(func.count(models.Quotation.id)).scalar()
+        if not self._apply_changes(version, changed, total):
+            # Rows were deleted; the watermark cannot see that, so start over
+            self._apply_all(version, self._fetch_all(db))
+
+    def _is_current(self, version: int) -> bool:
+        return self.columns is not None and self.version is not None and version <= self.version
+
+    def _select(self):
+        table = models.Quotation.__table__
+        return select(
+            table.c.id,
+            table.c.created_by,
+            table.c.status,
+            table.c.template_type,
+            table.c.postcode_district,
+            type_coerce(table.c.created_day, String),
+            table.c.total_amount,
+            type_coerce(table.c.updated_at, String),
+        )
+
+    def _encode(self, rows) -> Tuple[Dict[str, "np.ndarray"], Optional[str]]:
+        count = len(rows)
+        ids = np.empty(count, dtype=np.int64)
+        users = np.empty(count, dtype=np.int32)
+        statuses = np.empty(count, dtype=np.int8)
+        template_types = np.empty(count, dtype=np.int8)
+        districts = np.empty(count, dtype=np.int16)
+        amounts = np.empty(count, dtype=np.float64)
+        created = []
+        watermark = None
+        for i, (quotation_id, user_id, status, template_type, district, created_day, amount, updated_at) in enumerate(rows):
+            ids[i] = quotation_id
+            users[i] = user_id or ALL_USERS
+            statuses[i] = self.statuses.encode(status)
+            template_types[i] = self.template_types.encode(template_type)
+            districts[i] = self.districts.encode(district)
+            amounts[i] = amount or 0.0
+            created.append(created_day or "1970-01-01")
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+        # Days since 1970-01-01
+        created_day = np.array(created, dtype="datetime64[D]").astype(np.int32)
+        columns = {
+            "id": ids, "user_id": users, "status": statuses, "template_type": template_types,
+            "district": districts, "created_day": created_day, "amount": amounts,
+        }
+        return columns, watermark
+
+    def _fetch_all(self, db: Session) -> list:
+        table = models.Quotation.__table__
+        return db.execute(self._select().order_by(table.c.id)).all()
+
+    def _fetch_changes(self, db: Session, watermark: Optional[str]) -> list:
+        table = models.Quotation.__table__
+        query = self._select().order_by(table.c.id)
+        if watermark:
+            since = datetime.fromisoformat(watermark[:19].replace("T", " ")) - WATERMARK_OVERLAP
+            query = query.where(type_coerce(table.c.updated_at, String) >= since.strftime("%Y-%m-%d %H:%M:%S"))
+        return db.execute(query).all()
+
+    def _apply_all(self, version: int, rows: list) -> None:
+        with self._lock:
+            if self._is_current(version):
+                return
+            self.columns, self.watermark = self._encode(rows)
+            self.version = version
+        logger.info("Loaded columnar snapshot of %d quotations", len(rows))
+
+    def _apply_changes(self, version: int, rows: list, total: int) -> bool:
+        """Merge changed rows in; returns False when ``total`` shows rows were deleted since the last load"""
+        with self._lock:
+            if self._is_current(version):
+                return True
+            changed, watermark = self._encode(rows)
+
+            columns = self.columns
+            positions = np.searchsorted(columns["id"], changed["id"])
+            in_range = positions < len(columns["id"])
+            existing = np.zeros(len(changed["id"]), dtype=bool)
+            existing[in_range] = columns["id"][positions[in_range]] == changed["id"][in_range]
+
+            merged = {}
+            for name in self.COLUMNS:
+                column = columns[name].copy()
+                column[positions[existing]] = changed[name][existing]
+                merged[name] = np.concatenate([column, changed[name][~existing]])
+            if not np.all(merged["id"][1:] > merged["id"][:-1]):
+                order = np.argsort(merged["id"], kind="stable")
+                merged = {name: column[order] for name, column in merged.items()}
+
+            if total != len(merged["id"]):
+                return False
+            self.columns = merged
+            if watermark and (self.watermark is None or watermark > self.watermark):
+                self.watermark = watermark
+            self.version = version
+        return True
+
+    # Queries
+
+    @staticmethod
+    def _mask(columns: Dict[str, "np.ndarray"], scope: int, start_day: date, end_day: date):
+        created_day = columns["created_day"]
+        mask = (created_day >= _epoch_day(start_day)) & (created_day <= _epoch_day(end_day))
+        if scope != ALL_USERS:
+            mask &= columns["user_id"] == scope
+        return mask
+
+    def status_totals(self, scope: int, start_day: date, end_day: date) -> Dict[str, Tuple[int, float]]:
+        """Return {status: (count, amount)} for quotations created from ``start_day`` to ``end_day``"""
+        columns = self.columns
+        mask = self._mask(columns, scope, start_day, end_day)
+        statuses = columns["status"][mask]
+        size = len(self.statuses.names)
+        counts = np.bincount(statuses, minlength=size)
+        amounts = np.bincount(statuses, weights=columns["amount"][mask], minlength=size)
+        return {
+            self.statuses.names[code] or "": (int(counts[code]), float(amounts[code]))
+            for code in np.flatnonzero(counts)
+        }
+
+    def daily_revenue(self, scope: int, start_day: date, end_day: date) -> List[Tuple[date, float]]:
+        """Return (day, approved revenue) for each day that has an approved quotation"""
+        approved = self.statuses.code("approved")
+        if approved is None:
+            return []
+        columns = self.columns
+        mask = self._mask(columns, scope, start_day, end_day) & (columns["status"] == approved)
+        days = columns["created_day"][mask] - _epoch_day(start_day)
+        size = (end_day - start_day).days + 1
+        counts = np.bincount(days, minlength=size)
+        revenue = np.bincount(days, weights=columns["amount"][mask], minlength=size)
+        return [
+            (start_day + timedelta(days=int(day)), float(revenue[day]))
+            for day in np.flatnonzero(counts)
+        ]
+
+    def geographical(
+        self, scope: int, start_day: date, end_day: date, status: Optional[str] = None, group_by: str = "district"
+    ) -> List[dict]:
+        """Return quotations, approved revenue and conversion rate per postcode district or area"""
+        columns = self.columns
+        mask = self._mask(columns, scope, start_day, end_day)
+        if status:
+            code = self.statuses.code(status)
+            if code is None:
+                return []
+            mask &= columns["status"] == code
+        districts = columns["district"][mask]
+        names = self.districts.names
+        if group_by == "area":
+            # Map each district code to an area code, then group on those instead
+            names = [None] + sorted({postcode_area(name) for name in self.districts.names[1:]})
+            area_codes = {name: code for code, name in enumerate(names)}
+            lookup = np.array([0] + [area_codes[postcode_area(name)] for name in self.districts.names[1:]], dtype=np.int16)
+            districts = lookup[districts]
+        size = len(names)
+        counts = np.bincount(districts, minlength=size)
+        approved_code = self.statuses.code("approved")
+        approved = columns["status"][mask] == approved_code if approved_code is not None else np.zeros(len(districts), dtype=bool)
+        approved_counts = np.bincount(districts[approved], minlength=size)
+        revenue = np.bincount(districts[approved], weights=columns["amount"][mask][approved], minlength=size)
+        return [
+            {
+                "location": names[code],
+                "quotations": int(counts[code]),
+                "revenue": round(float(revenue[code]), 2),
+                "conversion_rate": round(float(approved_counts[code] / counts[code] * 100), 2),
+            }
+            for code in np.flatnonzero(counts)
+            if code != 0
+        ]
+
+
+_snapshot = ColumnarSnapshot()
+_warned = False
+
+
+def columnar_engine(db: Session) -> Optional[ColumnarSnapshot]:
+    """Return the refreshed snapshot, or None when analytics should use SQL"""
+    global _warned
+    if settings.ANALYTICS_ENGINE != "columnar":
+        return None
+    if np is None:
+        if not _warned:
+            logger.warning("ANALYTICS_ENGINE=columnar needs numpy; falling back to SQL")
+            _warned = True
+        return None
+    _snapshot.refresh(db)
+    return _snapshot
@@ -0,0 +1,88 @@
+from typing import Dict, List, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.security import Principal
+from app.db import models
+from app.db.events import QuotationChange, on_quotation_change
+from app.db.upsert import increment_rows
+
+ALL_USERS = 0
+
+
+def user_scope(user: Principal) -> int:
+    """The scope a user's figures are kept under: ALL_USERS for admins, who see every quotation"""
+    return ALL_USERS if user.role == "admin" else user.id
+
+
+def affected_scopes(changes: List[QuotationChange]) -> Set[int]:
+    """The scopes whose figures ``changes`` alter: every creator involved, plus ALL_USERS"""
+    scopes = {ALL_USERS}
+    for change in changes:
+        for state in change:
+            if state is not None and state.created_by is not None:
+                scopes.add(state.created_by)
+    return scopes
+
+
+@on_quotation_change
+def update_counters(connection: Connection, changes: List[QuotationChange]) -> None:
+    """Apply the count and amount deltas of ``changes`` to quotation_counters"""
+    rows = []
+    for change in changes:
+        for state, sign in ((change.old, -1), (change.new, 1)):
+            if state is None:
+                continue
+            scopes = [ALL_USERS] if state.created_by is None else [ALL_USERS, state.created_by]
+            for user_id in scopes:
+                rows.append({
+                    "user_id": user_id,
+                    "status": state.status or "",
+                    "count": sign,
+                    "total_amount": sign * (state.total_amount or 0.0),
+                })
+    increment_rows(connection, models.QuotationCounter.__table__, ("user_id", "status"), rows)
+
+
+def get_counters(db: Session, user_id: int = ALL_USERS) -> Dict[str, dict]:
+    """Return {status: {"count", "total_amount"}} for one user or for everyone"""
+    rows = db.query(models.QuotationCounter).filter(models.QuotationCounter.user_id == user_id).all()
+    return {
+        row.status: {"count": row.count, "total_amount": row.total_amount}
+        for row in rows
+    }
+
+
+def rebuild_counters(db: Session) -> int:
+    """
+    Recompute quotation_counters from the quotations table.
+
+    Returns the number of counter rows written.
+    """
+    quotations = models.Quotation.__table__
+    counters = models.QuotationCounter.__table__
+    status = func.coalesce(quotations.c.status, "")
+    
+    per_user = select(
+        quotations.c.created_by, status, func.count(), func.coalesce(func.sum(quotations.c.total_amount), 0.0)
+    ).where(quotations.c.created_by.is_not(None)).group_by(quotations.c.created_by, status)
+    overall = select(
+        status, func.count(), func.coalesce(func.sum(quotations.c.total_amount), 0.0)
+    ).group_by(status)
+    
+    rows = [
+        {"user_id": user_id, "status": row_status, "count": count, "total_amount": amount}
+        for user_id, row_status, count, amount in db.execute(per_user)
+    ]
+    rows += [
+        {"user_id": ALL_USERS, "status": row_status, "count": count, "total_amount": amount}
+        for row_status, count, amount in db.execute(overall)
+    ]
+    
+    db.execute(counters.delete())
+    if rows:
+        db.execute(counters.insert(), rows)
+    db.commit()
+    return len(rows)
@@ -0,0 +1,75 @@
+from datetime import date
+from typing import List
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.local_time import local_day, local_today
+from app.db import models
+from app.db.counters import ALL_USERS
+from app.db.events import QuotationChange, on_quotation_change
+from app.db.upsert import increment_rows
+
+
+def state_day(state) -> date:
+    """The local day a quotation state is counted under"""
+    return state.created_day or local_day(state.created_at) or local_today()
+
+
+@on_quotation_change
+def update_daily_stats(connection: Connection, changes: List[QuotationChange]) -> None:
+    """Apply the count and amount deltas of ``changes`` to quotation_daily_stats"""
+    rows = []
+    for change in changes:
+        for state, sign in ((change.old, -1), (change.new, 1)):
+            if state is None:
+                continue
+            scopes = [ALL_USERS] if state.created_by is None else [ALL_USERS, state.created_by]
+            for user_id in scopes:
+                rows.append({
+                    "user_id": user_id,
+                    "day": state_day(state),
+                    "status": state.status or "",
+                    "template_type": state.template_type or "",
+                    "count": sign,
+                    "total_amount": sign * (state.total_amount or 0.0),
+                })
+    increment_rows(
+        connection,
+        models.QuotationDailyStat.__table__,
+        ("user_id", "day", "status", "template_type"),
+        rows,
+    )
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """
+    Recompute quotation_daily_stats from the quotations table.
+
+    Returns the number of rollup rows written.
+    """
+    quotations = models.Quotation.__table__
+    stats = models.QuotationDailyStat.__table__
+    status = func.coalesce(quotations.c.status, "")
+    template_type = func.coalesce(quotations.c.template_type, "")
+    totals = (func.count(), func.coalesce(func.sum(quotations.c.total_amount), 0.0))
+    
+    per_user = select(
+        quotations.c.created_by, quotations.c.created_day, status, template_type, *totals
+    ).where(
+        quotations.c.created_by.is_not(None)
+    ).group_by(quotations.c.created_by, quotations.c.created_day, status, template_type)
+    overall = select(
+        quotations.c.created_day, status, template_type, *totals
+    ).group_by(quotations.c.created_day, status, template_type)
+    
+    columns = ("user_id", "day", "status", "template_type", "count", "total_amount")
+    rows = [dict(zip(columns, row)) for row in db.execute(per_user)]
+    rows += [dict(zip(columns, (ALL_USERS,) + tuple(row))) for row in db.execute(overall)]
+    
+    db.execute(stats.delete())
+    if rows:
+        db.execute(stats.insert(), rows)
+    db.commit()
+    return len(rows)
@@ -0,0 +1,82 @@
+from typing import Any, Dict
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, load_only
+
+from app.core.local_time import local_today
+from app.db import models
+from app.db.counters import ALL_USERS
+
+RECENT_LIMIT = 10
+
+
+def load_dashboard_metrics(db: Session, scope: int) -> Dict[str, Any]:
+    """Compute the dashboard payload with one aggregate query and one recent-rows query"""
+    quotation = models.Quotation
+    month_start = local_today().replace(day=1)
+    approved = quotation.status == "approved"
+    
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+    
+    def amount_where(condition):
+        return func.coalesce(func.sum(case((condition, quotation.total_amount), else_=0)), 0)
+    
+    totals = db.query(
+        func.count(quotation.id),
+        count_where(quotation.status == "draft"),
+        count_where(quotation.status == "pending"),
+        count_where(approved),
+        count_where(quotation.created_day >= month_start),
+        amount_where(approved),
+        amount_where(approved & (quotation.created_day >= month_start)),
+    )
+    recent = db.query(quotation).options(
+        load_only(
+            quotation.id, quotation.service_order_quotation_id, quotation.customer_name,
+            quotation.status, quotation.total_amount, quotation.created_at, quotation.updated_at,
+        )
+    )
+    if scope != ALL_USERS:
+        totals = totals.filter(quotation.created_by == scope)
+        recent = recent.filter(quotation.created_by == scope)
+    
+    total, draft, pending, approved_count, this_month, revenue, monthly_revenue = totals.one()
+    recent_quotations = recent.order_by(quotation.created_at.desc(), quotation.id.desc()).limit(RECENT_LIMIT).all()
+    submitted = total - draft
+    
+    return {
+        "total_quotations": {
+            "value": total,
+            "this_month": this_month,
+        },
+        "submitted_quotations": {
+            "value": submitted,
+            "pending": pending,
+            "approved": approved_count,
+            "conversion_rate": round(approved_count / submitted * 100, 2) if submitted else 0,
+        },
+        "total_revenue": {
+            "value": float(revenue),
+            "this_month": float(monthly_revenue),
+        },
+        "recent_quotations": [
+            {
+                "id": q.id,
+                "reference": q.service_order_quotation_id,
+                "customer_name": q.customer_name,
+                "status": q.status,
+                "total_amount": q.total_amount,
+                "created_at": q.created_at,
+            }
+            for q in recent_quotations
+        ],
+        "activities": [
+            {
+                "quotation_id": q.id,
+                "description": f"Quotation {q.service_order_quotation_id} is {q.status}",
+                "timestamp": q.updated_at or q.created_at,
+            }
+            for q in sorted(recent_quotations, key=lambda q: q.updated_at or q.created_at, reverse=True)
+        ],
+    }
@@ -1,16 +1,57 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pragmas import configure_sqlite
 
-engine = create_engine(settings.DATABASE_URL)
+# Async driver for each database backend DATABASE_URL may name
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+# Writes, and anything that may write, go through ``engine``; read-only endpoints use ``read_engine``
+engine = create_engine(settings.DATABASE_URL, pool_size=settings.DATABASE_WRITE_POOL_SIZE, max_overflow=0)
+read_engine = create_engine(
+    settings.DATABASE_READ_URL or settings.DATABASE_URL,
+    pool_size=settings.DATABASE_READ_POOL_SIZE,
+    max_overflow=settings.DATABASE_READ_POOL_OVERFLOW,
+)
+configure_sqlite(engine)
+configure_sqlite(read_engine, read_only=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
+def async_database_url(url: str) -> URL:
+    """DATABASE_URL with its driver swapped for the async one"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+# Only created when enabled, so the sync stack runs without the async drivers installed.
+# asyncpg connections are pooled; SQLite gets a fresh aiosqlite connection per session
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_READ_URL or settings.DATABASE_URL)
+) if settings.ASYNC_DATABASE else None
+if async_engine is not None:
+    # Only the read-only endpoints run on the async stack
+    configure_sqlite(async_engine.sync_engine, read_only=True)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,153 @@
+"""
+Quotation value distributions per month, template type and status.
+
+Two rollups are kept up to date on every quotation write, alongside the
+daily stats: quantile sketch bucket counts (app.core.sketch) and fixed-bin
+histogram counts. Reading a distribution sums the stored counts over the
+requested months, so its cost depends on the number of buckets and months,
+not on the number of quotations.
+
+Changing RELATIVE_ACCURACY or HISTOGRAM_EDGES requires
+``python manage.py backfill-value-distribution``.
+"""
+
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.sketch import QuantileSketch, bucket_index
+from app.db import models
+from app.db.counters import ALL_USERS
+from app.db.daily_stats import state_day
+from app.db.events import STATE_COLUMNS, QuotationChange, on_quotation_change
+from app.db.monthly import month_end
+from app.db.upsert import increment_rows
+
+# Lower edges of the histogram bins; the last bin has no upper edge
+HISTOGRAM_EDGES = (0, 1000, 2500, 5000, 10000, 20000, 30000, 40000, 50000, 75000, 100000)
+
+QUANTILES = {"median": 0.5, "p90": 0.9, "p99": 0.99}
+
+GROUP_KEY = ("user_id", "month", "status", "template_type")
+
+
+def histogram_bin(value: Optional[float]) -> int:
+    return max(bisect_right(HISTOGRAM_EDGES, value or 0.0) - 1, 0)
+
+
+def _group_rows(state) -> List[dict]:
+    scopes = [ALL_USERS] if state.created_by is None else [ALL_USERS, state.created_by]
+    month = state_day(state).replace(day=1)
+    return [
+        {"user_id": user_id, "month": month, "status": state.status or "", "template_type": state.template_type or ""}
+        for user_id in scopes
+    ]
+
+
+@on_quotation_change
+def update_value_distribution(connection: Connection, changes: List[QuotationChange]) -> None:
+    """Move each changed quotation's amount between sketch buckets and histogram bins"""
+    sketch_rows, histogram_rows = [], []
+    for change in changes:
+        for state, sign in ((change.old, -1), (change.new, 1)):
+            if state is None:
+                continue
+            for group in _group_rows(state):
+                sketch_rows.append({**group, "bucket": bucket_index(state.total_amount), "count": sign})
+                histogram_rows.append({**group, "bin": histogram_bin(state.total_amount), "count": sign})
+    increment_rows(connection, models.QuotationValueSketch.__table__, GROUP_KEY + ("bucket",), sketch_rows)
+    increment_rows(connection, models.QuotationValueHistogram.__table__, GROUP_KEY + ("bin",), histogram_rows)
+
+
+def rebuild_value_distribution(db: Session) -> int:
+    """
+    Recompute the value sketches and histograms from the quotations table.
+
+    Returns the number of rows written.
+    """
+    quotations = models.Quotation.__table__
+    sketches: Dict[Tuple, int] = {}
+    histograms: Dict[Tuple, int] = {}
+    for state in db.execute(select(*[quotations.c[name] for name in STATE_COLUMNS])):
+        for group in _group_rows(state):
+            group = tuple(group[column] for column in GROUP_KEY)
+            sketch_key = group + (bucket_index(state.total_amount),)
+            histogram_key = group + (histogram_bin(state.total_amount),)
+            sketches[sketch_key] = sketches.get(sketch_key, 0) + 1
+            histograms[histogram_key] = histograms.get(histogram_key, 0) + 1
+    
+    rows = 0
+    for table, totals, column in (
+        (models.QuotationValueSketch.__table__, sketches, "bucket"),
+        (models.QuotationValueHistogram.__table__, histograms, "bin"),
+    ):
+        db.execute(table.delete())
+        if totals:
+            db.execute(table.insert(), [
+                dict(zip(GROUP_KEY + (column, "count"), key + (count,)))
+                for key, count in totals.items()
+            ])
+        rows += len(totals)
+    db.commit()
+    return rows
+
+
+def _summed(db: Session, model, column, scope: int, months: List[date], template_type, status):
+    stmt = select(
+        model.template_type, model.status, column, func.sum(model.count)
+    ).where(
+        model.user_id == scope,
+        model.month >= months[0],
+        model.month <= month_end(months[-1]),
+    ).group_by(model.template_type, model.status, column).having(func.sum(model.count) > 0)
+    if template_type is not None:
+        stmt = stmt.where(model.template_type == template_type)
+    if status is not None:
+        stmt = stmt.where(model.status == status)
+    return db.execute(stmt)
+
+
+def value_distribution(
+    db: Session,
+    scope: int,
+    months: List[date],
+    template_type: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[dict]:
+    """Median, p90, p99 and histogram of total_amount per template type and status over ``months``"""
+    sketches: Dict[Tuple[str, str], QuantileSketch] = {}
+    for group_template, group_status, bucket, count in _summed(
+        db, models.QuotationValueSketch, models.QuotationValueSketch.bucket, scope, months, template_type, status
+    ):
+        sketches.setdefault((group_template, group_status), QuantileSketch()).merge([(bucket, count)])
+    histograms: Dict[Tuple[str, str], List[int]] = {}
+    for group_template, group_status, bin_index, count in _summed(
+        db, models.QuotationValueHistogram, models.QuotationValueHistogram.bin, scope, months, template_type, status
+    ):
+        histograms.setdefault((group_template, group_status), [0] * len(HISTOGRAM_EDGES))[bin_index] = count
+
+    result = []
+    for (group_template, group_status), sketch in sorted(sketches.items()):
+        counts = histograms.get((group_template, group_status), [0] * len(HISTOGRAM_EDGES))
+        result.append({
+            "template_type": group_template,
+            "status": group_status,
+            "count": sketch.count,
+            **{
+                name: round(sketch.quantile(q), 2)
+                for name, q in QUANTILES.items()
+            },
+            "histogram": [
+                {
+                    "lower": lower,
+                    "upper": HISTOGRAM_EDGES[index + 1] if index + 1 < len(HISTOGRAM_EDGES) else None,
+                    "count": counts[index],
+                }
+                for index, lower in enumerate(HISTOGRAM_EDGES)
+            ],
+        })
+    return result
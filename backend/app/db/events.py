@@ -0,0 +1,107 @@
+"""
+Capture quotation writes so derived tables can be kept in step.
+
+Every flush that inserts, updates or deletes quotations is turned into a
+list of ``QuotationChange(old, new)`` pairs. ``old`` is the row as it was
+before the flush and ``new`` is the row after it, each read straight from
+the database; either side is None for inserts and deletes. Handlers
+registered with ``on_quotation_change`` run inside the same transaction, so
+whatever they write commits or rolls back together with the quotation.
+Bulk Core inserts that bypass the ORM report their rows with
+``record_inserted_quotations``.
+"""
+
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Columns derived tables care about; a change to any other column is ignored
+STATE_COLUMNS = (
+    "id", "created_by", "status", "total_amount", "template_type", "created_at", "created_day", "postcode_district",
+)
+
+# postcode_district is only derived from these while the flush runs, after before_flush
+_DERIVED_FROM = ("location_data", "site_address")
+
+QuotationState = namedtuple("QuotationState", STATE_COLUMNS)
+QuotationChange = namedtuple("QuotationChange", ["old", "new"])
+
+_handlers: List[Callable[[Connection, List[QuotationChange]], None]] = []
+
+_OLD_STATES_KEY = "quotation_old_states"
+
+
+def on_quotation_change(handler: Callable[[Connection, List[QuotationChange]], None]):
+    """Register ``handler(connection, changes)``; usable as a decorator"""
+    _handlers.append(handler)
+    return handler
+
+
+def dispatch(connection: Connection, changes: List[QuotationChange]) -> None:
+    changes = [change for change in changes if change.old != change.new]
+    if not changes:
+        return
+    for handler in _handlers:
+        handler(connection, changes)
+
+
+def load_states(connection: Connection, ids: Iterable[int]) -> Dict[int, QuotationState]:
+    ids = list(ids)
+    if not ids:
+        return {}
+    table = models.Quotation.__table__
+    rows = connection.execute(
+        select(*[table.c[name] for name in STATE_COLUMNS]).where(table.c.id.in_(ids))
+    )
+    return {row.id: QuotationState(*row) for row in rows}
+
+
+def record_inserted_quotations(connection: Connection, ids: Iterable[int]) -> None:
+    """Dispatch inserts made outside the ORM unit of work"""
+    states = load_states(connection, ids)
+    dispatch(connection, [QuotationChange(None, state) for state in states.values()])
+
+
+def _touches_state(quotation: models.Quotation) -> bool:
+    attrs = inspect(quotation).attrs
+    tracked = [name for name in STATE_COLUMNS if name != "id"] + list(_DERIVED_FROM)
+    return any(attrs[name].history.has_changes() for name in tracked)
+
+
+@event.listens_for(Session, "before_flush")
+def _capture_old_states(session: Session, flush_context, instances) -> None:
+    ids = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, models.Quotation) and obj.id is not None and _touches_state(obj)
+    ]
+    ids += [
+        obj.id for obj in session.deleted
+        if isinstance(obj, models.Quotation) and obj.id is not None
+    ]
+    if ids:
+        session.info[_OLD_STATES_KEY] = load_states(session.connection(), ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _dispatch_changes(session: Session, flush_context) -> None:
+    old_states = session.info.pop(_OLD_STATES_KEY, {})
+    new_ids = [obj.id for obj in session.new if isinstance(obj, models.Quotation)]
+    deleted_ids = {obj.id for obj in session.deleted if isinstance(obj, models.Quotation)}
+    if not new_ids and not old_states:
+        return
+    
+    connection = session.connection()
+    changed_ids = [quotation_id for quotation_id in old_states if quotation_id not in deleted_ids]
+    new_states = load_states(connection, new_ids + changed_ids)
+    
+    changes: List[QuotationChange] = []
+    for quotation_id, old in old_states.items():
+        changes.append(QuotationChange(old, new_states.get(quotation_id)))
+    for quotation_id in new_ids:
+        changes.append(QuotationChange(None, new_states.get(quotation_id)))
+    dispatch(connection, changes)
@@ -0,0 +1,73 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.columnar import columnar_engine
+from app.db.counters import ALL_USERS
+
+GROUP_COLUMNS = {
+    "district": models.Quotation.postcode_district,
+    "area": models.Quotation.postcode_area,
+}
+
+
+def geographical_breakdown(
+    db: Session,
+    scope: int,
+    start_day: date,
+    end_day: date,
+    status: Optional[str] = None,
+    group_by: str = "district",
+) -> List[dict]:
+    """
+    Quotations, approved revenue and conversion rate per postcode district
+    or area, busiest first. Quotations without a postcode are left out.
+    """
+    engine = columnar_engine(db)
+    if engine is not None:
+        result = engine.geographical(scope, start_day, end_day, status, group_by)
+    else:
+        result = _query_breakdown(db, scope, start_day, end_day, status, group_by)
+    result.sort(key=lambda row: (-row["quotations"], row["location"]))
+    return result
+
+
+def breakdown_query(
+    db: Session, scope: int, start_day: date, end_day: date, status: Optional[str] = None, group_by: str = "district"
+):
+    """(location, quotations, approved, approved revenue) per location, straight from the quotations table"""
+    quotation = models.Quotation
+    location = GROUP_COLUMNS[group_by]
+    approved = quotation.status == "approved"
+    query = db.query(
+        location,
+        func.count(quotation.id),
+        func.coalesce(func.sum(case((approved, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((approved, quotation.total_amount), else_=0)), 0),
+    ).filter(
+        location.is_not(None),
+        quotation.created_day >= start_day,
+        quotation.created_day <= end_day,
+    )
+    if scope != ALL_USERS:
+        query = query.filter(quotation.created_by == scope)
+    if status:
+        query = query.filter(quotation.status == status)
+    return query.group_by(location)
+
+
+def _query_breakdown(
+    db: Session, scope: int, start_day: date, end_day: date, status: Optional[str], group_by: str
+) -> List[dict]:
+    return [
+        {
+            "location": name,
+            "quotations": count,
+            "revenue": round(float(revenue), 2),
+            "conversion_rate": round(approved_count / count * 100, 2) if count else 0.0,
+        }
+        for name, count, approved_count, revenue in breakdown_query(db, scope, start_day, end_day, status, group_by)
+    ]
@@ -0,0 +1,68 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+
+def request_hash(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def get_stored_response(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[Any]:
+    """
+    Return the response stored for ``key``, or None if the key is new.
+
+    Expired keys are removed so the request runs again. Raises
+    ``IdempotencyKeyReused`` if the key was used with a different body.
+    """
+    record = db.query(models.IdempotencyKey).filter(
+        models.IdempotencyKey.user_id == user_id,
+        models.IdempotencyKey.key == key,
+    ).first()
+    if record is None:
+        return None
+    
+    created_at = record.created_at
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    expires_at = created_at + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS) if created_at else None
+    if expires_at is not None and expires_at < datetime.now(timezone.utc):
+        db.delete(record)
+        db.flush()
+        return None
+    
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyReused(key)
+    return record.response_body
+
+
+def store_response(
+    db: Session, user_id: int, key: str, fingerprint: str, body: Any, status_code: int = 200
+) -> None:
+    """
+    Record the response for ``key`` in the caller's transaction.
+
+    Keys are rarely reused, so expired ones are also deleted here, all at
+    once, rather than only when a request repeats them.
+    """
+    expired_before = datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    db.query(models.IdempotencyKey).filter(
+        models.IdempotencyKey.created_at < expired_before
+    ).delete(synchronize_session=False)
+    db.add(models.IdempotencyKey(
+        key=key,
+        user_id=user_id,
+        request_hash=fingerprint,
+        status_code=status_code,
+        response_body=body,
+    ))
@@ -0,0 +1,92 @@
+"""
+Change numbers and the deletion log behind map-feed deltas.
+
+Every write to quotations takes the next number from a counter in
+``collection_versions`` and stamps it on the rows it inserted or updated
+(``quotations.change_seq``) and on the deletions it logs here. The counter
+row is updated inside the writing transaction, so concurrent writers take
+their numbers in commit order, and unlike timestamps no two transactions
+share one. The feed reports the current number, and a delta (``since=``)
+selects everything numbered after the one the client last received.
+
+Deletions older than MAP_FEED_DELETION_RETENTION_DAYS are pruned, and the
+highest number pruned is kept; a client whose ``since`` is below it has to
+fetch the full feed again. Quotations written before change numbers
+existed have none and only show up in the full feed.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.upsert import increment_rows
+from app.db.versions import bump_collections
+
+# Rows in collection_versions: the last change number handed out, and the highest one pruned from the log
+CHANGES = "quotation_changes"
+PRUNED = "quotation_deletions_pruned"
+
+
+def _counter(connection: Connection, name: str) -> int:
+    versions = models.CollectionVersion.__table__
+    return connection.execute(select(versions.c.version).where(versions.c.name == name)).scalar() or 0
+
+
+def current_seq(connection: Connection) -> int:
+    """The last change number handed out"""
+    return _counter(connection, CHANGES)
+
+
+def oldest_since(connection: Connection) -> int:
+    """The smallest ``since`` for which the log still holds every deletion after it"""
+    return _counter(connection, PRUNED)
+
+
+def stamp_changes(connection: Connection, changed_ids: Iterable[int] = (), deleted_ids: Iterable[int] = ()) -> None:
+    """Give the changed quotations, and log the deleted ones, under the next change number"""
+    changed_ids, deleted_ids = list(changed_ids), list(deleted_ids)
+    if not changed_ids and not deleted_ids:
+        return
+    bump_collections(connection, CHANGES)
+    seq = current_seq(connection)
+    if changed_ids:
+        quotations = models.Quotation.__table__
+        # Not a modification of the quotation; keep updated_at from firing its onupdate
+        connection.execute(
+            update(quotations).where(quotations.c.id.in_(changed_ids))
+            .values(change_seq=seq, updated_at=quotations.c.updated_at)
+        )
+    if deleted_ids:
+        _prune(connection)
+        connection.execute(
+            models.QuotationDeletion.__table__.insert(),
+            [{"quotation_id": quotation_id, "change_seq": seq} for quotation_id in deleted_ids],
+        )
+
+
+def _prune(connection: Connection) -> None:
+    log = models.QuotationDeletion.__table__
+    expired = log.c.deleted_at < datetime.utcnow() - timedelta(days=settings.MAP_FEED_DELETION_RETENTION_DAYS)
+    pruned = connection.execute(select(func.max(log.c.change_seq)).where(expired)).scalar()
+    if pruned is None:
+        return
+    connection.execute(log.delete().where(expired))
+    raised = pruned - oldest_since(connection)
+    if raised > 0:
+        increment_rows(connection, models.CollectionVersion.__table__, ("name",), [{"name": PRUNED, "version": raised}])
+
+
+@event.listens_for(Session, "after_flush")
+def _stamp_flushed_changes(session: Session, flush_context) -> None:
+    # new, dirty and deleted still describe what was just flushed
+    changed = [
+        obj.id for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, models.Quotation) and (obj in session.new or session.is_modified(obj))
+    ]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, models.Quotation)]
+    stamp_changes(session.connection(), changed, deleted)
@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
+import uuid
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, JSON, Index, UniqueConstraint, event, inspect
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
+from app.core.geo import location_columns
+from app.core.local_time import created_columns, local_day
 from app.db.database import Base
 
+def generate_quotation_reference() -> str:
+    return f"Q-{uuid.uuid4().hex[:12].upper()}"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -41,6 +47,7 @@ class Template(Base):
     fields = Column(JSON)  # Store template fields as JSON
     created_by = Column(Integer, ForeignKey("users.id"))
     is_active = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))  # Bumped on every change, used for ETags
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -52,7 +59,7 @@ class Quotation(Base):
     __tablename__ = "quotations"
     
     id = Column(Integer, primary_key=True, index=True)
-    service_order_quotation_id = Column(String(50), unique=True, index=True)
+    service_order_quotation_id = Column(String(50), unique=True, index=True, default=generate_quotation_reference)
     description = Column(Text, nullable=False)
     customer_name = Column(String(255), nullable=False)
     customer_email = Column(String(255), nullable=False)
@@ -68,14 +75,56 @@ class Quotation(Base):
     quotation_valid_from = Column(DateTime(timezone=True))
     quotation_valid_to = Column(DateTime(timezone=True))
     location_data = Column(JSON)  # Store location coordinates and details
+    latitude = Column(Float)  # Copied from location_data on write for spatial queries
+    longitude = Column(Float)
+    postcode_district = Column(String(10))  # Outward code ("SW7"), derived from location_data/site_address on write
+    postcode_area = Column(String(4))  # Its leading letters ("SW")
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))  # Bumped on any change, including items
+    change_seq = Column(Integer)  # Change number of the last write, from a global counter, for map-feed deltas (app.db.map_changes)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_day = Column(Date)  # created_at's date in settings.TIMEZONE, which analytics filter and group on
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     template = relationship("Template", back_populates="quotations")
     created_by_user = relationship("User", back_populates="quotations")
     items = relationship("QuotationItem", back_populates="quotation", cascade="all, delete-orphan")
     activities = relationship("ActivityLog", back_populates="quotation")
+    
+    # Return server defaults (created_at, updated_at) from the INSERT/UPDATE itself
+    __mapper_args__ = {"eager_defaults": True}
+    
+    __table_args__ = (
+        # Keyset pagination: newest first, id breaks ties between equal timestamps
+        Index("ix_quotations_created_by_created_at_id", "created_by", "created_at", "id"),
+        Index("ix_quotations_created_at_id", "created_at", "id"),
+        # Map feed deltas (since=)
+        Index("ix_quotations_change_seq", "change_seq"),
+        Index("ix_quotations_latitude_longitude", "latitude", "longitude"),
+        Index("ix_quotations_postcode_district", "postcode_district"),
+        Index("ix_quotations_postcode_area", "postcode_area"),
+        # Analytics date ranges, with and without a status filter
+        Index("ix_quotations_status_created_day", "status", "created_day"),
+        Index("ix_quotations_created_day", "created_day"),
+    )
+
+@event.listens_for(Quotation, "before_insert")
+@event.listens_for(Quotation, "before_update")
+def sync_quotation_location(mapper, connection, target):
+    """Keep latitude/longitude and the postcode columns in step with the location"""
+    for name, value in location_columns(target.location_data, target.site_address).items():
+        setattr(target, name, value)
+
+@event.listens_for(Quotation, "before_insert")
+def set_quotation_created_day(mapper, connection, target):
+    """Set created_at here rather than leaving it to the server default, so created_day can be derived from it"""
+    for name, value in created_columns(target.created_at).items():
+        setattr(target, name, value)
+
+@event.listens_for(Quotation, "before_update")
+def sync_quotation_created_day(mapper, connection, target):
+    if inspect(target).attrs.created_at.history.has_changes():
+        target.created_day = local_day(target.created_at)
 
 class QuotationItem(Base):
     __tablename__ = "quotation_items"
@@ -91,6 +140,8 @@ class QuotationItem(Base):
     
     # Relationships
     quotation = relationship("Quotation", back_populates="items")
+    
+    __mapper_args__ = {"eager_defaults": True}
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
@@ -114,11 +165,99 @@ class Report(Base):
     name = Column(String(255), nullable=False)
     type = Column(String(100), nullable=False)  # Summary, Geographical, Template Analysis, Performance
     format = Column(String(20), default="PDF")  # PDF, CSV, Excel
-    status = Column(String(50), default="processing")  # processing, completed, failed
+    status = Column(String(50), default="pending")  # pending, processing, completed, failed
     file_path = Column(String(500))
     generated_by = Column(Integer, ForeignKey("users.id"))
     filters = Column(JSON)  # Store report filters
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    generated_by_user = relationship("User")
\ No newline at end of file
+    generated_by_user = relationship("User")
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body
+    status_code = Column(Integer, nullable=False, default=200)
+    response_body = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Expired keys are deleted in bulk
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+class QuotationCounter(Base):
+    __tablename__ = "quotation_counters"
+    
+    # user_id 0 holds the totals across all users
+    user_id = Column(Integer, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+
+class QuotationDailyStat(Base):
+    __tablename__ = "quotation_daily_stats"
+    
+    # user_id 0 holds the totals across all users; missing status/template_type are stored as ""
+    user_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    template_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+
+class QuotationValueSketch(Base):
+    __tablename__ = "quotation_value_sketches"
+    
+    # Quotation counts per log-spaced total_amount bucket (see app.core.sketch); month is its first day
+    user_id = Column(Integer, primary_key=True)
+    month = Column(Date, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    template_type = Column(String(50), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class QuotationValueHistogram(Base):
+    __tablename__ = "quotation_value_histograms"
+    
+    # Quotation counts per fixed total_amount bin (app.db.distribution.HISTOGRAM_EDGES)
+    user_id = Column(Integer, primary_key=True)
+    month = Column(Date, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    template_type = Column(String(50), primary_key=True)
+    bin = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+    
+    # One row per collection (quotations, templates), bumped on any write to it
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    # Logged-out and used-up refresh tokens, kept until they would have expired anyway
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class RevokedUser(Base):
+    __tablename__ = "revoked_users"
+    
+    # Users whose role or active flag changed (or who were deleted); access tokens issued before revoked_at are rejected
+    user_id = Column(Integer, primary_key=True)
+    revoked_at = Column(Float, nullable=False, index=True)  # Unix time, compared with the tokens' iat
+
+class QuotationDeletion(Base):
+    __tablename__ = "quotation_deletions"
+    
+    # Deleted quotation ids, so map-feed deltas can tell clients to drop them (app.db.map_changes)
+    id = Column(Integer, primary_key=True)
+    quotation_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
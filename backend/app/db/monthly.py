@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from typing import List
+
+from sqlalchemy import Integer, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Revenue targets are the average of this many preceding months
+TARGET_TRAILING_MONTHS = 3
+
+SUBMITTED_EXCLUDED = ("", "draft")
+ACCEPTED_STATUSES = ("approved", "accepted")
+
+
+def month_range(months: int, end_month: date) -> List[date]:
+    """The first day of each of the ``months`` months ending with ``end_month``"""
+    first = []
+    year, month = end_month.year, end_month.month
+    for _ in range(months):
+        first.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return first[::-1]
+
+
+def month_end(month: date) -> date:
+    following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return following - timedelta(days=1)
+
+
+def _month_number(db: Session, day_column):
+    """year * 12 + month - 1, so consecutive months are consecutive integers"""
+    if db.get_bind().dialect.name == "postgresql":
+        year, month = func.extract("year", day_column), func.extract("month", day_column)
+    else:
+        year, month = func.strftime("%Y", day_column), func.strftime("%m", day_column)
+    return cast(year, Integer) * 12 + cast(month, Integer) - 1
+
+
+def _number(month: date) -> int:
+    return month.year * 12 + month.month - 1
+
+
+def monthly_revenue(db: Session, scope: int, months: List[date]) -> List[dict]:
+    """
+    Approved revenue per month with a target equal to the average of the
+    TARGET_TRAILING_MONTHS calendar months before it (a month without
+    revenue counts as zero), from one windowed query over the daily rollup.
+    """
+    stats = models.QuotationDailyStat
+    month = _month_number(db, stats.day).label("month")
+    # Read enough earlier months for the first month's trailing average
+    lookback = month_range(TARGET_TRAILING_MONTHS + 1, months[0])[0]
+    per_month = select(
+        month, func.sum(stats.total_amount).label("revenue")
+    ).where(
+        stats.user_id == scope,
+        stats.status == "approved",
+        stats.day >= lookback,
+        stats.day <= month_end(months[-1]),
+    ).group_by(month).subquery()
+    windowed = select(
+        per_month.c.month,
+        per_month.c.revenue,
+        (func.sum(per_month.c.revenue).over(
+            order_by=per_month.c.month, range_=(-TARGET_TRAILING_MONTHS, -1)
+        ) / TARGET_TRAILING_MONTHS).label("target"),
+    ).subquery()
+    rows = {
+        number: (revenue, target)
+        for number, revenue, target in db.execute(select(windowed))
+    }
+    
+    result = []
+    for first_day in months:
+        revenue, target = rows.get(_number(first_day), (0.0, None))
+        if target is None:
+            # No row for this month, so the window was never evaluated for it
+            target = sum(
+                rows.get(_number(first_day) - back, (0.0,))[0] or 0.0
+                for back in range(1, TARGET_TRAILING_MONTHS + 1)
+            ) / TARGET_TRAILING_MONTHS
+        result.append({
+            "month": first_day.strftime("%Y-%m"),
+            "revenue": round(revenue or 0.0, 2),
+            "target": round(target or 0.0, 2),
+        })
+    return result
+
+
+def monthly_conversion(db: Session, scope: int, months: List[date]) -> List[dict]:
+    """Submitted (non-draft) and accepted quotations per month, from one grouped query over the daily rollup"""
+    stats = models.QuotationDailyStat
+    month = _month_number(db, stats.day).label("month")
+    rows = {
+        number: (submitted or 0, accepted or 0)
+        for number, submitted, accepted in db.execute(
+            select(
+                month,
+                func.sum(case((stats.status.not_in(SUBMITTED_EXCLUDED), stats.count), else_=0)),
+                func.sum(case((stats.status.in_(ACCEPTED_STATUSES), stats.count), else_=0)),
+            ).where(
+                stats.user_id == scope,
+                stats.day >= months[0],
+                stats.day <= month_end(months[-1]),
+            ).group_by(month)
+        )
+    }
+    
+    result = []
+    for first_day in months:
+        submitted, accepted = rows.get(_number(first_day), (0, 0))
+        result.append({
+            "month": first_day.strftime("%Y-%m"),
+            "submitted": submitted,
+            "accepted": accepted,
+            "conversion": round(accepted / submitted * 100, 2) if submitted else 0.0,
+        })
+    return result
@@ -0,0 +1,93 @@
+"""
+SQLite connection settings.
+
+Every connection opened to a SQLite database runs these pragmas first:
+
+- busy_timeout: a connection that finds the database locked waits this
+  long for it instead of failing with "database is locked"
+- journal_mode=WAL: readers keep reading while a write is in progress
+- synchronous=NORMAL: with WAL, commits no longer wait for an fsync; a
+  power cut can lose the last commits but never corrupts the database
+- cache_size, mmap_size, temp_store: keep pages, sorts and temporary
+  tables in memory
+
+Read connections also turn on query_only, so a read session cannot write.
+``python manage.py check-database-pragmas`` reports what each engine
+actually got.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+SYNCHRONOUS_LEVELS = {"off": 0, "normal": 1, "full": 2, "extra": 3}
+TEMP_STORE_LEVELS = {"default": 0, "file": 1, "memory": 2}
+
+
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, Any]:
+    """The pragmas to run on a new connection, in order"""
+    pragmas = {
+        # First, so the journal mode switch waits for other connections too
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        # Negative sizes are in KiB
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_BYTES,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+    if read_only:
+        pragmas["query_only"] = 1
+    return pragmas
+
+
+def configure_sqlite(engine: Engine, read_only: bool = False) -> None:
+    """Run the pragmas on every new connection of ``engine``; does nothing for other databases"""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _normalized(name: str, value: Any) -> Any:
+    """A pragma value as SQLite reports it back, e.g. synchronous=normal as 1"""
+    levels = {"synchronous": SYNCHRONOUS_LEVELS, "temp_store": TEMP_STORE_LEVELS}.get(name)
+    if levels and str(value).lower() in levels:
+        return levels[str(value).lower()]
+    if isinstance(value, str):
+        return value.lower()
+    return int(value)
+
+
+def check_pragmas(conn: Connection, read_only: bool = False) -> List[Tuple[str, Any, Any]]:
+    """Return (pragma, expected, actual) for a SQLite connection"""
+    return [
+        (name, _normalized(name, value), _normalized(name, conn.execute(text(f"PRAGMA {name}")).scalar()))
+        for name, value in sqlite_pragmas(read_only).items()
+    ]
+
+
+def check_engine_pragmas(engine: Engine, read_only: bool = False) -> List[Tuple[str, Any, Any]]:
+    if engine.dialect.name != "sqlite":
+        raise NotImplementedError("Pragma checks only apply to SQLite")
+    with engine.connect() as conn:
+        return check_pragmas(conn, read_only)
+
+
+async def check_async_engine_pragmas(engine: AsyncEngine, read_only: bool = False) -> List[Tuple[str, Any, Any]]:
+    if engine.dialect.name != "sqlite":
+        raise NotImplementedError("Pragma checks only apply to SQLite")
+    async with engine.connect() as conn:
+        return await conn.run_sync(check_pragmas, read_only)
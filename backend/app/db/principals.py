@@ -0,0 +1,71 @@
+"""
+Principals behind access tokens.
+
+Access tokens carry the principal (id, role, active flag) as claims, so
+authorization does not read the users row. Whenever an ORM update changes a
+user's role or active flag, or a user is deleted, the user's earlier access
+tokens are revoked: once when the change is flushed, and again when it
+commits, so a token refreshed from the old row in between cannot outlive
+it. The flush also stores the revocation in the same transaction, for the
+other worker processes to load. Refreshing reads the row through
+``load_principal``.
+"""
+
+import time
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.revocation import revocation_list
+from app.core.security import Principal
+from app.db import models
+from app.db.revocations import store_user_revocation
+
+# The User attributes an access token carries
+CLAIMED_ATTRIBUTES = ("role", "is_active")
+
+_PENDING_USERS_KEY = "revoked_users_pending"
+
+
+def _revoke_user(connection: Connection, user_id: int) -> None:
+    revoked_at = time.time()
+    revocation_list.revoke_user(user_id, revoked_at)
+    store_user_revocation(connection, user_id, revoked_at)
+    connection.info.setdefault(_PENDING_USERS_KEY, set()).add(user_id)
+
+
+@event.listens_for(models.User, "after_update")
+def _user_updated(mapper, connection: Connection, target: models.User) -> None:
+    state = inspect(target)
+    for name in CLAIMED_ATTRIBUTES:
+        history = state.attrs[name].history
+        # Assigning the current value again is not a change
+        if history.has_changes() and list(history.added) != list(history.deleted):
+            _revoke_user(connection, target.id)
+            return
+
+
+@event.listens_for(models.User, "after_delete")
+def _user_deleted(mapper, connection: Connection, target: models.User) -> None:
+    _revoke_user(connection, target.id)
+
+
+@event.listens_for(Engine, "commit")
+def _revoke_on_commit(connection: Connection) -> None:
+    for user_id in connection.info.pop(_PENDING_USERS_KEY, ()):
+        revocation_list.revoke_user(user_id)
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_on_rollback(connection: Connection) -> None:
+    connection.info.pop(_PENDING_USERS_KEY, None)
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Return the principal for ``user_id`` from the users row, or None if there is no such user"""
+    row = db.query(models.User.id, models.User.role, models.User.is_active).filter(models.User.id == user_id).first()
+    if row is None:
+        return None
+    return Principal(row.id, row.role, row.is_active is not False)
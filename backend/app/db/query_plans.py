@@ -0,0 +1,61 @@
+"""
+Query plan regression checks for the analytics queries that read the
+quotations table directly.
+
+Each check builds a query the application runs, asks SQLite for its plan
+and expects a given index to be searched. tests/test_query_plans.py runs them
+with the test suite; ``python manage.py check-query-plans`` runs them against
+a live database.
+"""
+
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.local_time import last_days
+from app.db.counters import ALL_USERS
+from app.db.geography import breakdown_query
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    build: Callable[[Session], object]
+    index: str
+
+
+PLAN_CHECKS = [
+    PlanCheck(
+        "geographical, every status",
+        lambda db: breakdown_query(db, ALL_USERS, *last_days(30)),
+        "ix_quotations_created_day",
+    ),
+    PlanCheck(
+        "geographical, one status",
+        lambda db: breakdown_query(db, ALL_USERS, *last_days(30), status="approved"),
+        "ix_quotations_status_created_day",
+    ),
+    PlanCheck(
+        "geographical by area, one status, one user",
+        lambda db: breakdown_query(db, 1, *last_days(365), status="approved", group_by="area"),
+        "ix_quotations_status_created_day",
+    ),
+]
+
+
+def explain(db: Session, query) -> List[str]:
+    statement = getattr(query, "statement", query)
+    sql = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return [row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def check_query_plans(db: Session) -> List[tuple]:
+    """Return (check, plan lines, passed) for every check; needs SQLite"""
+    if db.get_bind().dialect.name != "sqlite":
+        raise NotImplementedError("Query plan checks read SQLite's EXPLAIN QUERY PLAN output")
+    results = []
+    for check in PLAN_CHECKS:
+        plan = explain(db, check.build(db))
+        passed = any(line.startswith("SEARCH") and f"INDEX {check.index} " in line for line in plan)
+        results.append((check, plan, passed))
+    return results
@@ -0,0 +1,193 @@
+import csv
+import json
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.geo import location_columns
+from app.core.local_time import created_columns
+from app.db import map_changes, models, versions
+from app.db.events import record_inserted_quotations
+from app.schemas import quotation as quotation_schemas
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# CSV cells holding JSON documents
+JSON_COLUMNS = ("items", "location_data")
+
+
+def iter_records(file: BinaryIO, format: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (row number, raw record) pairs from a CSV or NDJSON upload.
+
+    The file is read incrementally, so memory use does not depend on its
+    size. Rows that cannot be parsed are yielded as ``ValueError`` instances.
+    An NDJSON line that is not UTF-8 is such a row; in a CSV file, whose
+    rows may span lines, the first such line ends the import there.
+    """
+    lines = _decode_lines(file)
+    if format == "csv":
+        undecodable: List[UnicodeDecodeError] = []
+        
+        def decoded_lines() -> Iterator[str]:
+            for line in lines:
+                if isinstance(line, UnicodeDecodeError):
+                    undecodable.append(line)
+                    return
+                yield line
+        
+        row_number = 0
+        for row_number, row in enumerate(csv.DictReader(decoded_lines()), start=1):
+            yield row_number, _csv_record(row)
+        if undecodable:
+            yield row_number + 1, ValueError(
+                f"Not UTF-8 text ({undecodable[0].reason}); this row and the rest of the file were not imported"
+            )
+        return
+    
+    for row_number, line in enumerate(lines, start=1):
+        if isinstance(line, UnicodeDecodeError):
+            yield row_number, ValueError(f"Not UTF-8 text ({line.reason})")
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as exc:
+            yield row_number, ValueError(f"Invalid JSON: {exc}")
+
+
+def _decode_lines(file: BinaryIO) -> Iterator[Union[str, UnicodeDecodeError]]:
+    """Each line of ``file`` decoded from UTF-8 (with an optional BOM), or the error if it is not"""
+    encoding = "utf-8-sig"
+    for line in file:
+        try:
+            yield line.decode(encoding)
+        except UnicodeDecodeError as exc:
+            yield exc
+        encoding = "utf-8"
+
+
+def _csv_record(row: Dict[str, str]) -> Any:
+    record = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if key in JSON_COLUMNS:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return ValueError(f"Column {key} is not valid JSON")
+        record[key] = value
+    return record
+
+
+def import_quotations(
+    db: Session,
+    records: Iterator[Tuple[int, Any]],
+    created_by: int,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> dict:
+    """
+    Validate and insert quotations and their items, one transaction per chunk.
+
+    Each chunk takes a handful of statements: one executemany INSERT for
+    the headers, one SELECT to map references back to ids, the derived table
+    updates, and one executemany INSERT for all the chunk's items. If a chunk violates a constraint it is
+    retried row by row so only the offending rows are rejected.
+    """
+    started = time.perf_counter()
+    imported = 0
+    failed = 0
+    errors: List[dict] = []
+    
+    def reject(row_number: int, messages: List[str]) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "errors": messages})
+    
+    chunk: List[Tuple[int, quotation_schemas.QuotationImportRow]] = []
+    
+    def flush_chunk() -> None:
+        nonlocal imported
+        if not chunk:
+            return
+        try:
+            _insert_rows(db, [row for _, row in chunk], created_by)
+            db.commit()
+            imported += len(chunk)
+        except IntegrityError:
+            db.rollback()
+            for row_number, row in chunk:
+                try:
+                    with db.begin_nested():
+                        _insert_rows(db, [row], created_by)
+                    imported += 1
+                except IntegrityError as exc:
+                    reject(row_number, [str(exc.orig)])
+            db.commit()
+        chunk.clear()
+    
+    for row_number, record in records:
+        if isinstance(record, Exception):
+            reject(row_number, [str(record)])
+            continue
+        try:
+            row = quotation_schemas.QuotationImportRow.model_validate(record)
+        except ValidationError as exc:
+            reject(row_number, [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            ])
+            continue
+        if not row.service_order_quotation_id:
+            row.service_order_quotation_id = models.generate_quotation_reference()
+        chunk.append((row_number, row))
+        if len(chunk) >= chunk_size:
+            flush_chunk()
+    flush_chunk()
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round((imported + failed) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def _insert_rows(db: Session, rows: List[quotation_schemas.QuotationImportRow], created_by: int) -> None:
+    quotations = models.Quotation.__table__
+    headers = []
+    for row in rows:
+        header = row.model_dump(exclude={"items"})
+        header["created_by"] = created_by
+        header.update(location_columns(row.location_data, row.site_address))
+        header.update(created_columns())
+        headers.append(header)
+    db.execute(insert(quotations), headers)
+    
+    references = [row.service_order_quotation_id for row in rows]
+    ids = dict(db.execute(
+        select(quotations.c.service_order_quotation_id, quotations.c.id)
+        .where(quotations.c.service_order_quotation_id.in_(references))
+    ).all())
+    record_inserted_quotations(db.connection(), ids.values())
+    map_changes.stamp_changes(db.connection(), ids.values())
+    versions.bump_collections(db.connection(), versions.QUOTATIONS)
+    
+    if not any(row.items for row in rows):
+        return
+    items = [
+        {**item.model_dump(), "quotation_id": ids[row.service_order_quotation_id]}
+        for row in rows
+        for item in row.items
+    ]
+    db.execute(insert(models.QuotationItem.__table__), items)
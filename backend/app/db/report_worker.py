@@ -0,0 +1,136 @@
+"""
+Run report generation in a pool of worker processes.
+
+API handlers only insert a pending Report row and call ``submit``; the work
+itself runs in separate processes so it never holds an API thread or the
+GIL. A polling thread also picks up pending reports that were created while
+no worker was running, for example before a restart.
+
+If a worker process dies, the pool breaks: it is replaced with a new one,
+and the report that was being generated is marked failed. Reports still in
+``processing`` when the worker starts were abandoned by a previous run and
+are marked failed too.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Set
+
+from app.core.config import settings
+from app.db.database import ReadSessionLocal, SessionLocal
+from app.db.reports import fail_abandoned_reports, generate_report, pending_report_ids
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWorker:
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+        self._in_flight: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    def start(self, workers: int = None, poll_seconds: float = None) -> None:
+        workers = settings.REPORT_WORKERS if workers is None else workers
+        if workers <= 0 or self._pool is not None:
+            return
+        db = SessionLocal()
+        try:
+            abandoned = fail_abandoned_reports(db)
+        finally:
+            db.close()
+        if abandoned:
+            logger.warning("Marked %s reports abandoned in processing as failed", abandoned)
+        self._workers = workers
+        self._pool = self._new_pool()
+        self._stopped.clear()
+        self._poller = threading.Thread(
+            target=self._poll,
+            args=(settings.REPORT_POLL_SECONDS if poll_seconds is None else poll_seconds,),
+            name="report-poller",
+            daemon=True,
+        )
+        self._poller.start()
+
+    def stop(self) -> None:
+        if self._pool is None:
+            return
+        self._stopped.set()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+
+    def submit(self, report_id: int) -> bool:
+        """Queue a report; returns False when no worker pool is running"""
+        with self._lock:
+            if self._pool is None:
+                return False
+            if report_id in self._in_flight:
+                return True
+            try:
+                future = self._pool.submit(generate_report, report_id)
+            except BrokenProcessPool:
+                self._replace_pool(self._pool)
+                future = self._pool.submit(generate_report, report_id)
+            self._in_flight.add(report_id)
+            pool = self._pool
+        future.add_done_callback(lambda done, report_id=report_id: self._finished(report_id, pool, done))
+        return True
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn rather than fork: children must not inherit the parent's open database connections
+        return ProcessPoolExecutor(max_workers=self._workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap ``broken`` for a new pool, unless that already happened or the worker stopped; needs self._lock"""
+        if self._pool is not broken:
+            return
+        logger.error("Report worker pool is broken; starting a new one")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+
+    def _finished(self, report_id: int, pool: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            self._in_flight.discard(report_id)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            with self._lock:
+                self._replace_pool(pool)
+            # Still pending if the report never started; the poller submits it again
+            db = SessionLocal()
+            try:
+                fail_abandoned_reports(db, [report_id])
+            finally:
+                db.close()
+            logger.error("Report %s lost its worker process", report_id)
+        elif error is not None:
+            logger.error("Report %s worker crashed: %r", report_id, error)
+        else:
+            logger.info("Report %s %s", report_id, future.result())
+
+    def _poll(self, poll_seconds: float) -> None:
+        while not self._stopped.is_set():
+            try:
+                db = ReadSessionLocal()
+                try:
+                    report_ids = pending_report_ids(db)
+                finally:
+                    db.close()
+                for report_id in report_ids:
+                    self.submit(report_id)
+            except Exception:
+                logger.exception("Polling for pending reports failed")
+            self._stopped.wait(poll_seconds)
+
+
+report_worker = ReportWorker()
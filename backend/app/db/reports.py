@@ -0,0 +1,222 @@
+"""
+Report generation.
+
+A report is generated by streaming its query into one of the writers in
+``app.core.report_writers`` and writing the chunks to a file under
+REPORTS_DIR. ``generate_report`` runs in the report worker processes; it
+claims the report by moving it from ``pending`` to ``processing`` so two
+workers never generate the same one. A report left in ``processing`` by a
+worker that died is marked failed by ``fail_abandoned_reports``.
+"""
+
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.local_time import last_days
+from app.core.report_writers import FORMATS, normalize_format, write_rows
+from app.db import models
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+YIELD_PER = 1000
+
+DATE_RANGES = {"7days": 7, "30days": 30, "90days": 90, "1year": 365}
+
+Table = Tuple[Sequence[str], Iterator[Sequence[Any]]]
+
+
+def _conditions(db: Session, report: models.Report) -> List[Any]:
+    """Translate the report's AnalyticsFilter-shaped ``filters`` into conditions on quotations"""
+    quotations = models.Quotation.__table__
+    filters = report.filters or {}
+    conditions = []
+
+    owner = db.get(models.User, report.generated_by) if report.generated_by else None
+    if owner is None or owner.role != "admin":
+        conditions.append(quotations.c.created_by == report.generated_by)
+    elif filters.get("user_id"):
+        conditions.append(quotations.c.created_by == filters["user_id"])
+
+    days = DATE_RANGES.get(filters.get("date_range") or "")
+    if days:
+        conditions.append(quotations.c.created_day >= last_days(days)[0])
+    if filters.get("status") not in (None, "", "all"):
+        conditions.append(quotations.c.status == filters["status"])
+    if filters.get("template") not in (None, "", "all"):
+        conditions.append(quotations.c.template_type == filters["template"])
+    return conditions
+
+
+def _stream(db: Session, stmt) -> Iterator[Sequence[Any]]:
+    yield from db.execute(stmt.execution_options(yield_per=YIELD_PER))
+
+
+def _approved():
+    quotations = models.Quotation.__table__
+    return quotations.c.status == "approved"
+
+
+def _rate(part: int, whole: int) -> float:
+    return round(part / whole * 100, 2) if whole else 0.0
+
+
+def summary_report(db: Session, report: models.Report) -> Table:
+    """One row per quotation"""
+    quotations = models.Quotation.__table__
+    stmt = select(
+        quotations.c.service_order_quotation_id,
+        quotations.c.customer_name,
+        quotations.c.status,
+        quotations.c.template_type,
+        quotations.c.total_amount,
+        quotations.c.created_at,
+    ).where(*_conditions(db, report)).order_by(quotations.c.created_at, quotations.c.id)
+    header = ("Reference", "Customer", "Status", "Template", "Total amount", "Created at")
+    return header, _stream(db, stmt)
+
+
+def geographical_report(db: Session, report: models.Report) -> Table:
+    """Quotations, approvals and approved revenue per postcode district"""
+    quotations = models.Quotation.__table__
+    approved = _approved()
+    stmt = select(
+        func.coalesce(quotations.c.postcode_district, "Unknown").label("district"),
+        func.count(),
+        func.sum(case((approved, 1), else_=0)),
+        func.coalesce(func.sum(case((approved, quotations.c.total_amount), else_=0)), 0),
+    ).where(*_conditions(db, report)).group_by("district").order_by("district")
+    header = ("Postcode district", "Quotations", "Approved", "Revenue", "Conversion rate %")
+    rows = (
+        (district, count, approved_count, round(revenue, 2), _rate(approved_count, count))
+        for district, count, approved_count, revenue in _stream(db, stmt)
+    )
+    return header, rows
+
+
+def template_analysis_report(db: Session, report: models.Report) -> Table:
+    """Quotations, approvals, revenue and average value per template type"""
+    quotations = models.Quotation.__table__
+    approved = _approved()
+    stmt = select(
+        func.coalesce(quotations.c.template_type, "unknown").label("template_type"),
+        func.count(),
+        func.sum(case((approved, 1), else_=0)),
+        func.coalesce(func.sum(case((approved, quotations.c.total_amount), else_=0)), 0),
+        func.coalesce(func.avg(quotations.c.total_amount), 0),
+    ).where(*_conditions(db, report)).group_by("template_type").order_by("template_type")
+    header = ("Template", "Quotations", "Approved", "Revenue", "Average value", "Conversion rate %")
+    rows = (
+        (template_type, count, approved_count, round(revenue, 2), round(average, 2), _rate(approved_count, count))
+        for template_type, count, approved_count, revenue, average in _stream(db, stmt)
+    )
+    return header, rows
+
+
+def performance_report(db: Session, report: models.Report) -> Table:
+    """Quotations, approvals and revenue per user"""
+    quotations = models.Quotation.__table__
+    users = models.User.__table__
+    approved = _approved()
+    stmt = select(
+        users.c.name,
+        users.c.email,
+        func.count(quotations.c.id),
+        func.sum(case((approved, 1), else_=0)),
+        func.coalesce(func.sum(case((approved, quotations.c.total_amount), else_=0)), 0),
+    ).select_from(
+        quotations.join(users, users.c.id == quotations.c.created_by)
+    ).where(*_conditions(db, report)).group_by(users.c.id, users.c.name, users.c.email).order_by(users.c.name)
+    header = ("User", "Email", "Quotations", "Approved", "Conversion rate %", "Revenue")
+    rows = (
+        (name, email, count, approved_count, _rate(approved_count, count), round(revenue, 2))
+        for name, email, count, approved_count, revenue in _stream(db, stmt)
+    )
+    return header, rows
+
+
+REPORT_TYPES: Dict[str, Callable[[Session, models.Report], Table]] = {
+    "Summary": summary_report,
+    "Geographical": geographical_report,
+    "Template Analysis": template_analysis_report,
+    "Performance": performance_report,
+}
+
+
+def report_path(report: models.Report) -> str:
+    extension = FORMATS[normalize_format(report.format)][0]
+    return os.path.join(os.path.abspath(settings.REPORTS_DIR), f"report-{report.id}.{extension}")
+
+
+def _claim(db: Session, report_id: int) -> bool:
+    table = models.Report.__table__
+    result = db.execute(
+        update(table).where(table.c.id == report_id, table.c.status == "pending").values(status="processing")
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def generate_report(report_id: int) -> str:
+    """
+    Generate one pending report and record the outcome.
+
+    Returns the report's final status, or "skipped" if another worker
+    already claimed it.
+    """
+    db = SessionLocal()
+    try:
+        if not _claim(db, report_id):
+            return "skipped"
+        report = db.get(models.Report, report_id)
+        path = report_path(report)
+        partial = path + ".partial"
+        try:
+            header, rows = REPORT_TYPES[report.type](db, report)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(partial, "wb") as output:
+                for chunk in write_rows(normalize_format(report.format), header, rows, title=report.name):
+                    output.write(chunk)
+            os.replace(partial, path)
+        except Exception:
+            logger.exception("Report %s failed", report_id)
+            db.rollback()
+            if os.path.exists(partial):
+                os.remove(partial)
+            report = db.get(models.Report, report_id)
+            report.status = "failed"
+        else:
+            report.status = "completed"
+            report.file_path = path
+        db.commit()
+        return report.status
+    finally:
+        db.close()
+
+
+def fail_abandoned_reports(db: Session, report_ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Mark reports stuck in ``processing`` (all of them, or only ``report_ids``)
+    as failed and commit; returns how many.
+
+    They are not retried: the report may be what killed its worker.
+    """
+    table = models.Report.__table__
+    stmt = update(table).where(table.c.status == "processing").values(status="failed")
+    if report_ids is not None:
+        stmt = stmt.where(table.c.id.in_(report_ids))
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+def pending_report_ids(db: Session) -> List[int]:
+    return [
+        report_id for (report_id,) in
+        db.query(models.Report.id).filter(models.Report.status == "pending").order_by(models.Report.id)
+    ]
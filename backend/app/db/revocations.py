@@ -0,0 +1,123 @@
+"""
+Revoked tokens and users in the database.
+
+The in-memory revocation list (app/core/revocation.py) answers every
+request; these tables make a logout or a user's role or active change
+outlast a restart and reach other worker processes. Each process loads them
+on startup and then again every REVOKED_TOKENS_REFRESH_SECONDS, so another
+process may accept a revoked token for up to that long. /auth/refresh
+inserts the token it is replacing here, and the primary key lets only one
+of two concurrent refreshes with the same token succeed.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.revocation import revocation_list
+from app.db import models
+from app.db.database import ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def revoke_token(db: Session, claims: dict) -> bool:
+    """
+    Revoke a verified token until it expires and commit; False if it was already revoked
+    """
+    revoked = models.RevokedToken
+    now = datetime.utcnow()
+    revocation_list.revoke_token(claims["jti"], claims["exp"])
+    db.query(revoked).filter(revoked.expires_at <= now).delete(synchronize_session=False)
+    db.add(revoked(
+        jti=claims["jti"],
+        user_id=int(claims["sub"]),
+        expires_at=datetime.utcfromtimestamp(claims["exp"]),
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def store_user_revocation(connection: Connection, user_id: int, revoked_at: float) -> None:
+    """Record in the current transaction that the user's access tokens issued before ``revoked_at`` are revoked"""
+    table = models.RevokedUser.__table__
+    # Older entries can no longer match an unexpired access token
+    connection.execute(table.delete().where(
+        (table.c.user_id == user_id) | (table.c.revoked_at <= revoked_at - revocation_list.user_ttl)
+    ))
+    connection.execute(table.insert().values(user_id=user_id, revoked_at=revoked_at))
+
+
+def load_revoked_users(db: Session) -> int:
+    """Put the user revocations that can still match an access token into the in-memory list; returns how many"""
+    revoked = models.RevokedUser
+    rows = db.query(revoked.user_id, revoked.revoked_at).filter(
+        revoked.revoked_at > time.time() - revocation_list.user_ttl
+    ).all()
+    revocation_list.revoke_users(dict(rows))
+    return len(rows)
+
+
+def load_revoked_tokens(db: Session) -> int:
+    """Put the unexpired revoked tokens into the in-memory list; returns how many"""
+    revoked = models.RevokedToken
+    rows = db.query(revoked.jti, revoked.expires_at).filter(revoked.expires_at > datetime.utcnow()).all()
+    revocation_list.revoke_tokens({
+        jti: (expires_at - datetime(1970, 1, 1)).total_seconds() for jti, expires_at in rows
+    })
+    return len(rows)
+
+
+class RevokedTokenLoader:
+    """Load the revoked tokens and users on start, then reload them periodically from a background thread"""
+
+    def __init__(self):
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, refresh_seconds: float = None) -> None:
+        refresh_seconds = settings.REVOKED_TOKENS_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._load()
+        if refresh_seconds <= 0 or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._refresh, args=(refresh_seconds,), name="revoked-token-loader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _load(self) -> None:
+        db = ReadSessionLocal()
+        try:
+            load_revoked_tokens(db)
+            load_revoked_users(db)
+        finally:
+            db.close()
+
+    def _refresh(self, refresh_seconds: float) -> None:
+        while not self._stopped.wait(refresh_seconds):
+            try:
+                self._load()
+            except Exception:
+                logger.exception("Reloading revoked tokens failed")
+
+
+revoked_token_loader = RevokedTokenLoader()
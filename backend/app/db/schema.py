@@ -0,0 +1,105 @@
+from sqlalchemy import bindparam, inspect, or_, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.geo import location_columns
+from app.core.local_time import local_day
+from app.db import counters, daily_stats, distribution, models
+from app.db.search import create_search_index
+
+
+def sync_schema(engine: Engine) -> None:
+    """
+    Create missing tables, columns, indexes and the full-text index.
+
+    ``create_all`` skips tables that already exist, so columns and indexes
+    added to an existing table are created here explicitly, and derived
+    columns and tables are backfilled the first time they appear.
+    """
+    existing_tables = set(inspect(engine).get_table_names())
+    models.Base.metadata.create_all(bind=engine)
+    added = _add_missing_columns(engine)
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    create_search_index(engine)
+    
+    if {("quotations", "latitude"), ("quotations", "postcode_district")} & added:
+        backfill_location_columns(engine)
+    
+    # Also fills rows inserted with raw SQL since the last start
+    backfill_created_day(engine)
+    # Rollups built before created_day existed bucketed by UTC date
+    day_added = ("quotations", "created_day") in added
+    
+    if "quotations" in existing_tables and "quotation_counters" not in existing_tables:
+        with Session(engine) as db:
+            counters.rebuild_counters(db)
+    
+    if "quotations" in existing_tables and ("quotation_daily_stats" not in existing_tables or day_added):
+        with Session(engine) as db:
+            daily_stats.rebuild_daily_stats(db)
+    
+    if "quotations" in existing_tables and ("quotation_value_sketches" not in existing_tables or day_added):
+        with Session(engine) as db:
+            distribution.rebuild_value_distribution(db)
+
+
+def _add_missing_columns(engine: Engine) -> set:
+    added = set()
+    with engine.begin() as conn:
+        # Reflect on this connection; a second one would wait for it with a single-connection pool
+        inspector = inspect(conn)
+        for table in models.Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column.type.compile(dialect=engine.dialect)}'
+                default = column.server_default.arg if column.server_default is not None else None
+                if hasattr(default, "text"):
+                    ddl += f" DEFAULT {default.text}"
+                conn.execute(text(ddl))
+                added.add((table.name, column.name))
+    return added
+
+
+def backfill_location_columns(engine: Engine) -> None:
+    """Fill the coordinate and postcode columns derived from each quotation's location"""
+    table = models.Quotation.__table__
+    names = ("latitude", "longitude", "postcode_district", "postcode_area")
+    with engine.begin() as conn:
+        rows = conn.execute(
+            table.select().with_only_columns(table.c.id, table.c.location_data, table.c.site_address)
+            .where(or_(table.c.location_data.is_not(None), table.c.site_address.is_not(None)))
+        ).all()
+        updates = []
+        for quotation_id, location_data, site_address in rows:
+            columns = location_columns(location_data, site_address)
+            if any(value is not None for value in columns.values()):
+                updates.append({"quotation_id": quotation_id, **{f"new_{name}": columns[name] for name in names}})
+        if updates:
+            conn.execute(
+                update(table)
+                .where(table.c.id == bindparam("quotation_id"))
+                # Derived columns are not a modification; keep updated_at from firing its onupdate
+                .values(updated_at=table.c.updated_at, **{name: bindparam(f"new_{name}") for name in names}),
+                updates,
+            )
+
+
+def backfill_created_day(engine: Engine) -> None:
+    """Fill created_day from created_at wherever it is missing"""
+    table = models.Quotation.__table__
+    with engine.begin() as conn:
+        rows = conn.execute(
+            table.select().with_only_columns(table.c.id, table.c.created_at)
+            .where(table.c.created_day.is_(None), table.c.created_at.is_not(None))
+        ).all()
+        if rows:
+            conn.execute(
+                update(table)
+                .where(table.c.id == bindparam("quotation_id"))
+                .values(created_day=bindparam("new_created_day"), updated_at=table.c.updated_at),
+                [{"quotation_id": quotation_id, "new_created_day": local_day(created_at)} for quotation_id, created_at in rows],
+            )
@@ -0,0 +1,114 @@
+import re
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from app.db import models
+
+SEARCH_COLUMNS = (
+    "customer_name",
+    "customer_email",
+    "description",
+    "site_address",
+    "sold_to_party",
+    "external_reference",
+)
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+# External-content FTS5 index over quotations, kept in sync by triggers
+SQLITE_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS quotations_fts USING fts5(
+        {_columns},
+        content='quotations',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS quotations_fts_ai AFTER INSERT ON quotations BEGIN
+        INSERT INTO quotations_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS quotations_fts_ad AFTER DELETE ON quotations BEGIN
+        INSERT INTO quotations_fts(quotations_fts, rowid, {_columns})
+        VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS quotations_fts_au AFTER UPDATE OF {_columns} ON quotations BEGIN
+        INSERT INTO quotations_fts(quotations_fts, rowid, {_columns})
+        VALUES ('delete', old.id, {_old_values});
+        INSERT INTO quotations_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+]
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_index(engine: Engine) -> None:
+    """
+    Create the full-text index and its triggers on SQLite, populating it
+    from existing rows the first time it is created.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quotations_fts'")
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO quotations_fts(quotations_fts) VALUES ('rebuild')"))
+
+
+def search_terms(value: Optional[str]) -> List[str]:
+    return _TOKEN.findall(value or "")
+
+
+def match_expression(search: Optional[str]) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression where every word is a prefix match.
+
+    Returns None when there is nothing to search for.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_quotation_search(query: Query, search: Optional[str]) -> Tuple[Query, Optional[Any]]:
+    """
+    Restrict ``query`` to quotations matching ``search``.
+
+    Returns the filtered query and a rank expression to order by (best
+    first), or None when the results are not ranked. Databases without the
+    FTS5 index fall back to case-insensitive substring matching.
+    """
+    if not search_terms(search):
+        return query, None
+    
+    if query.session.get_bind().dialect.name == "sqlite":
+        hits = text(
+            "SELECT rowid, bm25(quotations_fts) AS rank FROM quotations_fts "
+            "WHERE quotations_fts MATCH :match"
+        ).bindparams(match=match_expression(search)).columns(
+            rowid=Integer, rank=Float
+        ).subquery("search_hits")
+        query = query.join(hits, hits.c.rowid == models.Quotation.id)
+        return query, hits.c.rank
+    
+    for term in search_terms(search):
+        query = query.filter(or_(*[
+            getattr(models.Quotation, column).ilike(f"%{term}%") for column in SEARCH_COLUMNS
+        ]))
+    return query, None
@@ -0,0 +1,40 @@
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+
+def increment_rows(
+    connection: Connection, table: Table, key_columns: Sequence[str], rows: List[dict]
+) -> None:
+    """
+    Add each row's non-key values onto the matching row of ``table``,
+    inserting it first if it does not exist.
+
+    Rows sharing a key are merged so each key is written once.
+    """
+    merged: Dict[Tuple, dict] = {}
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        target = merged.setdefault(key, {column: row[column] for column in key_columns})
+        for column, value in row.items():
+            if column not in key_columns:
+                target[column] = target.get(column, 0) + value
+    if not merged:
+        return
+    
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"Incremental upserts are not supported on {dialect}")
+    
+    stmt = insert(table)
+    value_columns = [column for column in next(iter(merged.values())) if column not in key_columns]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={column: table.c[column] + stmt.excluded[column] for column in value_columns},
+    )
+    connection.execute(stmt, list(merged.values()))
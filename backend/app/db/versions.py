@@ -0,0 +1,84 @@
+"""
+Version numbers behind the ETags of quotation and template responses.
+
+Each quotation and template row carries a ``version`` that goes up whenever
+the row or, for quotations, any of its line items changes. Each collection
+also has a version in ``collection_versions`` that goes up on any write to
+it, so list responses can be revalidated with a single-row lookup.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.upsert import increment_rows
+
+QUOTATIONS = "quotations"
+TEMPLATES = "templates"
+
+_COLLECTIONS = {
+    models.Quotation: QUOTATIONS,
+    models.QuotationItem: QUOTATIONS,
+    models.Template: TEMPLATES,
+}
+
+_BUMPED_KEY = "bumped_collections"
+
+
+def bump_collections(connection: Connection, *names: str) -> None:
+    increment_rows(
+        connection,
+        models.CollectionVersion.__table__,
+        ("name",),
+        [{"name": name, "version": 1} for name in names],
+    )
+
+
+def get_collection_version(db: Session, name: str) -> int:
+    version = db.query(models.CollectionVersion.version).filter(
+        models.CollectionVersion.name == name
+    ).scalar()
+    return version or 0
+
+
+def _bump_row(obj) -> None:
+    obj.version = (obj.version or 0) + 1
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_row_versions(session: Session, flush_context, instances) -> None:
+    bumped = set()
+    for obj in session.dirty:
+        if isinstance(obj, (models.Quotation, models.Template)) and session.is_modified(obj):
+            if id(obj) not in bumped:
+                _bump_row(obj)
+                bumped.add(id(obj))
+    
+    # Item changes count as a change to the quotation they belong to
+    items = [obj for obj in session.new if isinstance(obj, models.QuotationItem)]
+    items += [
+        obj for obj in session.dirty
+        if isinstance(obj, models.QuotationItem) and session.is_modified(obj)
+    ]
+    items += [obj for obj in session.deleted if isinstance(obj, models.QuotationItem)]
+    for item in items:
+        quotation = item.quotation
+        if quotation is None and item.quotation_id is not None:
+            quotation = session.get(models.Quotation, item.quotation_id)
+        if quotation is not None and quotation not in session.new and id(quotation) not in bumped:
+            _bump_row(quotation)
+            bumped.add(id(quotation))
+    
+    touched = session.info.setdefault(_BUMPED_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        collection = _COLLECTIONS.get(type(obj))
+        if collection:
+            touched.add(collection)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_collection_versions(session: Session, flush_context) -> None:
+    touched = session.info.pop(_BUMPED_KEY, None)
+    if touched:
+        bump_collections(session.connection(), *sorted(touched))
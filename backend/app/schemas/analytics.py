@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
+from app.schemas.user import UserSummary
 
 class AnalyticsOverview(BaseModel):
     total_quotations: int
@@ -8,6 +9,11 @@ class AnalyticsOverview(BaseModel):
     conversion_rate: float
     avg_quote_value: float
     trends: Dict[str, str]
+    period_days: Optional[int] = None
+    average_quotation_value: Optional[float] = None
+    status_distribution: Dict[str, int] = {}
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
 
 class ConversionData(BaseModel):
     month: str
@@ -26,10 +32,24 @@ class GeographicalData(BaseModel):
     revenue: float
     conversion_rate: float
 
+class HistogramBin(BaseModel):
+    lower: float
+    upper: Optional[float] = None
+    count: int
+
+class ValueDistribution(BaseModel):
+    template_type: str
+    status: str
+    count: int
+    median: float
+    p90: float
+    p99: float
+    histogram: List[HistogramBin]
+
 class ReportBase(BaseModel):
     name: str
     type: str  # Summary, Geographical, Template Analysis, Performance
-    format: Optional[str] = "PDF"
+    format: Optional[str] = "PDF"  # PDF, CSV, Excel
     filters: Optional[Dict[str, Any]] = None
 
 class ReportCreate(ReportBase):
@@ -57,7 +77,7 @@ class Report(ReportInDBBase):
     pass
 
 class ReportWithDetails(Report):
-    generated_by_user: Optional[Dict[str, Any]] = None
+    generated_by_user: Optional[UserSummary] = None
 
 class AnalyticsFilter(BaseModel):
     date_range: Optional[str] = "30days"  # 7days, 30days, 90days, 1year
@@ -1,6 +1,7 @@
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, field_validator
 from datetime import datetime
+from app.schemas.user import UserSummary
 
 class QuotationItemBase(BaseModel):
     name: str
@@ -13,12 +14,21 @@ class QuotationItemCreate(QuotationItemBase):
     pass
 
 class QuotationItemUpdate(BaseModel):
+    id: Optional[int] = None  # Existing item to change; omit to add a new item
     name: Optional[str] = None
     description: Optional[str] = None
     quantity: Optional[int] = None
     unit_price: Optional[float] = None
     total: Optional[float] = None
 
+    @field_validator("name", "quantity", "unit_price", "total")
+    @classmethod
+    def not_null(cls, value):
+        # These columns are NOT NULL: the fields may be left out, but not sent as null
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 class QuotationItem(QuotationItemBase):
     id: int
     quotation_id: int
@@ -46,6 +56,20 @@ class QuotationCreate(QuotationBase):
     template_id: Optional[int] = None
     items: List[QuotationItemCreate] = []
 
+class QuotationImportRow(QuotationCreate):
+    service_order_quotation_id: Optional[str] = None
+
+class QuotationImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class QuotationImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[QuotationImportError] = []
+    elapsed_seconds: float
+    rows_per_second: float
+
 class QuotationUpdate(BaseModel):
     description: Optional[str] = None
     customer_name: Optional[str] = None
@@ -61,6 +85,12 @@ class QuotationUpdate(BaseModel):
     quotation_valid_from: Optional[datetime] = None
     quotation_valid_to: Optional[datetime] = None
     location_data: Optional[Dict[str, Any]] = None
+    items: Optional[List[QuotationItemUpdate]] = None  # Full item list; unlisted items are removed
+
+class QuotationItemPatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace"]
+    path: str  # "/-" to add, "/{item_id}" or "/{item_id}/{field}"
+    value: Optional[Any] = None
 
 class QuotationInDBBase(QuotationBase):
     id: int
@@ -76,9 +106,22 @@ class QuotationInDBBase(QuotationBase):
 class Quotation(QuotationInDBBase):
     items: List[QuotationItem] = []
 
+class QuotationPage(BaseModel):
+    items: List[Quotation] = []
+    next_cursor: Optional[str] = None
+
+class QuotationTemplateSummary(BaseModel):
+    id: int
+    name: str
+    type: Optional[str] = None
+    category: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class QuotationWithDetails(Quotation):
-    created_by_user: Optional[Dict[str, Any]] = None
-    template: Optional[Dict[str, Any]] = None
+    created_by_user: Optional[UserSummary] = None
+    template: Optional[QuotationTemplateSummary] = None
 
 class QuotationFilter(BaseModel):
     status: Optional[str] = None
@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
+from app.schemas.user import UserSummary
 
 class TemplateFieldBase(BaseModel):
     label: str
@@ -49,7 +50,7 @@ class Template(TemplateInDBBase):
     pass
 
 class TemplateWithDetails(Template):
-    created_by_user: Optional[Dict[str, Any]] = None
+    created_by_user: Optional[UserSummary] = None
 
 class TemplateFilter(BaseModel):
     search: Optional[str] = None
@@ -47,6 +47,14 @@ class UserInDBBase(UserBase):
 class User(UserInDBBase):
     pass
 
+class UserSummary(BaseModel):
+    id: int
+    name: str
+    email: str
+
+    class Config:
+        from_attributes = True
+
 class UserInDB(UserInDBBase):
     hashed_password: str
 
@@ -56,7 +64,12 @@ class UserLogin(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
+    expires_in: int
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
\ No newline at end of file
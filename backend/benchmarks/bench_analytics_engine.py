@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare the analytics query paths: aggregating the raw quotations table,
+reading the daily rollup, and the in-memory columnar snapshot.
+
+Needs numpy for the columnar path.
+
+Usage: python benchmarks/bench_analytics_engine.py [rows]   (default 1,000,000)
+"""
+
+import sys
+import time
+from datetime import timedelta
+
+import common
+
+from sqlalchemy import and_, func
+
+from app.api.v1.endpoints import analytics
+from app.core.local_time import local_today
+from app.core.config import settings
+from app.db import columnar, models
+from app.db.daily_stats import rebuild_daily_stats
+from app.db.database import SessionLocal
+
+SCOPES = [("all users", 0), ("one user", 7)]
+WINDOWS = (30, 365)
+
+
+def raw_status_totals(db, scope, start_day, end_day):
+    quotation = models.Quotation
+    filters = [quotation.created_day >= start_day, quotation.created_day <= end_day]
+    if scope:
+        filters.append(quotation.created_by == scope)
+    rows = db.query(
+        quotation.status, func.count(quotation.id), func.sum(quotation.total_amount)
+    ).filter(and_(*filters)).group_by(quotation.status).all()
+    return {status: (count, amount) for status, count, amount in rows}
+
+
+def raw_daily_revenue(db, scope, start_day, end_day):
+    quotation = models.Quotation
+    filters = [
+        quotation.status == "approved",
+        quotation.created_day >= start_day,
+        quotation.created_day <= end_day,
+    ]
+    if scope:
+        filters.append(quotation.created_by == scope)
+    return db.query(
+        quotation.created_day, func.sum(quotation.total_amount)
+    ).filter(and_(*filters)).group_by(quotation.created_day).all()
+
+
+def main(rows: int):
+    if columnar.np is None:
+        raise SystemExit("numpy is not installed")
+
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, rows)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rebuild_daily_stats(db)
+        print(f"  built daily rollup in {time.perf_counter() - started:.1f}s")
+
+        settings.ANALYTICS_ENGINE = "columnar"
+        started = time.perf_counter()
+        snapshot = columnar.columnar_engine(db)
+        print(f"  loaded columnar snapshot in {time.perf_counter() - started:.1f}s")
+        refresh_ms = common.timed(lambda: columnar.columnar_engine(db))
+        print(f"  unchanged refresh check: {refresh_ms:.2f} ms")
+
+        end_day = local_today()
+        print(f"\n{'query':<28} {'scope':<10} {'days':>5} {'raw ms':>9} {'rollup ms':>10} {'columnar ms':>12}")
+        for scope_name, scope in SCOPES:
+            for days in WINDOWS:
+                start_day = end_day - timedelta(days=days)
+                cases = [
+                    (
+                        "status totals",
+                        lambda: raw_status_totals(db, scope, start_day, end_day),
+                        lambda: analytics._status_totals(db, scope, start_day, end_day),
+                        lambda: snapshot.status_totals(scope, start_day, end_day),
+                    ),
+                    (
+                        "daily revenue",
+                        lambda: raw_daily_revenue(db, scope, start_day, end_day),
+                        lambda: db.query(
+                            models.QuotationDailyStat.day, func.sum(models.QuotationDailyStat.total_amount)
+                        ).filter(
+                            models.QuotationDailyStat.user_id == scope,
+                            models.QuotationDailyStat.status == "approved",
+                            models.QuotationDailyStat.day >= start_day,
+                        ).group_by(models.QuotationDailyStat.day).all(),
+                        lambda: snapshot.daily_revenue(scope, start_day, end_day),
+                    ),
+                    (
+                        "geographical",
+                        None,
+                        None,
+                        lambda: snapshot.geographical(scope, start_day, end_day),
+                    ),
+                ]
+                for name, raw, rollup, columnar_fn in cases:
+                    settings.ANALYTICS_ENGINE = "sql"
+                    raw_ms = f"{common.timed(raw, repeat=3):9.1f}" if raw else f"{'-':>9}"
+                    rollup_ms = f"{common.timed(rollup):10.2f}" if rollup else f"{'-':>10}"
+                    settings.ANALYTICS_ENGINE = "columnar"
+                    columnar_ms = common.timed(columnar_fn)
+                    print(f"{name:<28} {scope_name:<10} {days:>5} {raw_ms} {rollup_ms} {columnar_ms:12.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+p50/p99 latency of the read-heavy endpoints under 200 concurrent clients,
+with ASYNC_DATABASE off (sync handlers on the thread pool) and on (async
+handlers on an AsyncSession).
+
+The setting is read when the app is imported, so each mode runs in its own
+process against the same seeded database. Requests are driven through the
+ASGI app directly, so the numbers reflect the server side only. Requests
+still in flight when the time is up are waited for and counted.
+
+Usage: python benchmarks/bench_async_reads.py [seconds] [rows]   (default 20 and 20,000)
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Tuple
+
+import common
+
+CLIENTS = 200
+# (path, query) pairs each client cycles through
+REQUESTS = [
+    ("/api/v1/quotations/", "limit=20"),
+    ("/api/v1/quotations/", "cursor=true&limit=20"),
+    ("/api/v1/quotations/public", "limit=20&bbox=-0.2,51.45,-0.05,51.55"),
+    ("/api/v1/quotations/map-feed", "bbox=-0.110,51.505,-0.105,51.510"),
+    ("/api/v1/analytics/overview", "days=30"),
+]
+
+
+async def client(app, headers, deadline: float, offset: int, latencies: dict, errors: list) -> None:
+    n = offset
+    while time.perf_counter() < deadline:
+        path, query = REQUESTS[n % len(REQUESTS)]
+        n += 1
+        started = time.perf_counter()
+        try:
+            status = await common.asgi_request(app, "GET", path, headers, query=query)
+        except Exception as exc:
+            # e.g. the sync engine's connection pool timing out
+            status = type(exc).__name__
+        if status != 200:
+            errors.append(status)
+            continue
+        latencies.setdefault(path, []).append((time.perf_counter() - started) * 1000)
+
+
+async def run(app, headers, seconds: float) -> Tuple[dict, list]:
+    latencies, errors = {}, []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*[client(app, headers, deadline, i, latencies, errors) for i in range(CLIENTS)])
+    return latencies, errors
+
+
+def measure(seconds: float) -> None:
+    """Run in a child process with ASYNC_DATABASE already set"""
+    from app.core.config import settings
+
+    _, headers = common.test_client()
+    import main as app_main
+
+    # The app logs a traceback for every failed request; only the count matters here
+    logging.getLogger("uvicorn.error").disabled = True
+    mode = "async" if settings.ASYNC_DATABASE else "sync"
+    asyncio.run(run(app_main.app, headers, 2))  # warm up
+    started = time.perf_counter()
+    latencies, errors = asyncio.run(run(app_main.app, headers, seconds))
+    elapsed = time.perf_counter() - started
+    everything = [sample for samples in latencies.values() for sample in samples]
+    for path, samples in [("all", everything)] + sorted(latencies.items()):
+        print(
+            f"{mode:<6} {path:<30} {common.percentile(samples, 50):>8.1f} {common.percentile(samples, 99):>8.1f}"
+            + (f" {len(everything) / elapsed:>7.0f} {len(errors):>7}" if path == "all" else ""),
+            flush=True,
+        )
+
+
+def main(seconds: float, rows: int):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, rows)
+    engine.dispose()
+
+    print(f"\n{'mode':<6} {'endpoint':<30} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>7} {'errors':>7}")
+    for async_database in ("false", "true"):
+        env = dict(os.environ, ASYNC_DATABASE=async_database, BENCH_DB_PATH=common.BENCH_DB_PATH)
+        subprocess.run([sys.executable, __file__, "--measure", str(seconds)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(float(sys.argv[2]))
+    else:
+        main(
+            float(sys.argv[1]) if len(sys.argv) > 1 else 20,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 20_000,
+        )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Requests per second and SQL statements per request on authenticated GETs:
+one authorized from the access token's claims alone, and /users/me, which
+still loads the users row, as every endpoint did before role claims.
+
+Requests are driven through the ASGI app directly by concurrent workers,
+so the numbers reflect the server side only.
+
+Usage: python benchmarks/bench_auth_claims.py [requests]   (default 5,000)
+"""
+
+import asyncio
+import sys
+import time
+
+import common
+
+from app.core.revocation import revocation_list
+
+CASES = [
+    ("token claims", "/api/v1/analytics/cache-stats"),
+    ("users row", "/api/v1/users/me"),
+]
+CONCURRENCY = (1, 8)
+# Unrelated revocations, so lookups run against a list that is not empty
+REVOKED = 10_000
+
+
+async def get(app, path, headers) -> None:
+    status = await common.asgi_request(app, "GET", path, headers)
+    if status != 200:
+        raise RuntimeError(f"GET {path} returned {status}")
+
+
+async def run(app, path, headers, requests: int, concurrency: int) -> float:
+    async def worker(count: int):
+        for _ in range(count):
+            await get(app, path, headers)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(requests // concurrency) for _ in range(concurrency)])
+    return requests / (time.perf_counter() - started)
+
+
+def main(requests: int):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    _, headers = common.test_client()
+
+    import main as app_main
+
+    expires_at = time.time() + 3600
+    revocation_list.revoke_tokens({f"revoked-{i}": expires_at for i in range(REVOKED)})
+    for user_id in range(2, common.USER_COUNT + 1):
+        revocation_list.revoke_user(user_id)
+
+    print(f"\n{'authorized by':<14} {'concurrency':>12} {'req/s':>9} {'queries/req':>12}")
+    for name, path in CASES:
+        for concurrency in CONCURRENCY:
+            asyncio.run(run(app_main.app, path, headers, 100, concurrency))  # warm up
+            with common.QueryCounter() as counter:
+                rate = asyncio.run(run(app_main.app, path, headers, requests, concurrency))
+            print(f"{name:<14} {concurrency:>12} {rate:>9.0f} {counter.count / requests:>12.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
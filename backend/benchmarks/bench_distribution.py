@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare exact quotation value percentiles, which sort every matching
+quotation, with the stored quantile sketches, and report the sketch error.
+
+Usage: python benchmarks/bench_distribution.py [rows]   (default 1,000,000)
+"""
+
+import sys
+import time
+
+import common
+
+from sqlalchemy import select
+
+from app.core.local_time import local_today
+from app.db import models
+from app.db.distribution import QUANTILES, rebuild_value_distribution, value_distribution
+from app.db.database import SessionLocal
+from app.db.monthly import month_range
+
+SCOPES = [("all users", 0), ("one user", 7)]
+
+
+def exact_distribution(db, scope, months):
+    """Sort the amounts of each (template type, status) group and read the percentiles off"""
+    quotation = models.Quotation
+    stmt = select(quotation.template_type, quotation.status, quotation.total_amount).where(
+        quotation.created_day >= months[0]
+    ).order_by(quotation.template_type, quotation.status, quotation.total_amount)
+    if scope:
+        stmt = stmt.where(quotation.created_by == scope)
+    groups = {}
+    for template_type, status, amount in db.execute(stmt):
+        groups.setdefault((template_type, status), []).append(amount or 0.0)
+    return {
+        key: {name: amounts[int(q * (len(amounts) - 1))] for name, q in QUANTILES.items()}
+        for key, amounts in groups.items()
+    }
+
+
+def main(rows: int):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, rows)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        written = rebuild_value_distribution(db)
+        print(f"  built value sketches and histograms ({written:,} rows) in {time.perf_counter() - started:.1f}s")
+
+        months = month_range(13, local_today().replace(day=1))
+        print(f"\n{'scope':<10} {'exact ms':>10} {'sketch ms':>10} {'max rel. error %':>17}")
+        for scope_name, scope in SCOPES:
+            exact = exact_distribution(db, scope, months)
+            sketch = value_distribution(db, scope, months)
+            errors = [
+                abs(group[name] - exact[(group["template_type"], group["status"])][name])
+                / exact[(group["template_type"], group["status"])][name] * 100
+                for group in sketch
+                for name in QUANTILES
+            ]
+            exact_ms = common.timed(lambda: exact_distribution(db, scope, months), repeat=3)
+            sketch_ms = common.timed(lambda: value_distribution(db, scope, months))
+            print(f"{scope_name:<10} {exact_ms:10.1f} {sketch_ms:10.2f} {max(errors):17.3f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Measure GET /quotations/export: time to first byte, total time and
+memory growth while streaming the whole table.
+
+The response is driven through the ASGI app directly and each chunk is
+discarded as it arrives, so the numbers reflect the server side only.
+
+Usage: python benchmarks/bench_export.py [rows]   (default 1,000,000)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import common
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def export(app, path: str, query: str, headers):
+    scope = common.asgi_scope(path, query, headers)
+    baseline = rss_bytes()
+    stats = {"status": None, "first_byte": None, "bytes": 0, "rss_growth": 0}
+    started = time.perf_counter()
+
+    requested = False
+
+    async def receive():
+        # Send the request once, then behave like a client that stays connected
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if stats["first_byte"] is None:
+                stats["first_byte"] = time.perf_counter() - started
+            stats["bytes"] += len(message["body"])
+            stats["rss_growth"] = max(stats["rss_growth"], rss_bytes() - baseline)
+
+    await app(scope, receive, send)
+    stats["total"] = time.perf_counter() - started
+    return stats
+
+
+def main(rows: int):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, rows)
+    client, headers = common.test_client()
+
+    import main as app_main
+
+    print(f"\n{'format':<8} {'status':>6} {'first byte ms':>14} {'total s':>8} {'MB out':>8} {'RSS growth MB':>14}")
+    for fmt in ("csv", "xlsx"):
+        stats = asyncio.run(export(app_main.app, "/api/v1/quotations/export", f"format={fmt}", headers))
+        print(
+            f"{fmt:<8} {stats['status']:>6} {stats['first_byte'] * 1000:>14.1f} {stats['total']:>8.1f} "
+            f"{stats['bytes'] / 1e6:>8.1f} {stats['rss_growth'] / 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
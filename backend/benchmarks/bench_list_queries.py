@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Count the SQL statements issued per quotation list request.
+
+The number must not grow with the page size: at most one statement for the
+collection version behind the ETag, one for the page and at most one for all of
+the page's line items. tests/test_query_counts.py checks the same on every test
+run.
+
+Usage: python benchmarks/bench_list_queries.py
+"""
+
+import common
+
+CASES = [
+    ("full", "/api/v1/quotations/", {}),
+    ("sparse", "/api/v1/quotations/", {"fields": "id,status,total_amount"}),
+    ("sparse+items", "/api/v1/quotations/", {"fields": "id,status", "include": "items"}),
+    ("cursor", "/api/v1/quotations/", {"cursor": "true"}),
+    ("public", "/api/v1/quotations/public", {}),
+    ("public sparse", "/api/v1/quotations/public", {"fields": "id,location_data"}),
+]
+
+
+def main():
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, 1000)
+    common.seed_items(engine)
+    client, headers = common.test_client()
+
+    print(f"\n{'case':<15} {'limit':>6} {'queries':>8} {'ms':>8}")
+    failures = 0
+    for name, path, params in CASES:
+        counts = set()
+        for limit in (10, 100):
+            with common.QueryCounter() as counter:
+                elapsed = common.timed(
+                    lambda: client.get(path, headers=headers, params={**params, "limit": limit}).raise_for_status(),
+                    repeat=1,
+                )
+            counts.add(counter.count)
+            print(f"{name:<15} {limit:>6} {counter.count:>8} {elapsed:>8.1f}")
+        if len(counts) > 1 or max(counts) > 3:
+            failures += 1
+            print(f"  !! query count for {name} depends on page size")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
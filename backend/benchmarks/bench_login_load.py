@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Latency of quotation list and create requests while a burst of logins runs
+alongside them, with password hashing on the API threads and in the
+hashing worker processes.
+
+Login clients retry after Retry-After when they get a 503, like a real
+client would. Requests are driven through the ASGI app directly, so the
+numbers reflect the server side only.
+
+Usage: python benchmarks/bench_login_load.py [seconds]   (default 10)
+"""
+
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlencode
+
+import common
+
+from app.core.config import settings
+from app.core.password_hasher import password_hasher
+
+LOGIN_CLIENTS = 64
+CRUD_CLIENTS = 8
+LIST_PATH = "/api/v1/quotations/"
+LOGIN_PATH = "/api/v1/auth/login"
+FORM = {"Content-Type": "application/x-www-form-urlencoded"}
+
+QUOTATION = json.dumps({
+    "description": "Load test", "customer_name": "Bench Ltd", "customer_email": "bench@example.co.uk",
+    "status": "draft", "total_amount": 1000, "items": [],
+}).encode()
+
+
+async def login_client(app, user: int, deadline: float, stats: dict) -> None:
+    body = urlencode({"username": f"bench{user}@clickquote.com", "password": "bench123"}).encode()
+    while time.perf_counter() < deadline:
+        status = await common.asgi_request(app, "POST", LOGIN_PATH, FORM, body)
+        stats[status] = stats.get(status, 0) + 1
+        if status == 503:
+            await asyncio.sleep(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+
+
+async def crud_client(app, headers, deadline: float, latencies: list) -> None:
+    create_headers = {**headers, "Content-Type": "application/json"}
+    n = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if n % 4 == 3:
+            status = await common.asgi_request(app, "POST", LIST_PATH, create_headers, QUOTATION)
+        else:
+            status = await common.asgi_request(app, "GET", LIST_PATH, headers, query="limit=20")
+        if status != 200:
+            raise RuntimeError(f"quotation request returned {status}")
+        latencies.append((time.perf_counter() - started) * 1000)
+        n += 1
+
+
+async def run(app, headers, seconds: float, logins: bool):
+    deadline = time.perf_counter() + seconds
+    latencies, login_stats = [], {}
+    clients = [crud_client(app, headers, deadline, latencies) for _ in range(CRUD_CLIENTS)]
+    if logins:
+        clients += [
+            login_client(app, 2 + i % (common.USER_COUNT - 1), deadline, login_stats)
+            for i in range(LOGIN_CLIENTS)
+        ]
+    await asyncio.gather(*clients)
+    return latencies, login_stats
+
+
+def main(seconds: float):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, 10_000)
+    _, headers = common.test_client()
+
+    import main as app_main
+
+    print(f"\n{'hashing':<9} {'logins':<7} {'crud req/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'logins/s':>9} {'503s':>6}")
+    for workers in (0, settings.PASSWORD_HASH_WORKERS or 2):
+        password_hasher.start(workers)
+        try:
+            # Start the worker processes and load the app before timing anything
+            asyncio.run(run(app_main.app, headers, 1, logins=True))
+            for logins in (False, True):
+                latencies, login_stats = asyncio.run(run(app_main.app, headers, seconds, logins))
+                print(
+                    f"{'threads' if workers == 0 else f'{workers} procs':<9} {'yes' if logins else 'no':<7} "
+                    f"{len(latencies) / seconds:>11.0f} {common.percentile(latencies, 50):>8.1f} "
+                    f"{common.percentile(latencies, 95):>8.1f} {common.percentile(latencies, 99):>8.1f} "
+                    f"{login_stats.get(200, 0) / seconds:>9.0f} {login_stats.get(503, 0):>6}"
+                )
+        finally:
+            password_hasher.stop()
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compare offset and keyset pagination of GET /quotations/ at increasing depth.
+
+Usage: python benchmarks/bench_pagination.py [rows]   (default 1,000,000)
+"""
+
+import sys
+
+import common
+
+from sqlalchemy import String, type_coerce
+
+from app.api.v1.endpoints.quotations import _read_quotations_page
+from app.core.pagination import encode_cursor
+from app.db import models
+from app.db.database import SessionLocal
+
+PAGE_SIZE = 100
+
+
+def main(rows: int):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, rows)
+
+    db = SessionLocal()
+    try:
+        base = db.query(models.Quotation)
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, rows - PAGE_SIZE) if d < rows]
+
+        print(f"\n{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+        for depth in depths:
+            # Build the cursor a keyset client would hold at this depth
+            after = None
+            if depth:
+                created_at, quotation_id = db.query(
+                    type_coerce(models.Quotation.created_at, String), models.Quotation.id
+                ).order_by(
+                    models.Quotation.created_at.desc(), models.Quotation.id.desc()
+                ).offset(depth - 1).limit(1).one()
+                after = encode_cursor(created_at, quotation_id)
+
+            offset_ms = common.timed(
+                lambda: base.order_by(
+                    models.Quotation.created_at.desc(), models.Quotation.id.desc()
+                ).offset(depth).limit(PAGE_SIZE).all()
+            )
+            keyset_ms = common.timed(lambda: _read_quotations_page(base, PAGE_SIZE, after))
+            db.expunge_all()
+            print(f"{depth:>10,} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
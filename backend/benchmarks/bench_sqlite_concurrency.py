@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Concurrent reads and writes against SQLite, with the old connection setup
+(rollback journal, synchronous=FULL, one shared pool, SQLite's default cache)
+and with the tuned one (WAL, synchronous=NORMAL, larger cache and mmap, a
+read-only pool and a single writer connection).
+
+Writer threads insert quotations one transaction at a time through
+SessionLocal while reader threads page through a user's recent quotations
+through ReadSessionLocal. The settings are read when the app is imported, so
+each setup runs in its own process against the same seeded database.
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [seconds] [rows]   (default 10 and 100,000)
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import common
+
+WRITERS = 4
+READERS = 16
+
+SETUPS = {
+    "before": {
+        "SQLITE_JOURNAL_MODE": "delete",
+        "SQLITE_SYNCHRONOUS": "full",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "SQLITE_MMAP_SIZE_BYTES": "0",
+        "SQLITE_TEMP_STORE": "default",
+        # The engine's old QueuePool defaults, shared by reads and writes
+        "DATABASE_WRITE_POOL_SIZE": "15",
+    },
+    "after": {},
+}
+
+
+def writer(deadline: float, first_row: int, latencies: list, errors: list) -> None:
+    from app.db import models
+    from app.db.database import SessionLocal
+
+    n = 0
+    while time.perf_counter() < deadline:
+        # Each writer in each setup inserts its own range of rows, so references never collide
+        row = next(common.quotation_rows(1, start=first_row + n))
+        n += 1
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            db.execute(models.Quotation.__table__.insert(), [row])
+            db.commit()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except Exception as exc:
+            errors.append(str(exc).splitlines()[0])
+        finally:
+            db.close()
+
+
+def reader(deadline: float, offset: int, latencies: list, errors: list) -> None:
+    from sqlalchemy import select
+
+    from app.db import models
+    from app.db.database import ReadSessionLocal
+
+    quotation = models.Quotation
+    n = offset
+    while time.perf_counter() < deadline:
+        user_id = n % common.USER_COUNT + 1
+        n += 1
+        started = time.perf_counter()
+        db = ReadSessionLocal()
+        try:
+            db.execute(
+                select(quotation.id, quotation.customer_name, quotation.total_amount)
+                .where(quotation.created_by == user_id)
+                .order_by(quotation.created_at.desc())
+                .limit(20)
+            ).all()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except Exception as exc:
+            errors.append(str(exc).splitlines()[0])
+        finally:
+            db.close()
+
+
+def measure(name: str, seconds: float) -> None:
+    """Run in a child process with the setup's settings already in the environment"""
+    first_row = 10_000_000 * (list(SETUPS).index(name) + 1)
+    deadline = time.perf_counter() + seconds
+    results = {"write": ([], []), "read": ([], [])}
+    threads = [
+        threading.Thread(target=writer, args=(deadline, first_row + 1_000_000 * i, *results["write"])) for i in range(WRITERS)
+    ] + [
+        threading.Thread(target=reader, args=(deadline, i, *results["read"])) for i in range(READERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for kind, (latencies, errors) in results.items():
+        print(
+            f"{name:<7} {kind:<6} {common.percentile(latencies, 50):>8.1f} {common.percentile(latencies, 99):>8.1f}"
+            f" {len(latencies) / seconds:>8.0f} {len(errors):>7}",
+            flush=True,
+        )
+
+
+def main(seconds: float, rows: int):
+    engine = common.reset_database()
+    common.seed_users(engine)
+    common.seed_quotations(engine, rows)
+    engine.dispose()
+
+    print(f"\n{WRITERS} writer and {READERS} reader threads for {seconds:g}s each")
+    print(f"{'setup':<7} {'kind':<6} {'p50 ms':>8} {'p99 ms':>8} {'per s':>8} {'errors':>7}")
+    for name, overrides in SETUPS.items():
+        env = dict(os.environ, BENCH_DB_PATH=common.BENCH_DB_PATH, **overrides)
+        subprocess.run([sys.executable, __file__, "--measure", name, str(seconds)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(sys.argv[2], float(sys.argv[3]))
+    else:
+        main(
+            float(sys.argv[1]) if len(sys.argv) > 1 else 10,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 100_000,
+        )
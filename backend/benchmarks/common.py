@@ -0,0 +1,238 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark runs against its own throwaway SQLite database so it never
+touches clickquote.db. Import this module before anything from ``app`` so
+the database URL is in place when the settings are loaded.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DB_PATH = os.environ.get(
+    "BENCH_DB_PATH", os.path.join(tempfile.gettempdir(), "clickquote_bench.db")
+)
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB_PATH}")
+sys.path.insert(0, BACKEND_DIR)
+
+from generate_dummy_data import (  # noqa: E402
+    COMPANY_NAMES,
+    LONDON_POSTCODES,
+    SERVICE_DESCRIPTIONS,
+    STATUSES,
+)
+from app.core.geo import location_columns  # noqa: E402
+from app.core.local_time import created_columns  # noqa: E402
+
+USER_COUNT = 50
+
+
+def reset_database():
+    """Remove any previous benchmark database and create the schema"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(BENCH_DB_PATH + suffix):
+            os.remove(BENCH_DB_PATH + suffix)
+
+    from app.db.database import engine
+    from app.db.schema import sync_schema
+
+    sync_schema(engine)
+    return engine
+
+
+def seed_users(engine, count: int = USER_COUNT):
+    """Insert benchmark users; user 1 is an admin"""
+    from app.core.security import get_password_hash
+
+    hashed = get_password_hash("bench123")
+    rows = [
+        {
+            "name": f"Bench User {i}",
+            "email": f"bench{i}@clickquote.com",
+            "hashed_password": hashed,
+            "role": "admin" if i == 1 else "user",
+            "is_active": True,
+        }
+        for i in range(1, count + 1)
+    ]
+    from app.db import models
+
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), rows)
+
+
+def quotation_rows(count: int, start: int = 0, users: int = USER_COUNT, seed: int = 42):
+    """Yield plain dicts suitable for a Core executemany into ``quotations``"""
+    rng = random.Random(seed + start)
+    now = datetime.utcnow()
+    for i in range(start, start + count):
+        location = rng.choice(LONDON_POSTCODES)
+        company = rng.choice(COMPANY_NAMES)
+        created = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        location_data = {
+            "lat": location["lat"] + rng.uniform(-0.01, 0.01),
+            "lng": location["lng"] + rng.uniform(-0.01, 0.01),
+            "postcode": location["postcode"],
+            "area": location["area"],
+        }
+        yield {
+            "service_order_quotation_id": f"BENCH-{i:08d}",
+            "description": f"{rng.choice(SERVICE_DESCRIPTIONS)} - {location['area']}",
+            "customer_name": company,
+            "customer_email": f"contact{i}@example.co.uk",
+            "site_address": f"{rng.randint(1, 999)} High Street, {location['area']}, London {location['postcode']}",
+            "external_reference": f"REF{i:06d}",
+            "status": rng.choice(STATUSES),
+            "template_type": rng.choice(["standard", "ukpn", "industrial"]),
+            "created_by": rng.randint(1, users),
+            "total_amount": round(rng.uniform(5000, 50000), 2),
+            "location_data": location_data,
+            **location_columns(location_data),
+            **created_columns(created),
+            "updated_at": created,
+        }
+
+
+def seed_quotations(engine, count: int, batch_size: int = 20000):
+    """Bulk load ``count`` quotations with Core executemany"""
+    from app.db import models
+
+    table = models.Quotation.__table__
+    started = time.perf_counter()
+    inserted = 0
+    while inserted < count:
+        size = min(batch_size, count - inserted)
+        with engine.begin() as conn:
+            conn.execute(table.insert(), list(quotation_rows(size, start=inserted)))
+        inserted += size
+        print(f"  seeded {inserted:,}/{count:,} quotations", end="\r", flush=True)
+    print(f"  seeded {count:,} quotations in {time.perf_counter() - started:.1f}s")
+
+
+def timed(fn, repeat: int = 5):
+    """Return the median wall time of ``fn`` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+
+def seed_items(engine, per_quotation: int = 3):
+    """Give every quotation ``per_quotation`` line items"""
+    from app.db import models
+
+    with engine.begin() as conn:
+        ids = [row[0] for row in conn.execute(models.Quotation.__table__.select().with_only_columns(models.Quotation.id))]
+        rows = [
+            {
+                "quotation_id": quotation_id,
+                "name": f"Line {n}",
+                "quantity": n + 1,
+                "unit_price": 100.0,
+                "total": 100.0 * (n + 1),
+            }
+            for quotation_id in ids
+            for n in range(per_quotation)
+        ]
+        conn.execute(models.QuotationItem.__table__.insert(), rows)
+
+
+def test_client():
+    """Return a TestClient for the app and auth headers for the admin user"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    client = TestClient(main.app)
+    response = client.post(
+        "/api/v1/auth/login", data={"username": "bench1@clickquote.com", "password": "bench123"}
+    )
+    response.raise_for_status()
+    return client, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def asgi_scope(path: str, query: str, headers, method: str = "GET") -> dict:
+    """An HTTP scope for driving the ASGI app directly, without a client in between"""
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+        "root_path": "",
+    }
+
+
+async def asgi_request(app, method: str, path: str, headers, body: bytes = b"", query: str = "") -> int:
+    """Send one request through the ASGI app and return the response status"""
+    status = None
+    requested = False
+
+    async def receive():
+        # Send the request once, then behave like a client that stays connected
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(asgi_scope(path, query, headers, method), receive, send)
+    return status
+
+
+class QueryCounter:
+    """Count SQL statements sent through the given engines (by default all of the app's) while active"""
+
+    def __init__(self, *engines):
+        if not engines:
+            from app.db.database import async_engine, engine, read_engine
+
+            engines = (engine, read_engine) + ((async_engine.sync_engine,) if async_engine is not None else ())
+        self.engines = engines
+        self.count = 0
+
+    def _before_cursor_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
@@ -125,7 +125,7 @@ def generate_dummy_quotations(count: int = 50) -> List[Dict[str, Any]]:
         service = random.choice(SERVICE_DESCRIPTIONS)
         
         # Generate dates
-        created_date = datetime.now() - timedelta(days=random.randint(1, 90))
+        created_date = datetime.utcnow() - timedelta(days=random.randint(1, 90))
         valid_from = created_date + timedelta(days=random.randint(0, 5))
         valid_to = valid_from + timedelta(days=random.randint(30, 180))
         
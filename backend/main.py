@@ -1,12 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.db.database import engine
-from app.db import models
+from app.core.password_hasher import HashingOverloaded, password_hasher
+from app.db.database import async_engine, engine
+from app.db.report_worker import report_worker
+from app.db.revocations import revoked_token_loader
+from app.db.schema import sync_schema
 from app.api.v1.api import api_router
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Create database tables and indexes
+sync_schema(engine)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -26,6 +30,51 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+@app.exception_handler(HashingOverloaded)
+def hashing_overloaded(request: Request, exc: HashingOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in requests, please retry shortly"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+@app.on_event("startup")
+def start_report_worker():
+    report_worker.start()
+
+@app.on_event("startup")
+def start_password_hasher():
+    password_hasher.start()
+
+@app.on_event("startup")
+def start_revoked_token_loader():
+    revoked_token_loader.start()
+
+@app.on_event("startup")
+async def open_async_engine():
+    # The first connection runs the dialect setup and SQLite pragmas under a lock
+    # bound to one event loop; make it here rather than in racing requests
+    if async_engine is not None:
+        async with async_engine.connect():
+            pass
+
+@app.on_event("shutdown")
+def stop_report_worker():
+    report_worker.stop()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.stop()
+
+@app.on_event("shutdown")
+def stop_revoked_token_loader():
+    revoked_token_loader.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
 @app.get("/")
 def read_root():
     return {"message": "Click & Quote API is running!", "version": settings.PROJECT_VERSION}
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the Click & Quote backend.
+
+Usage:
+    python manage.py rebuild-counters
+    python manage.py backfill-daily-stats
+    python manage.py backfill-value-distribution
+    python manage.py generate-reports
+    python manage.py check-query-plans
+    python manage.py check-database-pragmas
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.db.database import SessionLocal, engine
+from app.db.schema import sync_schema
+
+
+def rebuild_counters(args):
+    """Rebuild the per-user quotation counters from the quotations table"""
+    from app.db.counters import rebuild_counters
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_counters(db)
+    finally:
+        db.close()
+    print(f"Rebuilt quotation counters ({rows} rows)")
+
+
+def backfill_daily_stats(args):
+    """Rebuild the daily analytics rollup from the quotations table"""
+    from app.db.daily_stats import rebuild_daily_stats
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_daily_stats(db)
+    finally:
+        db.close()
+    print(f"Backfilled quotation daily stats ({rows} rows)")
+
+
+def backfill_value_distribution(args):
+    """Rebuild the quotation value sketches and histograms from the quotations table"""
+    from app.db.distribution import rebuild_value_distribution
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_value_distribution(db)
+    finally:
+        db.close()
+    print(f"Backfilled quotation value distribution ({rows} rows)")
+
+
+def generate_reports(args):
+    """Generate every pending report in this process"""
+    from app.db.reports import generate_report, pending_report_ids
+
+    db = SessionLocal()
+    try:
+        report_ids = pending_report_ids(db)
+    finally:
+        db.close()
+    for report_id in report_ids:
+        print(f"Report {report_id}: {generate_report(report_id)}")
+
+
+def check_query_plans(args):
+    """Fail unless the analytics queries on quotations search the expected indexes"""
+    from app.db.query_plans import check_query_plans as run_checks
+
+    db = SessionLocal()
+    try:
+        results = run_checks(db)
+    finally:
+        db.close()
+    for check, plan, passed in results:
+        print(f"{'ok' if passed else 'FAIL':<5} {check.name}: expected {check.index}")
+        for line in plan:
+            print(f"        {line}")
+    if not all(passed for _, _, passed in results):
+        sys.exit(1)
+
+
+def check_database_pragmas(args):
+    """Fail unless connections from every SQLite engine got the configured pragmas"""
+    from app.db.database import async_engine, read_engine
+    from app.db.pragmas import check_async_engine_pragmas, check_engine_pragmas
+
+    results = [
+        ("write", check_engine_pragmas(engine)),
+        ("read", check_engine_pragmas(read_engine, read_only=True)),
+    ]
+    if async_engine is not None:
+        results.append(("async read", asyncio.run(check_async_engine_pragmas(async_engine, read_only=True))))
+    passed = True
+    for name, checks in results:
+        for pragma, expected, actual in checks:
+            passed = passed and expected == actual
+            print(f"{'ok' if expected == actual else 'FAIL':<5} {name} {pragma}: expected {expected}, got {actual}")
+    if not passed:
+        sys.exit(1)
+
+
+COMMANDS = {
+    "rebuild-counters": rebuild_counters,
+    "backfill-daily-stats": backfill_daily_stats,
+    "backfill-value-distribution": backfill_value_distribution,
+    "generate-reports": generate_reports,
+    "check-query-plans": check_query_plans,
+    "check-database-pragmas": check_database_pragmas,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Click & Quote maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    sync_schema(engine)
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
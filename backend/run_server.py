@@ -1,12 +1,12 @@
 import uvicorn
 from app.db.database import SessionLocal, engine
-from app.db import models
+from app.db.schema import sync_schema
 from app.db.init_db import init_db
 
 def init_database():
     """Initialize database with sample data"""
-    # Create database tables first
-    models.Base.metadata.create_all(bind=engine)
+    # Create database tables and indexes first
+    sync_schema(engine)
     
     # Then initialize with sample data
     db = SessionLocal()
@@ -0,0 +1,72 @@
+"""
+Shared fixtures. The tests run against a throwaway SQLite database, so the
+URL is set before anything from ``app`` loads the settings.
+"""
+
+import os
+import sys
+import tempfile
+
+TEST_DB_DIR = tempfile.mkdtemp(prefix="clickquote_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'test.db')}"
+# Hash on the calling thread; the tests never start the app's worker processes
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["REPORTS_DIR"] = os.path.join(TEST_DB_DIR, "reports")
+# Cover the async read handlers unless a run asks for the sync ones with ASYNC_DATABASE=false
+os.environ.setdefault("ASYNC_DATABASE", "true")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.init_db import init_db  # noqa: E402
+
+db = SessionLocal()
+try:
+    init_db(db)
+finally:
+    db.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(main.app)
+
+
+def login(client: TestClient, email: str = "admin@clickquote.com", password: str = "admin123") -> dict:
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client) -> dict:
+    return login(client)
+
+
+@pytest.fixture
+def user_headers(client) -> dict:
+    return login(client, "user@clickquote.com", "user123")
+
+
+@pytest.fixture
+def make_quotation(client, admin_headers):
+    """Create a quotation through the API and return its JSON"""
+
+    def make(**fields) -> dict:
+        body = {
+            "description": "Test quotation",
+            "customer_name": "Test Customer",
+            "customer_email": "customer@example.com",
+            "status": "draft",
+            "total_amount": 100.0,
+            "items": [],
+            **fields,
+        }
+        response = client.post("/api/v1/quotations/", headers=admin_headers, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    return make
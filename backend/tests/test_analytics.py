@@ -0,0 +1,16 @@
+from app.core.local_time import last_days, local_today
+
+
+def test_last_days_covers_exactly_that_many_days():
+    start_day, end_day = last_days(7)
+    assert end_day == local_today()
+    assert (end_day - start_day).days + 1 == 7
+    assert last_days(1) == (end_day, end_day)
+
+
+def test_one_day_revenue_trend_is_today_only(client, admin_headers, make_quotation):
+    make_quotation(status="approved", total_amount=250.0)
+
+    response = client.get("/api/v1/analytics/revenue-trend", headers=admin_headers, params={"days": 1})
+    assert response.status_code == 200, response.text
+    assert [point["date"] for point in response.json()["revenue_data"]] == [str(local_today())]
@@ -0,0 +1,116 @@
+"""
+ResultCache drops entries by tag and stays under its byte budget, and the
+analytics endpoints built on it never serve figures from before a write.
+"""
+
+import threading
+import time
+
+from app.core.cache import ResultCache, _estimate_size
+
+VALUE = "x" * 1000
+
+
+def test_hit_after_miss():
+    cache = ResultCache(max_bytes=100_000)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return VALUE
+
+    assert cache.get_or_compute("a", compute) == VALUE
+    assert cache.get_or_compute("a", compute) == VALUE
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_invalidate_tags_drops_only_that_tag():
+    cache = ResultCache(max_bytes=100_000)
+    cache.get_or_compute("a", lambda: "a1", tag="scope-1")
+    cache.get_or_compute("b", lambda: "b1", tag="scope-2")
+
+    cache.invalidate_tags("scope-1")
+
+    assert cache.get_or_compute("a", lambda: "a2", tag="scope-1") == "a2"
+    assert cache.get_or_compute("b", lambda: "b2", tag="scope-2") == "b1"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_value_computed_across_an_invalidation_is_not_stored():
+    cache = ResultCache(max_bytes=100_000)
+
+    def stale():
+        cache.invalidate_tags("scope")
+        return "stale"
+
+    assert cache.get_or_compute("a", stale, tag="scope") == "stale"
+    assert cache.get_or_compute("a", lambda: "fresh", tag="scope") == "fresh"
+
+
+def test_least_recently_used_entry_is_evicted_over_budget():
+    size = _estimate_size(VALUE)
+    cache = ResultCache(max_bytes=size * 2)
+    cache.get_or_compute("a", lambda: VALUE)
+    cache.get_or_compute("b", lambda: VALUE)
+    cache.get_or_compute("a", lambda: VALUE)
+
+    cache.get_or_compute("c", lambda: VALUE)
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+
+def test_value_larger_than_budget_is_not_stored():
+    cache = ResultCache(max_bytes=_estimate_size(VALUE) - 1)
+    assert cache.get_or_compute("a", lambda: VALUE) == VALUE
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResultCache(max_bytes=100_000)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return VALUE
+
+    leader = threading.Thread(target=cache.get_or_compute, args=("a", compute))
+    leader.start()
+    started.wait(5)
+    results = []
+    follower = threading.Thread(target=lambda: results.append(cache.get_or_compute("a", compute)))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == [VALUE]
+    assert len(calls) == 1
+
+
+def test_analytics_reflect_a_new_quotation(client, admin_headers, make_quotation):
+    def overview() -> dict:
+        response = client.get("/api/v1/analytics/overview", headers=admin_headers, params={"days": 7})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    before = overview()
+    assert overview() == before
+
+    make_quotation(status="approved", total_amount=250.0)
+
+    after = overview()
+    assert after["total_quotations"] == before["total_quotations"] + 1
+    assert after["total_revenue"] == before["total_revenue"] + 250.0
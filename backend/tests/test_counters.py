@@ -0,0 +1,81 @@
+"""
+quotation_counters is kept up to date on every write; after any sequence of
+writes it must hold what rebuilding it from the quotations table gives.
+"""
+
+import pytest
+
+from app.db import models
+from app.db.counters import rebuild_counters
+from app.db.database import SessionLocal
+
+ITEM = {"name": "Labour", "quantity": 1, "unit_price": 80.0, "total": 80.0}
+
+
+def counter_rows() -> dict:
+    db = SessionLocal()
+    try:
+        return {
+            (row.user_id, row.status): (row.count, round(row.total_amount, 6))
+            for row in db.query(models.QuotationCounter)
+            # Rows counted down to zero are kept; a rebuild does not write them
+            if row.count != 0
+        }
+    finally:
+        db.close()
+
+
+def rebuilt_rows() -> dict:
+    db = SessionLocal()
+    try:
+        rebuild_counters(db)
+    finally:
+        db.close()
+    return counter_rows()
+
+
+@pytest.fixture
+def user_quotation(client, user_headers) -> dict:
+    response = client.post("/api/v1/quotations/", headers=user_headers, json={
+        "description": "Counted", "customer_name": "Counter Ltd", "customer_email": "count@example.com",
+        "status": "draft", "total_amount": 120.0, "items": [ITEM],
+    })
+    response.raise_for_status()
+    return response.json()
+
+
+def test_counters_match_a_rebuild_after_create(user_quotation, make_quotation):
+    make_quotation(status="approved", total_amount=300.0)
+    assert counter_rows() == rebuilt_rows()
+
+
+def test_counters_match_a_rebuild_after_update_and_status_change(client, user_headers, user_quotation):
+    path = f"/api/v1/quotations/{user_quotation['id']}"
+    client.put(path, headers=user_headers, json={"total_amount": 450.5}).raise_for_status()
+    client.put(path, headers=user_headers, json={"status": "approved"}).raise_for_status()
+    assert counter_rows() == rebuilt_rows()
+
+
+def test_counters_match_a_rebuild_after_delete(client, user_headers, user_quotation):
+    client.delete(f"/api/v1/quotations/{user_quotation['id']}", headers=user_headers).raise_for_status()
+    assert counter_rows() == rebuilt_rows()
+
+
+def test_counters_match_a_rebuild_after_import(client, admin_headers):
+    content = b"description,customer_name,customer_email,status,total_amount\n" + b"".join(
+        b"Imported,Import %d,import@example.com,submitted,%d.25\n" % (n, n) for n in range(5)
+    )
+    response = client.post("/api/v1/quotations/import", headers=admin_headers, files={"file": ("rows.csv", content)})
+    assert response.json()["imported"] == 5
+    assert counter_rows() == rebuilt_rows()
+
+
+def test_stats_overview_reads_the_counters(client, user_headers, user_quotation):
+    before = client.get("/api/v1/quotations/stats/overview", headers=user_headers).json()
+    client.put(
+        f"/api/v1/quotations/{user_quotation['id']}", headers=user_headers, json={"status": "approved"}
+    ).raise_for_status()
+    after = client.get("/api/v1/quotations/stats/overview", headers=user_headers).json()
+
+    assert after["total_quotations"] == before["total_quotations"]
+    assert after["approved_quotations"] == before["approved_quotations"] + 1
@@ -0,0 +1,66 @@
+from app.db import models
+from app.db.database import SessionLocal
+
+
+def revalidate(client, headers, path: str, etag: str) -> int:
+    return client.get(path, headers={**headers, "If-None-Match": etag}).status_code
+
+
+def test_quotation_etag_changes_with_its_template(client, admin_headers, make_quotation):
+    db = SessionLocal()
+    try:
+        template = models.Template(name="Roofing", fields=[], created_by=1)
+        db.add(template)
+        db.commit()
+        template_id = template.id
+    finally:
+        db.close()
+    quotation = make_quotation(template_id=template_id)
+    path = f"/api/v1/quotations/{quotation['id']}"
+    etag = client.get(path, headers=admin_headers).headers["ETag"]
+    assert revalidate(client, admin_headers, path, etag) == 304
+
+    client.put(
+        f"/api/v1/templates/{template_id}", headers=admin_headers, json={"name": "Roofing and guttering"}
+    ).raise_for_status()
+
+    assert revalidate(client, admin_headers, path, etag) == 200
+    assert client.get(path, headers=admin_headers).json()["template"]["name"] == "Roofing and guttering"
+
+
+def test_quotation_etag_changes_with_its_creator(client, user_headers):
+    response = client.post("/api/v1/quotations/", headers=user_headers, json={
+        "description": "d", "customer_name": "C", "customer_email": "c@example.com", "items": [],
+    })
+    response.raise_for_status()
+    path = f"/api/v1/quotations/{response.json()['id']}"
+    etag = client.get(path, headers=user_headers).headers["ETag"]
+    name = client.get("/api/v1/users/me", headers=user_headers).json()["name"]
+
+    client.put("/api/v1/users/me", headers=user_headers, params={"name": name + " Jr"}).raise_for_status()
+    try:
+        assert revalidate(client, user_headers, path, etag) == 200
+    finally:
+        client.put("/api/v1/users/me", headers=user_headers, params={"name": name}).raise_for_status()
+
+
+def test_template_etag_changes_with_its_creator(client, user_headers):
+    user_id = client.get("/api/v1/users/me", headers=user_headers).json()["id"]
+    db = SessionLocal()
+    try:
+        template = models.Template(name="Windows", fields=[], created_by=user_id)
+        db.add(template)
+        db.commit()
+        path = f"/api/v1/templates/{template.id}"
+    finally:
+        db.close()
+    etag = client.get(path, headers=user_headers).headers["ETag"]
+    assert revalidate(client, user_headers, path, etag) == 304
+    name = client.get("/api/v1/users/me", headers=user_headers).json()["name"]
+
+    client.put("/api/v1/users/me", headers=user_headers, params={"name": name + " Jr"}).raise_for_status()
+    try:
+        assert revalidate(client, user_headers, path, etag) == 200
+        assert client.get(path, headers=user_headers).json()["created_by_user"]["name"] == name + " Jr"
+    finally:
+        client.put("/api/v1/users/me", headers=user_headers, params={"name": name}).raise_for_status()
@@ -0,0 +1,87 @@
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+from app.api.v1.endpoints.quotations import EXPORT_FIELDS, EXPORT_ITEM_FIELDS
+
+SHEET = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+ITEMS = [
+    {"name": "Labour", "quantity": 2, "unit_price": 80.0, "total": 160.0},
+    {"name": "Parts", "quantity": 1, "unit_price": 40.0, "total": 40.0},
+]
+
+
+def export(client, headers, **params):
+    response = client.get("/api/v1/quotations/export", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def csv_rows(client, headers, **params) -> list:
+    return list(csv.DictReader(io.StringIO(export(client, headers, format="csv", **params).text)))
+
+
+def xlsx_rows(content: bytes) -> list:
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.testzip() is None
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    return [
+        ["".join(cell.itertext()) for cell in row.iter(f"{SHEET}c")]
+        for row in sheet.iter(f"{SHEET}row")
+    ]
+
+
+def test_csv_export_has_every_field_and_applies_filters(client, admin_headers, make_quotation):
+    approved = make_quotation(customer_name="Exported Ltd", status="approved", total_amount=321.5)
+    make_quotation(customer_name="Exported Ltd", status="draft")
+
+    response = export(client, admin_headers, format="csv", customer_name="Exported Ltd", status="approved")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="quotations.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert [row["id"] for row in rows] == [str(approved["id"])]
+    assert rows[0]["status"] == "approved" and float(rows[0]["total_amount"]) == 321.5
+
+
+def test_csv_export_of_selected_fields(client, admin_headers, make_quotation):
+    quotation = make_quotation(customer_name="Narrow Export Ltd")
+
+    rows = csv_rows(client, admin_headers, customer_name="Narrow Export Ltd", fields="id,customer_name")
+
+    assert rows == [{"id": str(quotation["id"]), "customer_name": "Narrow Export Ltd"}]
+
+
+def test_csv_export_with_items_has_one_row_per_item(client, admin_headers, make_quotation):
+    quotation = make_quotation(customer_name="Itemised Export Ltd", items=ITEMS)
+    make_quotation(customer_name="Itemised Export Ltd", items=[])
+
+    rows = csv_rows(client, admin_headers, customer_name="Itemised Export Ltd", include="items")
+
+    assert list(rows[0]) == EXPORT_FIELDS + [f"item_{name}" for name in EXPORT_ITEM_FIELDS]
+    itemised = [row for row in rows if row["id"] == str(quotation["id"])]
+    assert [row["item_name"] for row in itemised] == ["Labour", "Parts"]
+    # A quotation without items still gets its row, with empty item columns
+    bare = [row for row in rows if row["id"] != str(quotation["id"])]
+    assert len(bare) == 1 and bare[0]["item_name"] == ""
+
+
+def test_xlsx_export_is_a_readable_workbook(client, admin_headers, make_quotation):
+    quotation = make_quotation(customer_name="Sheet Export <&> Ltd", total_amount=99.0)
+
+    response = export(
+        client, admin_headers, format="xlsx", customer_name="Sheet Export <&> Ltd", fields="id,customer_name,total_amount",
+    )
+    assert 'filename="quotations.xlsx"' in response.headers["content-disposition"]
+
+    header, *rows = xlsx_rows(response.content)
+    assert header == ["id", "customer_name", "total_amount"]
+    assert rows == [[str(quotation["id"]), "Sheet Export <&> Ltd", "99.0"]]
+
+
+def test_export_rejects_unknown_format(client, admin_headers):
+    response = client.get("/api/v1/quotations/export", headers=admin_headers, params={"format": "pdf"})
+    assert response.status_code == 422
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.db import models
+from app.db.database import SessionLocal
+
+BODY = {
+    "description": "Idempotent",
+    "customer_name": "Retry Ltd",
+    "customer_email": "retry@example.com",
+    "items": [],
+}
+
+
+def create(client, headers, key: str, body: dict = BODY):
+    return client.post("/api/v1/quotations/", headers={**headers, "Idempotency-Key": key}, json=body)
+
+
+def expire(*keys: str) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key.in_(keys)).update(
+            {"created_at": datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS + 1)},
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def stored_keys(*keys: str) -> set:
+    db = SessionLocal()
+    try:
+        return {key for (key,) in db.query(models.IdempotencyKey.key).filter(models.IdempotencyKey.key.in_(keys))}
+    finally:
+        db.close()
+
+
+def test_retry_replays_the_stored_response(client, admin_headers):
+    first = create(client, admin_headers, "replay")
+    retry = create(client, admin_headers, "replay")
+
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+def test_same_key_with_a_different_body_is_rejected(client, admin_headers):
+    create(client, admin_headers, "different-body").raise_for_status()
+    response = create(client, admin_headers, "different-body", {**BODY, "description": "Changed"})
+    assert response.status_code == 422
+
+
+def test_keys_belong_to_one_user(client, admin_headers, user_headers):
+    mine = create(client, admin_headers, "shared-key").json()
+    theirs = create(client, user_headers, "shared-key")
+
+    assert theirs.status_code == 200
+    assert "Idempotent-Replayed" not in theirs.headers
+    assert theirs.json()["id"] != mine["id"]
+
+
+def test_expired_key_runs_the_request_again(client, admin_headers):
+    first = create(client, admin_headers, "expiring").json()
+    expire("expiring")
+
+    retry = create(client, admin_headers, "expiring")
+    assert "Idempotent-Replayed" not in retry.headers
+    assert retry.json()["id"] != first["id"]
+
+
+def test_expired_keys_are_deleted_when_another_key_is_stored(client, admin_headers):
+    create(client, admin_headers, "abandoned-1").raise_for_status()
+    create(client, admin_headers, "abandoned-2").raise_for_status()
+    expire("abandoned-1", "abandoned-2")
+
+    create(client, admin_headers, "unrelated").raise_for_status()
+    assert stored_keys("abandoned-1", "abandoned-2", "unrelated") == {"unrelated"}
@@ -0,0 +1,55 @@
+import pytest
+
+# Two sites about 1.4 km apart in London, and one in Manchester
+GREENWICH = {"lat": 51.4826, "lng": -0.0077}
+DEPTFORD = {"lat": 51.4779, "lng": -0.0265}
+MANCHESTER = {"lat": 53.4808, "lng": -2.2426}
+
+
+def listed_ids(client, headers, **params) -> set:
+    response = client.get("/api/v1/quotations/", headers=headers, params={"limit": 100000, **params})
+    assert response.status_code == 200, response.text
+    return {quotation["id"] for quotation in response.json()}
+
+
+@pytest.fixture
+def sites(make_quotation) -> dict:
+    return {
+        name: make_quotation(description=name, location_data=location)["id"]
+        for name, location in [("greenwich", GREENWICH), ("deptford", DEPTFORD), ("manchester", MANCHESTER)]
+    }
+
+
+def test_bbox_keeps_quotations_inside_the_box(client, admin_headers, sites):
+    ids = listed_ids(client, admin_headers, bbox="-0.03,51.47,0.0,51.49")
+
+    assert {sites["greenwich"], sites["deptford"]} <= ids
+    assert sites["manchester"] not in ids
+
+
+def test_radius_search_keeps_quotations_within_the_radius(client, admin_headers, sites):
+    near = f"{GREENWICH['lat']},{GREENWICH['lng']}"
+
+    close = listed_ids(client, admin_headers, near=near, radius_m=500)
+    wider = listed_ids(client, admin_headers, near=near, radius_m=5000)
+
+    assert sites["greenwich"] in close and sites["deptford"] not in close
+    assert {sites["greenwich"], sites["deptford"]} <= wider
+    assert sites["manchester"] not in wider
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"bbox": "1,2,3"}, "bbox must be min_lng,min_lat,max_lng,max_lat"),
+    ({"bbox": "a,b,c,d"}, "bbox must be min_lng,min_lat,max_lng,max_lat"),
+    ({"bbox": "1,52,0,51"}, "bbox minimums must not exceed maximums"),
+    ({"near": "51.5,-0.1"}, "radius_m must be between 0 and 100000"),
+    ({"near": "51.5,-0.1", "radius_m": 0}, "radius_m must be between 0 and 100000"),
+    ({"near": "51.5,-0.1", "radius_m": 100001}, "radius_m must be between 0 and 100000"),
+    ({"near": "51.5", "radius_m": 100}, "near must be lat,lng"),
+    ({"near": "91,0", "radius_m": 100}, "near is out of range"),
+])
+def test_malformed_location_filters_are_rejected(client, admin_headers, params, detail):
+    for path in ("/api/v1/quotations/", "/api/v1/quotations/map-feed"):
+        response = client.get(path, headers=admin_headers, params=params)
+        assert response.status_code == 400, (path, response.text)
+        assert response.json()["detail"] == detail
@@ -0,0 +1,100 @@
+import json
+from datetime import datetime, timedelta
+
+from app.db import models
+from app.db.database import SessionLocal
+
+# A box only the quotations created here fall into
+BBOX = "-0.0101,51.4999,-0.0099,51.5001"
+LOCATION = {"lat": 51.5, "lng": -0.01}
+
+
+def feed(client, **params) -> dict:
+    response = client.get("/api/v1/quotations/map-feed", params={"bbox": BBOX, **params})
+    assert response.status_code == 200, response.text
+    return {record["id"]: record for record in map(json.loads, response.text.splitlines())}
+
+
+def latest_seq(client) -> int:
+    return int(client.get("/api/v1/quotations/map-feed").headers["X-Change-Seq"])
+
+
+def test_delta_reports_deleted_quotations(client, admin_headers, make_quotation):
+    quotation = make_quotation(location_data=LOCATION)
+    assert "removed" not in feed(client)[quotation["id"]]
+
+    since = latest_seq(client)
+    client.delete(f"/api/v1/quotations/{quotation['id']}", headers=admin_headers).raise_for_status()
+
+    assert quotation["id"] not in feed(client)
+    record = feed(client, since=since)[quotation["id"]]
+    assert record["removed"] is True and record["seq"] > since
+
+
+def test_delta_reports_quotations_that_lost_their_coordinates(client, admin_headers, make_quotation):
+    quotation = make_quotation(location_data=LOCATION)
+    since = latest_seq(client)
+    client.put(
+        f"/api/v1/quotations/{quotation['id']}", headers=admin_headers, json={"location_data": {}}
+    ).raise_for_status()
+
+    assert feed(client, since=since)[quotation["id"]]["removed"] is True
+
+
+def test_delta_reports_changed_quotations_on_the_map(client, admin_headers, make_quotation):
+    quotation = make_quotation(location_data=LOCATION)
+    since = latest_seq(client)
+    client.put(
+        f"/api/v1/quotations/{quotation['id']}", headers=admin_headers, json={"status": "approved"}
+    ).raise_for_status()
+
+    record = feed(client, since=since)[quotation["id"]]
+    assert "removed" not in record and record["status"] == "approved"
+
+
+def test_delta_keeps_writes_in_the_same_second_apart(client, admin_headers, make_quotation):
+    first = make_quotation(location_data=LOCATION)
+    # A client syncs right after the first write; the next writes land within the same second
+    since = latest_seq(client)
+    second = make_quotation(location_data=LOCATION)
+    client.put(
+        f"/api/v1/quotations/{first['id']}", headers=admin_headers, json={"status": "approved"}
+    ).raise_for_status()
+
+    delta = feed(client, since=since)
+    assert set(delta) == {first["id"], second["id"]}
+    assert delta[first["id"]]["seq"] > delta[second["id"]]["seq"] > since
+    assert feed(client, since=latest_seq(client)) == {}
+
+
+def test_geojson_tombstone_has_no_geometry(client, admin_headers, make_quotation):
+    quotation = make_quotation(location_data=LOCATION)
+    since = latest_seq(client)
+    client.delete(f"/api/v1/quotations/{quotation['id']}", headers=admin_headers).raise_for_status()
+
+    response = client.get("/api/v1/quotations/map-feed", params={"bbox": BBOX, "since": since, "format": "geojson"})
+    features = {feature["id"]: feature for feature in response.json()["features"]}
+    assert features[quotation["id"]]["geometry"] is None
+    assert features[quotation["id"]]["properties"]["removed"] is True
+
+
+def test_since_older_than_the_deletion_log_is_gone(client, admin_headers, make_quotation):
+    expired = make_quotation(location_data=LOCATION)
+    since = latest_seq(client)
+    client.delete(f"/api/v1/quotations/{expired['id']}", headers=admin_headers).raise_for_status()
+    db = SessionLocal()
+    try:
+        db.query(models.QuotationDeletion).filter(models.QuotationDeletion.quotation_id == expired["id"]).update(
+            {"deleted_at": datetime.utcnow() - timedelta(days=365)}
+        )
+        db.commit()
+    finally:
+        db.close()
+    # The next deletion prunes the expired entry
+    quotation = make_quotation(location_data=LOCATION)
+    client.delete(f"/api/v1/quotations/{quotation['id']}", headers=admin_headers).raise_for_status()
+
+    response = client.get("/api/v1/quotations/map-feed", params={"since": since})
+    assert response.status_code == 410
+    # Resyncing from the full feed's position works again
+    assert feed(client, since=latest_seq(client)) == {}
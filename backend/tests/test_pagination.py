@@ -0,0 +1,51 @@
+import pytest
+
+from app.core.pagination import encode_cursor
+
+
+def walk_pages(client, headers, limit: int) -> list:
+    ids, params = [], {"cursor": "true", "limit": limit}
+    while True:
+        response = client.get("/api/v1/quotations/", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= limit
+        ids += [quotation["id"] for quotation in page["items"]]
+        if page["next_cursor"] is None:
+            return ids
+        params = {"after": page["next_cursor"], "limit": limit}
+
+
+def test_walking_every_page_returns_each_quotation_once(client, admin_headers, make_quotation):
+    # Created within the same second, so the id alone orders most of them
+    for number in range(7):
+        make_quotation(description=f"Paged {number}")
+
+    ids = walk_pages(client, admin_headers, limit=3)
+
+    everything = client.get("/api/v1/quotations/", headers=admin_headers, params={"limit": 100000}).json()
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {quotation["id"] for quotation in everything}
+
+
+def test_pages_are_newest_first(client, admin_headers, make_quotation):
+    first = make_quotation(description="Older")
+    second = make_quotation(description="Newer")
+
+    ids = walk_pages(client, admin_headers, limit=2)
+
+    assert ids.index(second["id"]) < ids.index(first["id"])
+
+
+@pytest.mark.parametrize("after", ["not-a-cursor", "e30", encode_cursor("2024-01-01", 1)[:-3]])
+def test_invalid_cursor_is_rejected(client, admin_headers, after):
+    response = client.get("/api/v1/quotations/", headers=admin_headers, params={"after": after})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_pagination_is_refused_with_search(client, admin_headers):
+    response = client.get(
+        "/api/v1/quotations/", headers=admin_headers, params={"cursor": "true", "search": "paged"}
+    )
+    assert response.status_code == 400
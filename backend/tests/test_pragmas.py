@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import Settings
+from app.db.database import async_engine, engine, read_engine
+from app.db.pragmas import check_async_engine_pragmas, check_engine_pragmas
+
+
+def pragma(conn, name: str):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_write_connection_uses_wal_and_normal_sync():
+    with engine.connect() as conn:
+        assert pragma(conn, "journal_mode") == "wal"
+        assert pragma(conn, "synchronous") == 1  # NORMAL
+        assert pragma(conn, "query_only") == 0
+
+
+def test_read_connection_uses_wal_and_is_query_only():
+    with read_engine.connect() as conn:
+        assert pragma(conn, "journal_mode") == "wal"
+        assert pragma(conn, "synchronous") == 1  # NORMAL
+        assert pragma(conn, "query_only") == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(text("CREATE TABLE pragma_test (id INTEGER)"))
+
+
+def mismatches(checks) -> list:
+    return [(name, expected, actual) for name, expected, actual in checks if expected != actual]
+
+
+def test_engines_match_the_configured_pragmas():
+    assert mismatches(check_engine_pragmas(engine)) == []
+    assert mismatches(check_engine_pragmas(read_engine, read_only=True)) == []
+    if async_engine is not None:
+        assert mismatches(asyncio.run(check_async_engine_pragmas(async_engine, read_only=True))) == []
+
+
+def test_async_database_is_off_unless_configured(monkeypatch):
+    monkeypatch.delenv("ASYNC_DATABASE", raising=False)
+    assert Settings(_env_file=None).ASYNC_DATABASE is False
@@ -0,0 +1,66 @@
+"""
+The number of SQL statements per request must not grow with the page size.
+benchmarks/bench_list_queries.py reports the same counts on a larger database.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.db.database import async_engine, engine, read_engine
+
+ITEM = {"name": "Labour", "quantity": 2, "unit_price": 50.0, "total": 100.0}
+
+LIST_CASES = [
+    ("/api/v1/quotations/", {}),
+    ("/api/v1/quotations/", {"fields": "id,status,total_amount"}),
+    ("/api/v1/quotations/", {"fields": "id,status", "include": "items"}),
+    ("/api/v1/quotations/", {"cursor": "true"}),
+    ("/api/v1/quotations/public", {}),
+]
+
+
+@contextmanager
+def count_statements():
+    engines = (engine, read_engine) + ((async_engine.sync_engine,) if async_engine is not None else ())
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    for counted in engines:
+        event.listen(counted, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        for counted in engines:
+            event.remove(counted, "before_cursor_execute", count)
+
+
+@pytest.fixture(autouse=True)
+def quotations_with_items(client, admin_headers, make_quotation):
+    for _ in range(12):
+        make_quotation(status="approved", items=[ITEM, ITEM])
+
+
+def get(client, headers, path, params) -> list:
+    with count_statements() as statements:
+        response = client.get(path, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return statements
+
+
+@pytest.mark.parametrize("path, params", LIST_CASES, ids=lambda case: str(case))
+def test_list_statements_do_not_grow_with_the_page(client, admin_headers, path, params):
+    small = get(client, admin_headers, path, {**params, "limit": 2})
+    large = get(client, admin_headers, path, {**params, "limit": 10})
+    # The collection version for the ETag, the page, and at most one statement for all of its line items
+    assert len(small) == len(large) <= 3, large
+
+
+def test_detail_statements_do_not_grow_with_the_items(client, admin_headers, make_quotation):
+    quotation = make_quotation(template_id=1, items=[ITEM, ITEM, ITEM])
+    # The ETag header lookup, the quotation with its template and user, and its items
+    statements = get(client, admin_headers, f"/api/v1/quotations/{quotation['id']}", {})
+    assert len(statements) <= 3, statements
@@ -0,0 +1,19 @@
+import pytest
+
+from app.db.database import SessionLocal
+from app.db.query_plans import PLAN_CHECKS, check_query_plans
+
+
+@pytest.fixture(scope="module")
+def plan_results():
+    db = SessionLocal()
+    try:
+        return {check.name: (plan, passed) for check, plan, passed in check_query_plans(db)}
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("check", PLAN_CHECKS, ids=[check.name for check in PLAN_CHECKS])
+def test_query_searches_expected_index(plan_results, check):
+    plan, passed = plan_results[check.name]
+    assert passed, f"expected a SEARCH using {check.index}, got:\n" + "\n".join(plan)
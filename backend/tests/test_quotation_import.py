@@ -0,0 +1,35 @@
+import json
+
+ROW = {"description": "Imported", "customer_name": "Import Ltd", "customer_email": "import@example.com"}
+
+
+def upload(client, headers, name: str, content: bytes) -> dict:
+    response = client.post("/api/v1/quotations/import", headers=headers, files={"file": (name, content)})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_ndjson_line_that_is_not_utf8_is_reported(client, admin_headers):
+    good = json.dumps(ROW).encode()
+    bad = json.dumps({**ROW, "customer_name": "Café"}, ensure_ascii=False).encode("latin-1")
+    result = upload(client, admin_headers, "rows.ndjson", b"\n".join([good, bad, good]))
+
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["row"] == 2
+    assert "UTF-8" in result["errors"][0]["errors"][0]
+
+
+def test_csv_stops_at_the_first_line_that_is_not_utf8(client, admin_headers):
+    lines = ["description,customer_name,customer_email"]
+    lines += [f"Imported,Row {n},import@example.com" for n in range(1, 3)]
+    content = "\n".join(lines).encode() + "\nImported,Café,import@example.com\nImported,Row 4,import@example.com\n".encode("latin-1")
+    result = upload(client, admin_headers, "rows.csv", content)
+
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert result["errors"][0]["row"] == 3
+    assert "UTF-8" in result["errors"][0]["errors"][0]
+
+
+def test_byte_order_mark_is_skipped(client, admin_headers):
+    content = b"\xef\xbb\xbfdescription,customer_name,customer_email\nImported,Bom Ltd,import@example.com\n"
+    assert upload(client, admin_headers, "rows.csv", content)["imported"] == 1
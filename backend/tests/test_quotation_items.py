@@ -0,0 +1,42 @@
+import pytest
+
+ITEM = {"name": "Labour", "quantity": 2, "unit_price": 50.0, "total": 100.0}
+NOT_NULL_FIELDS = ["name", "quantity", "unit_price", "total"]
+
+
+@pytest.fixture
+def quotation(make_quotation) -> dict:
+    return make_quotation(items=[ITEM])
+
+
+@pytest.mark.parametrize("field", NOT_NULL_FIELDS)
+def test_patch_rejects_null_for_required_item_fields(client, admin_headers, quotation, field):
+    item_id = quotation["items"][0]["id"]
+    response = client.patch(
+        f"/api/v1/quotations/{quotation['id']}/items",
+        headers=admin_headers,
+        json=[{"op": "replace", "path": f"/{item_id}/{field}", "value": None}],
+    )
+    assert response.status_code == 422, response.text
+
+
+@pytest.mark.parametrize("field", NOT_NULL_FIELDS)
+def test_put_rejects_null_for_required_item_fields(client, admin_headers, quotation, field):
+    item_id = quotation["items"][0]["id"]
+    response = client.put(
+        f"/api/v1/quotations/{quotation['id']}",
+        headers=admin_headers,
+        json={"items": [{"id": item_id, field: None}]},
+    )
+    assert response.status_code == 422, response.text
+
+
+def test_put_can_still_clear_the_description(client, admin_headers, quotation):
+    item_id = quotation["items"][0]["id"]
+    response = client.put(
+        f"/api/v1/quotations/{quotation['id']}",
+        headers=admin_headers,
+        json={"items": [{"id": item_id, "description": None, "quantity": 3}]},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["items"][0]["quantity"] == 3
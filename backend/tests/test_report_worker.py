@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.db.report_worker import ReportWorker
+
+
+def add_report(status: str = "pending") -> int:
+    db = SessionLocal()
+    try:
+        report = models.Report(name="Summary", type="Summary", format="CSV", generated_by=1, status=status)
+        db.add(report)
+        db.commit()
+        return report.id
+    finally:
+        db.close()
+
+
+def status(report_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return db.get(models.Report, report_id).status
+    finally:
+        db.close()
+
+
+def wait_for(report_id: int, *statuses: str, seconds: float = 60) -> str:
+    deadline = time.monotonic() + seconds
+    while status(report_id) not in statuses:
+        assert time.monotonic() < deadline, f"report {report_id} is still {status(report_id)}"
+        time.sleep(0.1)
+    return status(report_id)
+
+
+@pytest.fixture
+def worker():
+    worker = ReportWorker()
+    yield worker
+    worker.stop()
+
+
+def test_start_fails_reports_abandoned_in_processing(worker):
+    abandoned = add_report("processing")
+    pending = add_report()
+
+    worker.start(workers=1, poll_seconds=0.1)
+
+    assert status(abandoned) == "failed"
+    assert wait_for(pending, "completed") == "completed"
+
+
+def test_pool_is_replaced_after_a_worker_dies(worker):
+    worker.start(workers=1, poll_seconds=0.1)
+    first = add_report()
+    worker.submit(first)
+    wait_for(first, "completed")
+
+    for process in list(worker._pool._processes.values()):
+        process.kill()
+        process.join()
+
+    report_id = add_report()
+    assert worker.submit(report_id)
+    assert wait_for(report_id, "completed", "failed") == "completed"
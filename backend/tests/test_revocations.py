@@ -0,0 +1,58 @@
+import time
+from datetime import datetime
+
+from app.core.revocation import revocation_list
+from app.core.security import decode_token
+from app.db import models
+from app.db.database import SessionLocal
+from app.db.revocations import RevokedTokenLoader
+
+from tests.conftest import login
+
+
+def revoke_in_another_process(token: str) -> None:
+    """Store a revocation the way another worker's logout does, without touching this process's list"""
+    claims = decode_token(token)
+    db = SessionLocal()
+    try:
+        db.add(models.RevokedToken(
+            jti=claims["jti"], user_id=int(claims["sub"]), expires_at=datetime.utcfromtimestamp(claims["exp"])
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_logout_in_another_process_is_picked_up(client, user_headers):
+    loader = RevokedTokenLoader()
+    loader.start(refresh_seconds=0.05)
+    try:
+        revoke_in_another_process(user_headers["Authorization"].split()[1])
+        deadline = time.monotonic() + 5
+        while client.get("/api/v1/users/me", headers=user_headers).status_code == 200:
+            assert time.monotonic() < deadline, "revoked token still accepted"
+            time.sleep(0.05)
+    finally:
+        loader.stop()
+    assert client.get("/api/v1/users/me", headers=user_headers).status_code == 401
+
+
+def test_role_change_in_another_process_is_picked_up(client, admin_headers):
+    client.post("/api/v1/users/", headers=admin_headers, json={
+        "name": "Demoted", "email": "demoted@example.com", "password": "secret123", "role": "admin",
+    }).raise_for_status()
+    headers = login(client, "demoted@example.com", "secret123")
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+    client.put(f"/api/v1/users/{user_id}", headers=admin_headers, json={"role": "user"}).raise_for_status()
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+    # Another process only has what is in the database
+    revocation_list.clear()
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    loader = RevokedTokenLoader()
+    loader.start(refresh_seconds=0)
+    loader.stop()
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+    # A token issued after the change carries the new role and is accepted
+    assert client.get("/api/v1/users/me", headers=login(client, "demoted@example.com", "secret123")).json()["role"] == "user"
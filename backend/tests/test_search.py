@@ -0,0 +1,34 @@
+def ids(response) -> set:
+    assert response.status_code == 200, response.text
+    body = response.json()
+    # Offset pagination returns a list, keyset pagination a page
+    quotations = body if isinstance(body, list) else body["items"]
+    return {quotation["id"] for quotation in quotations}
+
+
+def test_customer_name_matches_substrings(client, admin_headers, make_quotation):
+    quotation = make_quotation(customer_name="Johnston Plumbing")
+
+    response = client.get("/api/v1/quotations/", headers=admin_headers, params={"customer_name": "ohnst"})
+    assert quotation["id"] in ids(response)
+
+
+def test_customer_name_works_with_cursor_pagination(client, admin_headers, make_quotation):
+    quotation = make_quotation(customer_name="Cursorville Roofing")
+
+    response = client.get(
+        "/api/v1/quotations/", headers=admin_headers, params={"customer_name": "cursorville", "cursor": "true"}
+    )
+    assert quotation["id"] in ids(response)
+
+
+def test_search_matches_word_prefixes(client, admin_headers, make_quotation):
+    quotation = make_quotation(description="Replace guttering on the east elevation")
+
+    response = client.get("/api/v1/quotations/", headers=admin_headers, params={"search": "gutter eleva"})
+    assert quotation["id"] in ids(response)
+
+
+def test_search_rejects_cursor_pagination(client, admin_headers):
+    response = client.get("/api/v1/quotations/", headers=admin_headers, params={"search": "gutter", "cursor": "true"})
+    assert response.status_code == 400
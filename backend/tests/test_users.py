@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.password_hasher import password_hasher
+from app.db.database import engine
+
+
+@pytest.fixture
+def connections_during_hash(monkeypatch) -> list:
+    """The writer connections checked out while each password is hashed"""
+    checked_out = []
+    hash_sync = password_hasher.hash_sync
+
+    def recording_hash_sync(password: str) -> str:
+        checked_out.append(engine.pool.checkedout())
+        return hash_sync(password)
+
+    monkeypatch.setattr(password_hasher, "hash_sync", recording_hash_sync)
+    return checked_out
+
+
+def test_password_endpoints_hash_without_holding_the_writer(client, admin_headers, connections_during_hash):
+    created = client.post("/api/v1/users/", headers=admin_headers, json={
+        "name": "Hasher", "email": "hasher@example.com", "password": "first-pass",
+    })
+    created.raise_for_status()
+    client.put("/api/v1/users/me", headers=admin_headers, params={"password": "admin123"}).raise_for_status()
+
+    assert connections_during_hash == [0, 0]